@@ -0,0 +1,124 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class AgendadorRendimento:
+    """Agendador central dos rendimentos das contas poupança de um Banco.
+
+    Uma única thread mantém um heap com o próximo vencimento de cada conta.
+    A cada disparo, todas as contas vencidas recebem o rendimento em lote
+    (``Banco.aplicar_rendimento_lote``), resultando em uma só gravação.
+    """
+
+    def __init__(self, banco, intervalo=60):
+        """
+        Args:
+            banco (Banco): Banco dono das contas
+            intervalo (float): Segundos entre dois rendimentos de uma conta
+        """
+        self._banco = banco
+        self.intervalo = intervalo
+        self._fila = []
+        self._agendadas = {}
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._rodando = False
+
+    @property
+    def ativo(self):
+        """Indica se a thread do agendador está em execução."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def agendar(self, conta, espera=None):
+        """
+        Inclui a conta no agendamento.
+
+        Args:
+            conta (ContaPoupanca): Conta a render
+            espera (float): Segundos até o primeiro rendimento (padrão: um intervalo)
+        """
+        with self._condicao:
+            instante = time.monotonic() + (self.intervalo if espera is None else espera)
+            self._agendadas[conta] = instante
+            heapq.heappush(self._fila, (instante, next(self._sequencia), conta))
+            self._condicao.notify()
+
+    def cancelar(self, conta):
+        """Retira a conta do agendamento (a entrada no heap é descartada ao vencer)."""
+        with self._condicao:
+            self._agendadas.pop(conta, None)
+
+    def contas(self):
+        """Retorna as contas agendadas."""
+        with self._condicao:
+            return list(self._agendadas)
+
+    def iniciar(self):
+        """Inicia a thread do agendador (sem efeito se já estiver ativa)."""
+        with self._condicao:
+            if self.ativo:
+                return
+            self._rodando = True
+            self._thread = threading.Thread(target=self._executar, daemon=True,
+                                            name="AgendadorRendimento")
+            self._thread.start()
+
+    def parar(self, timeout=None):
+        """Para a thread e aguarda o término do disparo em andamento."""
+        with self._condicao:
+            self._rodando = False
+            self._condicao.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _proximas_vencidas(self):
+        """Aguarda o próximo vencimento e retorna as contas vencidas.
+
+        Returns:
+            list | None: Contas a render, ou None se o agendador foi parado
+        """
+        with self._condicao:
+            while self._rodando:
+                if not self._fila:
+                    self._condicao.wait()
+                    continue
+                agora = time.monotonic()
+                espera = self._fila[0][0] - agora
+                if espera > 0:
+                    self._condicao.wait(espera)
+                    continue
+
+                vencidas = []
+                while self._fila and self._fila[0][0] <= agora:
+                    instante, _, conta = heapq.heappop(self._fila)
+                    if self._agendadas.get(conta) != instante:
+                        continue  # Cancelada ou reagendada
+                    vencidas.append(conta)
+                    # Após uma suspensão longa, não dispara vários rendimentos em rajada
+                    proximo = instante + self.intervalo
+                    if proximo <= agora:
+                        proximo = agora + self.intervalo
+                    self._agendadas[conta] = proximo
+                    heapq.heappush(self._fila, (proximo, next(self._sequencia), conta))
+                if vencidas:
+                    return vencidas
+            return None
+
+    def _executar(self):
+        while True:
+            vencidas = self._proximas_vencidas()
+            if vencidas is None:
+                return
+            try:
+                self.aplicar(vencidas)
+            except Exception as e:
+                print(f"Erro no agendador de rendimentos: {str(e)}")
+
+    def aplicar(self, contas):
+        """Aplica o rendimento às contas e persiste tudo em uma única gravação."""
+        self._banco.aplicar_rendimento_lote(contas)
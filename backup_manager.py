@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from segmento_historico import diretorio_da_conta
+
+
+class BackupManager:
+    """Backups incrementais com deduplicação de conteúdo.
+
+    Cada snapshot é um manifesto que referencia blocos (chunks) endereçados
+    pelo SHA-256 do seu conteúdo: um bloco por usuário, um por conta e blocos
+    de tamanho fixo do histórico de cada conta. Blocos já existentes não são
+    gravados de novo, então um snapshot só escreve o que mudou desde o anterior.
+
+    Backups antigos (cópias completas ``banco_ufs_backup_<data>.json``, de
+    antes dos snapshots) continuam listados e podem ser restaurados.
+
+    Com ``segment_dir``, os segmentos selados do histórico referenciados pelas
+    contas ('historico_arquivado') também entram no backup, em
+    ``segmentos/conta_<número>/``. Como são imutáveis e têm nome único, cada
+    um é copiado (ou ligado por hard link) uma única vez.
+    """
+
+    HISTORY_BLOCK = 256
+
+    def __init__(self, backup_dir, keep=5, interval=300, every_ops=100,
+                 encoder=json.JSONEncoder, segment_dir=None):
+        """
+        Args:
+            backup_dir (str): Diretório dos backups
+            keep (int): Quantidade de snapshots mantidos
+            interval (float): Segundos mínimos entre snapshots automáticos
+            every_ops (int): Número de gravações que força um snapshot, mesmo
+                antes do intervalo
+            encoder (type): JSONEncoder usado para serializar os blocos
+            segment_dir (str): Raiz dos segmentos selados do histórico; se
+                omitido, os segmentos ficam fora dos backups
+        """
+        self.backup_dir = Path(backup_dir)
+        self.chunk_dir = self.backup_dir / 'chunks'
+        self.segment_dir = Path(segment_dir) if segment_dir is not None else None
+        self.segment_backup_dir = self.backup_dir / 'segmentos'
+        self.keep = max(1, int(keep))
+        self.interval = interval
+        self.every_ops = max(1, int(every_ops))
+        self.encoder = encoder
+        self._ops = 0
+        self._last_snapshot = None
+
+    def _chunk_path(self, digest):
+        return self.chunk_dir / digest[:2] / f"{digest}.json"
+
+    def _put_chunk(self, obj):
+        """Grava um bloco se ele ainda não existir e retorna seu hash."""
+        content = json.dumps(obj, sort_keys=True, separators=(',', ':'),
+                             ensure_ascii=False, cls=self.encoder).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._chunk_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(content)
+            tmp.replace(path)
+        return digest
+
+    def _put_segments(self, conta):
+        """Inclui no backup os segmentos da conta; retorna seus caminhos relativos."""
+        arquivado = conta.get('historico_arquivado') or {}
+        if self.segment_dir is None or not arquivado.get('segmentos'):
+            return []
+        relativo = Path(diretorio_da_conta('', conta['numero']))
+        paths = []
+        for nome in arquivado['segmentos']:
+            destino = self.segment_backup_dir / relativo / nome
+            if not destino.exists():
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                origem = self.segment_dir / relativo / nome
+                tmp = destino.with_suffix('.tmp')
+                tmp.unlink(missing_ok=True)
+                try:
+                    os.link(origem, tmp)
+                except OSError:
+                    shutil.copyfile(origem, tmp)
+                tmp.replace(destino)
+            paths.append((relativo / nome).as_posix())
+        return paths
+
+    def restore_segments(self, manifest):
+        """
+        Devolve à raiz dos históricos os segmentos de um snapshot que faltarem.
+
+        Args:
+            manifest (Path): Manifesto do snapshot
+
+        Returns:
+            int: Segmentos restaurados
+        """
+        if self.segment_dir is None:
+            return 0
+        with open(manifest, 'r', encoding='utf-8') as file:
+            paths = json.load(file).get('segmentos', [])
+        restored = 0
+        for relativo in paths:
+            destino = self.segment_dir / relativo
+            if destino.exists():
+                continue
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            tmp = destino.with_suffix('.tmp')
+            shutil.copyfile(self.segment_backup_dir / relativo, tmp)
+            tmp.replace(destino)
+            restored += 1
+        return restored
+
+    def _get_chunk(self, digest):
+        with open(self._chunk_path(digest), 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def record_operation(self, load_data):
+        """
+        Contabiliza uma gravação e tira um snapshot se a política mandar.
+
+        Args:
+            load_data (callable): Retorna os dados completos; só é chamado
+                quando um snapshot é necessário
+
+        Returns:
+            Path | None: Manifesto criado, se houve snapshot
+        """
+        self._ops += 1
+        if not self.should_snapshot():
+            return None
+        return self.snapshot(load_data())
+
+    def should_snapshot(self):
+        """Indica se um novo snapshot é devido (por tempo ou por operações)."""
+        if self._last_snapshot is None:
+            manifests = self.list_snapshots()
+            if not manifests:
+                return True
+            self._last_snapshot = manifests[-1].stat().st_mtime
+        if self._ops >= self.every_ops:
+            return True
+        return time.time() - self._last_snapshot >= self.interval
+
+    def snapshot(self, data):
+        """
+        Cria um snapshot dos dados, gravando apenas blocos novos.
+
+        Args:
+            data (dict): Dados completos (usuarios, contas, ultimo_numero_conta)
+
+        Returns:
+            Path: Caminho do manifesto criado
+        """
+        refs = set()
+        usuarios = []
+        for usuario in data['usuarios']:
+            digest = self._put_chunk(usuario)
+            usuarios.append(digest)
+            refs.add(digest)
+
+        contas = []
+        segmentos = []
+        for conta in data['contas']:
+            segmentos.extend(self._put_segments(conta))
+            historico = conta.get('historico', [])
+            blocos = [self._put_chunk(historico[i:i + self.HISTORY_BLOCK])
+                      for i in range(0, len(historico), self.HISTORY_BLOCK)]
+            cabecalho = {k: v for k, v in conta.items() if k != 'historico'}
+            cabecalho['historico_blocos'] = blocos
+            digest = self._put_chunk(cabecalho)
+            contas.append(digest)
+            refs.add(digest)
+            refs.update(blocos)
+
+        now = datetime.now()
+        manifest = {
+            'timestamp': now.isoformat(),
+            'ultimo_numero_conta': data['ultimo_numero_conta'],
+            'metadata': data.get('metadata'),
+            'usuarios': usuarios,
+            'contas': contas,
+            'refs': sorted(refs),
+            'segmentos': segmentos
+        }
+        path = self._manifest_path(now)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(manifest, separators=(',', ':')), encoding='utf-8')
+        tmp.replace(path)
+
+        self._ops = 0
+        self._last_snapshot = time.time()
+        self._prune()
+        return path
+
+    def _manifest_path(self, when):
+        """Nome único por snapshot (resolução de microssegundos)."""
+        base = f"banco_ufs_backup_{when.strftime('%Y%m%d_%H%M%S_%f')}"
+        path = self.backup_dir / f"{base}.manifest.json"
+        seq = 1
+        while path.exists():
+            path = self.backup_dir / f"{base}_{seq}.manifest.json"
+            seq += 1
+        return path
+
+    def _prune(self):
+        """Aplica a retenção e remove blocos que nenhum snapshot usa mais."""
+        manifests = self.list_snapshots()
+        if len(manifests) <= self.keep:
+            return
+        for old in manifests[:-self.keep]:
+            old.unlink()
+
+        referenced = set()
+        segments = set()
+        for manifest in manifests[-self.keep:]:
+            with open(manifest, 'r', encoding='utf-8') as file:
+                info = json.load(file)
+            referenced.update(info.get('refs', []))
+            segments.update(info.get('segmentos', []))
+        for chunk in self.chunk_dir.glob('*/*.json'):
+            if chunk.stem not in referenced:
+                chunk.unlink()
+        for segment in self.segment_backup_dir.glob('*/*.seg'):
+            if segment.relative_to(self.segment_backup_dir).as_posix() not in segments:
+                segment.unlink()
+
+    @staticmethod
+    def _snapshot_key(path):
+        """Instante (e sequência) do snapshot, lidos do nome do arquivo.
+
+        Vale para manifestos (``<data>_<microssegundos>[_<seq>].manifest.json``)
+        e para backups antigos (``<data>.json``).
+        """
+        partes = path.name[len("banco_ufs_backup_"):].split('.')[0].split('_')
+        when = datetime.strptime(f"{partes[0]}_{partes[1]}", '%Y%m%d_%H%M%S')
+        if len(partes) > 2:
+            when = when.replace(microsecond=int(partes[2]))
+        seq = int(partes[3]) if len(partes) > 3 else 0
+        return when, seq
+
+    def list_snapshots(self):
+        """Retorna os manifestos e backups antigos, do mais antigo ao mais recente."""
+        snapshots = []
+        for path in self.backup_dir.glob("banco_ufs_backup_*.json"):
+            try:
+                snapshots.append((self._snapshot_key(path), path))
+            except ValueError:
+                continue
+        return [path for _, path in sorted(snapshots)]
+
+    def load_snapshot(self, manifest):
+        """
+        Reconstrói os dados completos de um snapshot.
+
+        Args:
+            manifest (Path): Manifesto (ou backup JSON completo antigo)
+
+        Returns:
+            dict: Dados no formato do DatabaseManager
+        """
+        manifest = Path(manifest)
+        with open(manifest, 'r', encoding='utf-8') as file:
+            info = json.load(file)
+        if 'refs' not in info:
+            # Backup antigo: cópia completa do arquivo JSON
+            return info
+
+        contas = []
+        for digest in info['contas']:
+            conta = self._get_chunk(digest)
+            historico = []
+            for bloco in conta.pop('historico_blocos', []):
+                historico.extend(self._get_chunk(bloco))
+            conta['historico'] = historico
+            contas.append(conta)
+
+        data = {
+            'usuarios': [self._get_chunk(digest) for digest in info['usuarios']],
+            'contas': contas,
+            'ultimo_numero_conta': info['ultimo_numero_conta']
+        }
+        if info.get('metadata') is not None:
+            data['metadata'] = info['metadata']
+        return data
+
+    def find_snapshot(self, when=None):
+        """
+        Encontra o snapshot mais recente tirado até o instante informado.
+
+        Args:
+            when (datetime): Instante desejado; se omitido, o mais recente
+
+        Returns:
+            Path | None: Manifesto encontrado
+        """
+        manifests = self.list_snapshots()
+        if when is None:
+            return manifests[-1] if manifests else None
+        escolhido = None
+        for manifest in manifests:
+            if self._snapshot_key(manifest)[0] <= when:
+                escolhido = manifest
+            else:
+                break
+        return escolhido
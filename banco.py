@@ -1,33 +1,106 @@
+from contextlib import contextmanager
 from datetime import date, datetime
-from decimal import Decimal
+import heapq
+from itertools import islice
+import threading
 import traceback
-from conta import ContaCorrente, ContaPoupanca
+from agendador import AgendadorRendimento
+from concorrencia import TravaLeituraEscrita, travar_contas
+from config import INTERVALO_RENDIMENTO, RENDIMENTO_RETROATIVO
+from conta import Conta, ContaCorrente, ContaPoupanca
 from pessoa import Usuario
+import rendimento
 from utils import valida_nome, valida_data_nascimento, valida_cpf, valida_senha
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, DatabaseError, iter_records
+from dinheiro import Dinheiro
+from historico import Movimentacao
+from motor_transacoes import MotorTransacoes
+from segmento_historico import diretorio_da_conta
 import hashlib
 import os
 
 class Banco:
-    def __init__(self, arquivo_json='banco_ufs.json'):
-        self.db_manager = DatabaseManager(arquivo_json)
+    def __init__(self, arquivo_json='banco_ufs.json', modo_journal=False, backend=None,
+                 janela_commit=0.0, gravacao_assincrona=False, ao_falhar_gravacao=None,
+                 snapshot_binario=False):
+        """
+        Args:
+            arquivo_json: Caminho do arquivo de dados
+            modo_journal: Ativa o journal de alterações no armazenamento JSON
+            backend: Armazenamento a usar ('json', 'sqlite' ou StorageBackend).
+                Com armazenamentos incrementais (journal ou SQLite), cada
+                gravação leva só os usuários/contas alterados; a carga inicial
+                continua lendo todos os dados para a memória.
+            janela_commit: Segundos durante os quais pedidos de salvamento são
+                agrupados em uma única gravação. 0 grava a cada alteração
+                (máxima durabilidade); valores maiores trocam durabilidade por
+                menos escritas em rajadas de operações.
+            gravacao_assincrona: Grava em uma thread de fundo, sem bloquear
+                quem fez a operação
+            ao_falhar_gravacao: Chamado com a exceção quando uma gravação em
+                segundo plano falha
+            snapshot_binario: Mantém um snapshot binário compacto ao lado do
+                JSON; se estiver em dia, a inicialização o usa em vez do JSON
+        """
+        # Segmentos selados dos históricos: <arquivo sem extensão>_historico/conta_<número>/
+        self._diretorio_historico = os.path.splitext(os.path.abspath(arquivo_json))[0] + '_historico'
+        self.db_manager = DatabaseManager(arquivo_json, journal=modo_journal, backend=backend,
+                                          async_writes=gravacao_assincrona,
+                                          on_error=ao_falhar_gravacao,
+                                          binary_snapshot=snapshot_binario,
+                                          history_dir=self._diretorio_historico)
+        self._janela_commit = janela_commit
+        # Serializa as gravações e protege o timer da janela de commit
+        self._trava_commit = threading.RLock()
+        # Alterações (em batch) usam o modo compartilhado; a captura do
+        # estado a gravar usa o modo exclusivo, vendo sempre um estado consistente
+        self._trava = TravaLeituraEscrita()
+        self._trava_lote = threading.Lock()
+        self._profundidade_lote = 0
+        self._timer_commit = None
         self._usuarios = []
         self._contas = []
-        self._contas_poupanca_ativas = [] 
+        # Rendimentos de todas as poupanças em uma única thread
+        self._agendador = AgendadorRendimento(self, INTERVALO_RENDIMENTO)
+        # Índices: CPF sem formatação -> Usuario e número -> Conta
+        self._usuarios_por_cpf = {}
+        self._contas_por_numero = {}
+        self._sujos = set()
+        self._removidos = []
+        self._fragmentos = {}
+        # Conta -> ((geração, base) do histórico, entradas já gravadas), para
+        # os registros incrementais levarem só as entradas novas
+        self._historicos_gravados = {}
+        # Conta -> ((geração, base) do histórico, posição da primeira entrada,
+        # lista serializada da parte em memória), ver _historico_serializado
+        self._historicos_serializados = {}
         self._carregar_dados()        
         for conta in self._contas:
             conta._banco = self
+        
+        # Históricos carregados acima do limite em memória (ex.: dados antigos)
+        # são selados agora, e as contas regravadas sem as entradas seladas
+        arquivadas = [c for c in self._contas if c.get_historico().selar()]
+        if arquivadas:
+            self._salvar_dados(*arquivadas)
             
         if self._contas:
-            self._ultimo_numero_conta = max(c.get_numero() for c in self._contas)
-        else:
-            self._ultimo_numero_conta = 0
+            self._ultimo_numero_conta = max(self._ultimo_numero_conta,
+                                            max(c.get_numero() for c in self._contas))
+        
+        poupancas = [c for c in self._contas
+                     if isinstance(c, ContaPoupanca) and c._modo_rendimento == 'periodico']
+        if RENDIMENTO_RETROATIVO:
+            self._render_atrasados(poupancas)
+        for conta in poupancas:
+            self._agendar_rendimento(conta)
+        self._agendador.iniciar()
 
     def _proximo_numero_conta(self):
         """Retorna o próximo número de conta sequencial"""
-        self._ultimo_numero_conta += 1
-        self._salvar_dados()  
-        return self._ultimo_numero_conta
+        with self._trava_lote:
+            self._ultimo_numero_conta += 1
+            return self._ultimo_numero_conta
 
     def _hash_senha(self, senha):
         """Gera hash SHA-256 para a senha com salt fixo para testes"""
@@ -35,131 +108,277 @@ class Banco:
         return hashlib.sha256((salt + senha).encode()).hexdigest()
 
     def _carregar_dados(self):
-        """Carrega dados do arquivo JSON."""
-        dados = self.db_manager.load_data()
+        """Carrega dados do arquivo JSON (ou do snapshot binário, se em dia).
+        
+        O JSON é lido de forma incremental: cada usuário/conta vira objeto
+        assim que é lido, e o dicionário bruto é descartado em seguida.
+        """
+        snapshot = self.db_manager.load_snapshot()
+        if snapshot is not None:
+            self._carregar_snapshot(snapshot)
+            return
         
+        try:
+            self._carregar_registros(self.db_manager.iter_data())
+        except DatabaseError as e:
+            # Arquivo ilegível: a carga completa tenta a recuperação
+            print(f"Carga incremental falhou ({str(e)}); usando a carga completa")
+            self._carregar_registros(iter_records(self.db_manager.load_data()))
+    
+    def _carregar_registros(self, registros):
+        """Monta os objetos do domínio a partir dos registros do armazenamento."""
         # Limpa listas existentes
         self._usuarios = []
         self._contas = []
-        self._contas_poupanca_ativas = []
+        self._usuarios_por_cpf = {}
+        self._contas_por_numero = {}
+        ultimo_numero_conta = 0
+        # Contas lidas antes do seu usuário (ordem de chaves incomum no arquivo)
+        pendentes = []
         
-        # Carrega usuários
-        for usuario_data in dados.get('usuarios', []):
-            try:
-                usuario = Usuario(
-                    usuario_data['nome'],
-                    usuario_data['cpf'],
-                    usuario_data['data_nascimento'],
-                    usuario_data['endereco']
-                )
-                self._usuarios.append(usuario)
-            except Exception as e:
-                print(f"Erro ao carregar usuário: {str(e)}")
+        for chave, dados in registros:
+            if chave == 'usuario':
+                self._carregar_usuario(dados)
+            elif chave == 'conta':
+                if not self._carregar_conta(dados):
+                    pendentes.append(dados)
+            elif chave == 'ultimo_numero_conta':
+                ultimo_numero_conta = dados
         
-        # Carrega contas
-        for conta_data in dados.get('contas', []):
-            try:
-                usuario = self._buscar_usuario(conta_data['cpf_cliente'])
-                if not usuario:
-                    print(f"Usuário não encontrado para conta {conta_data['numero']}")
-                    continue
-                    
-                if conta_data['tipo'] == 'corrente':
-                    conta = ContaCorrente(
-                        usuario, 
-                        conta_data['numero'],
-                        limite=float(conta_data.get('limite', 500.0)),
-                        limite_saques=int(conta_data.get('limite_saques', 3)))
-                    
-                    # Atributos específicos
-                    conta._saldo = float(conta_data.get('saldo', 0.0))
-                    conta._saques_realizados = int(conta_data.get('saques_realizados', 0))
-                    
-                    # Data do último saque
-                    if conta_data.get('data_ultimo_saque'):
-                        try:
-                            conta._data_ultimo_saque = datetime.strptime(
-                                conta_data['data_ultimo_saque'], "%Y-%m-%d").date()
-                        except:
-                            conta._data_ultimo_saque = None
-                    
-                    # Empréstimos
-                    conta._emprestimos = conta_data.get('emprestimos', [])
-                    
-                elif conta_data['tipo'] == 'poupanca':
-                    conta = ContaPoupanca(
-                        usuario, 
-                        conta_data['numero'],
-                        taxa_rendimento=float(conta_data.get('taxa_rendimento', 0.05)))
-                    
-                    # Atributos específicos
-                    conta._saldo = float(conta_data.get('saldo', 0.0))
-                    
-                    # Data do último rendimento
-                    if conta_data.get('ultima_atualizacao'):
-                        try:
-                            conta._ultima_atualizacao = datetime.strptime(
-                                conta_data['ultima_atualizacao'], "%Y-%m-%d %H:%M:%S")
-                        except:
-                            conta._ultima_atualizacao = datetime.now()
-                    else:
-                        conta._ultima_atualizacao = datetime.now()
-                    
-                    # Inicia thread de rendimento
-                    conta._iniciar_rendimento_automatico()
-                    self._contas_poupanca_ativas.append(conta)
+        for conta_data in pendentes:
+            if not self._carregar_conta(conta_data):
+                print(f"Usuário não encontrado para conta {conta_data['numero']}")
+        
+        self._finalizar_carga(ultimo_numero_conta)
+    
+    def _carregar_usuario(self, usuario_data):
+        """Cria (com validação) um usuário lido do armazenamento."""
+        try:
+            usuario = Usuario(
+                usuario_data['nome'],
+                usuario_data['cpf'],
+                usuario_data['data_nascimento'],
+                usuario_data['endereco']
+            )
+            self._usuarios.append(usuario)
+            self._usuarios_por_cpf[usuario._cpf] = usuario
+        except Exception as e:
+            print(f"Erro ao carregar usuário: {str(e)}")
+    
+    def _carregar_conta(self, conta_data):
+        """Cria uma conta lida do armazenamento e a vincula ao seu usuário.
+        
+        Returns:
+            bool: False se o usuário da conta ainda não foi carregado
+        """
+        try:
+            usuario = self._buscar_usuario(conta_data['cpf_cliente'])
+            if not usuario:
+                return False
                 
-                # Configurações comuns
-                conta.senha_hash = conta_data.get('senha_hash', "")
+            if conta_data['tipo'] == 'corrente':
+                conta = ContaCorrente(
+                    usuario, 
+                    conta_data['numero'],
+                    limite=Dinheiro(conta_data.get('limite', 500.0)),
+                    limite_saques=int(conta_data.get('limite_saques', 3)))
                 
-                # Histórico
-                if 'historico' in conta_data:
-                    for transacao in conta_data['historico']:
-                        conta.get_historico()._transacoes.append(transacao)
+                # Atributos específicos
+                conta._saldo = Dinheiro(conta_data.get('saldo', 0.0))
+                conta._saques_realizados = int(conta_data.get('saques_realizados', 0))
                 
-                # Vincula o banco à conta
-                conta._banco = self
-                self._contas.append(conta)
+                # Data do último saque
+                if conta_data.get('data_ultimo_saque'):
+                    try:
+                        conta._data_ultimo_saque = datetime.strptime(
+                            conta_data['data_ultimo_saque'], "%Y-%m-%d").date()
+                    except:
+                        conta._data_ultimo_saque = None
                 
-                # Adiciona conta ao usuário
-                usuario.add_conta(conta)
+                # Empréstimos
+                conta._emprestimos = self._carregar_emprestimos(conta_data.get('emprestimos', []))
                 
-            except Exception as e:
-                print(f"Erro ao carregar conta {conta_data.get('numero', '?')}: {str(e)}")
-                traceback.print_exc()
+            elif conta_data['tipo'] == 'poupanca':
+                conta = ContaPoupanca(
+                    usuario, 
+                    conta_data['numero'],
+                    taxa_rendimento=float(conta_data.get('taxa_rendimento', 0.05)))
+                
+                # Atributos específicos
+                conta._saldo = Dinheiro(conta_data.get('saldo', 0.0))
+                
+                # Data do último rendimento
+                if conta_data.get('ultima_atualizacao'):
+                    try:
+                        conta._ultima_atualizacao = datetime.strptime(
+                            conta_data['ultima_atualizacao'], "%Y-%m-%d %H:%M:%S")
+                    except:
+                        conta._ultima_atualizacao = datetime.now()
+                else:
+                    conta._ultima_atualizacao = datetime.now()
+            
+            # Configurações comuns
+            conta.senha_hash = conta_data.get('senha_hash', "")
+            
+            # Histórico
+            self._vincular_historico(conta)
+            if 'historico' in conta_data or 'historico_arquivado' in conta_data:
+                conta.get_historico().carregar(conta_data.get('historico', []),
+                                               conta_data.get('historico_arquivado'))
+            
+            # Vincula o banco à conta
+            conta._banco = self
+            self._contas.append(conta)
+            self._contas_por_numero[conta.get_numero()] = conta
+            
+            # Adiciona conta ao usuário
+            usuario.add_conta(conta)
+            
+        except Exception as e:
+            print(f"Erro ao carregar conta {conta_data.get('numero', '?')}: {str(e)}")
+            traceback.print_exc()
+        return True
+    
+    def _vincular_historico(self, conta):
+        """Define onde o histórico da conta sela as entradas antigas."""
+        conta.get_historico().arquivar_em(
+            diretorio_da_conta(self._diretorio_historico, conta.get_numero()))
+    
+    @staticmethod
+    def _carregar_emprestimos(emprestimos):
+        """Converte os valores dos empréstimos persistidos em Dinheiro."""
+        for emprestimo in emprestimos:
+            for campo in ('valor', 'valor_pago'):
+                if campo in emprestimo:
+                    emprestimo[campo] = Dinheiro(emprestimo[campo])
+        return emprestimos
+    
+    def _carregar_snapshot(self, snapshot):
+        """Carga confiável a partir do snapshot binário.
+        
+        Os dados já foram validados ao serem gravados e chegam com datas e
+        valores convertidos, então não há revalidação nem parsing de datas.
+        """
+        self._usuarios = []
+        self._contas = []
+        self._usuarios_por_cpf = {}
+        self._contas_por_numero = {}
+        
+        for nome, cpf, data_nascimento, endereco in snapshot.usuarios:
+            usuario = Usuario.restaurar(nome, cpf, data_nascimento, endereco)
+            self._usuarios.append(usuario)
+            self._usuarios_por_cpf[cpf] = usuario
         
-        self._ultimo_numero_conta = dados.get('ultimo_numero_conta', 0)
+        for conta_data in snapshot.contas():
+            usuario = self._buscar_usuario(conta_data['cpf_cliente'])
+            if not usuario:
+                print(f"Usuário não encontrado para conta {conta_data['numero']}")
+                continue
+            
+            if conta_data['tipo'] == 'corrente':
+                conta = ContaCorrente(usuario, conta_data['numero'],
+                                      limite=conta_data['limite'],
+                                      limite_saques=conta_data['limite_saques'])
+                conta._saques_realizados = conta_data['saques_realizados']
+                conta._data_ultimo_saque = conta_data['data_ultimo_saque']
+                conta._emprestimos = self._carregar_emprestimos(conta_data['emprestimos'])
+            else:
+                conta = ContaPoupanca(usuario, conta_data['numero'],
+                                      taxa_rendimento=conta_data['taxa_rendimento'])
+                conta._ultima_atualizacao = conta_data['ultima_atualizacao']
+            
+            conta._saldo = conta_data['saldo']
+            conta.senha_hash = conta_data['senha_hash']
+            self._vincular_historico(conta)
+            conta.get_historico().carregar(conta_data['historico'],
+                                           conta_data.get('historico_arquivado'))
+            conta._banco = self
+            self._contas.append(conta)
+            self._contas_por_numero[conta_data['numero']] = conta
+            usuario._contas.append(conta)
+        
+        self._finalizar_carga(snapshot.ultimo_numero_conta)
+    
+    def _finalizar_carga(self, ultimo_numero_conta):
+        """Marca tudo o que acabou de ser carregado como já persistido."""
+        self._ultimo_numero_conta = ultimo_numero_conta
+        self._ultimo_numero_persistido = self._ultimo_numero_conta
+        
+        # Tudo que acabou de ser carregado já está persistido
+        for usuario in self._usuarios:
+            usuario._banco = self
+            usuario._alterado = False
+        for conta in self._contas:
+            conta._alterado = False
+            conta.get_historico()._alterado = False
+        self._sujos = set()
+        self._removidos = []
+        self._fragmentos = {}
+        self._historicos_serializados = {}
+        self._historicos_gravados = {conta: self._estado_historico(conta)
+                                     for conta in self._contas}
 
 
 
     def salvar_dados_imediato(self):
         """Força o salvamento imediato dos dados com tratamento de erros."""
         try:
-            # Encerra temporariamente as threads de poupança
-            for conta in self._contas_poupanca_ativas:
-                conta._rodando = False
-                if conta._thread_rendimento:
-                    conta._thread_rendimento.join(timeout=1)
-            
-            # Realiza o salvamento
             self._salvar_dados()
-            
-            # Reinicia as threads
-            for conta in self._contas_poupanca_ativas:
-                conta._iniciar_rendimento_automatico()
-                
+            self.flush()
         except Exception as e:
             print(f"ERRO CRÍTICO AO SALVAR: {str(e)}")
             traceback.print_exc()
+    def aplicar_rendimento_lote(self, contas=None):
+        """Aplica um período de rendimento às poupanças em uma passada vetorizada.
+        
+        Args:
+            contas: Contas poupança a render (padrão: todas as periódicas)
+        
+        Returns:
+            int: Quantidade de contas que renderam
+        """
+        with self.batch():
+            if contas is None:
+                contas = [c for c in self._contas
+                          if isinstance(c, ContaPoupanca) and c._modo_rendimento == 'periodico']
+            with travar_contas(*contas):
+                alteradas = rendimento.aplicar_lote(contas)
+            self._sujos.update(alteradas)
+        return len(alteradas)
+    
+    def _render_atrasados(self, contas):
+        """Aplica o rendimento do tempo em que o sistema ficou fora do ar.
+        
+        Usa a forma fechada (O(1) por conta) em vez de repetir cada intervalo,
+        então o tempo de inicialização não depende da duração da parada.
+        """
+        with self.batch():
+            alteradas = rendimento.aplicar_atrasados(contas, datetime.now(), INTERVALO_RENDIMENTO)
+            self._sujos.update(alteradas)
+    
+    def _agendar_rendimento(self, conta):
+        """Agenda a poupança, se o rendimento for periódico.
+        
+        O primeiro rendimento vence um intervalo após a última atualização.
+        No modo sob demanda o rendimento é calculado na leitura do saldo.
+        """
+        if conta._modo_rendimento == 'periodico':
+            decorrido = (datetime.now() - conta._ultima_atualizacao).total_seconds()
+            self._agendador.agendar(conta, min(max(INTERVALO_RENDIMENTO - decorrido, 0),
+                                               INTERVALO_RENDIMENTO))
+    
     def encerrar_contas_poupanca(self):
-        """Encerra todas as threads de rendimento ao fechar o app."""
-        for conta in self._contas:
-            if isinstance(conta, ContaPoupanca):
-                conta.encerrar()
-                # Força um último salvamento
-                if hasattr(conta, '_banco'):
-                    conta._banco._salvar_dados()
-        self._contas_poupanca_ativas = []
+        """Para o agendador de rendimentos ao fechar o app.
+        
+        Também aguarda o fim das gravações pendentes (inclusive as em segundo
+        plano) antes de fechar o armazenamento; o que uma gravação em segundo
+        plano não conseguiu gravar é tentado mais uma vez.
+        """
+        self._agendador.parar()
+        self.flush()
+        self.db_manager.drain()
+        self.flush()
+        self.db_manager.close()
 
     def verificar_senhas(self):
         """Verifica todas as contas por senhas ausentes"""
@@ -182,49 +401,247 @@ class Banco:
             elif not conta.senha_hash:
                 print(f"AVISO: Conta {conta.get_numero()} tem senha_hash vazio")
 
-    def _salvar_dados(self):
-        """Salva dados no arquivo JSON com tratamento de erros"""
+    def _registrar_alteracao(self, obj):
+        """Marca um usuário ou conta para ser serializado no próximo salvamento."""
+        self._sujos.add(obj)
+
+    def _fragmento(self, obj):
+        """Retorna o dicionário serializado do objeto, usando o cache se limpo.
+        
+        Na conta alterada, só os campos são serializados de novo; o histórico
+        vem de _historico_serializado, que converte apenas as entradas novas.
+        """
+        fragmento = self._fragmentos.get(obj)
+        if fragmento is None or obj._alterado:
+            if isinstance(obj, Usuario):
+                fragmento = obj.to_dict()
+            else:
+                if not hasattr(obj, 'senha_hash'):
+                    obj.senha_hash = ""
+                fragmento = self._conta_to_dict(obj, historico=False)
+                fragmento['historico'] = self._historico_serializado(obj)
+                obj.get_historico()._alterado = False
+            obj._alterado = False
+            self._fragmentos[obj] = fragmento
+        return fragmento
+
+    def _historico_serializado(self, conta):
+        """Parte em memória do histórico como lista de dicionários, convertendo só as entradas novas.
+        
+        A lista em cache é estendida com as entradas incluídas desde a última
+        chamada (e perde as que foram seladas em segmentos). Ela é refeita só
+        se o conteúdo do histórico foi substituído. Cada chamada devolve uma
+        lista nova, que reaproveita os dicionários já montados, porque a
+        anterior pode estar sendo gravada em outro thread.
+        """
+        historico = conta.get_historico()
+        estado, total = self._estado_historico(conta)
+        cache = self._historicos_serializados.get(conta)
+        if cache is None or cache[0][0] != estado[0] or cache[1] + len(cache[2]) > total:
+            lista = historico.to_dict()
+        else:
+            _, inicio, lista = cache
+            base = historico._base
+            fim = inicio + len(lista)
+            if base > inicio:
+                lista = lista[base - inicio:]
+            elif fim == total:
+                return lista
+            lista = lista + list(historico.iterar(max(fim, base)))
+        self._historicos_serializados[conta] = (estado, historico._base, lista)
+        return lista
+
+    @staticmethod
+    def _estado_historico(conta):
+        """((geração, base), tamanho) do histórico da conta, como em _historicos_gravados."""
+        historico = conta.get_historico()
+        return (historico._geracao, historico._base), len(historico)
+
+    def _registro_conta(self, conta):
+        """Registro incremental de uma conta, com só as entradas novas do histórico.
+
+        Se desde a última gravação o histórico apenas recebeu entradas, o
+        registro traz os campos da conta e as entradas a partir da posição
+        'historico_desde' (em 'historico_novos'), que são anexadas ao
+        histórico já gravado. Na primeira gravação da conta, depois de selar
+        entradas antigas ou de uma falha, traz a conta completa.
+        """
+        estado, total = self._estado_historico(conta)
+        gravado = self._historicos_gravados.get(conta)
+        if gravado is None or gravado[0] != estado or gravado[1] > total:
+            registro = {'op': 'conta', 'dados': self._fragmento(conta)}
+            # Os próximos registros são parciais: o cache só ocuparia memória
+            self._fragmentos.pop(conta, None)
+            self._historicos_serializados.pop(conta, None)
+        else:
+            if not hasattr(conta, 'senha_hash'):
+                conta.senha_hash = ""
+            historico = conta.get_historico()
+            registro = {'op': 'conta',
+                        'dados': self._conta_to_dict(conta, historico=False),
+                        'historico_desde': gravado[1],
+                        'historico_novos': list(historico.iterar(gravado[1]))}
+            conta._alterado = False
+            historico._alterado = False
+            # O fragmento completo em cache ficou desatualizado
+            self._fragmentos.pop(conta, None)
+        self._historicos_gravados[conta] = (estado, total)
+        return registro
+
+    def _salvar_dados(self, *alterados):
+        """Solicita a persistência das alterações pendentes (group commit).
+        
+        Dentro de um bloco ``batch()`` ou com ``janela_commit`` > 0, o pedido
+        apenas é registrado e todas as alterações acumuladas são gravadas de
+        uma vez no fim do bloco/janela. Caso contrário, grava imediatamente.
+        """
+        for obj in alterados:
+            obj._alterado = True
+            self._registrar_alteracao(obj)
+        
+        # Quem está em um batch() não pode esperar pela trava de gravação:
+        # a gravação em andamento espera o batch terminar
+        with self._trava_lote:
+            if self._profundidade_lote:
+                return
+        with self._trava_commit:
+            if self._janela_commit > 0:
+                if self._timer_commit is None:
+                    self._timer_commit = threading.Timer(self._janela_commit, self._flush_agendado)
+                    self._timer_commit.daemon = True
+                    self._timer_commit.start()
+                return
+            self._gravar_pendentes()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa todas as gravações do bloco em uma única escrita física.
+        
+        A escrita acontece no fim do bloco (ou no fim da janela de commit,
+        se configurada). Todas as alterações de estado do banco acontecem
+        dentro de um batch, no modo compartilhado da trava de leitura/escrita:
+        vários threads podem alterar ao mesmo tempo, e a captura do estado a
+        gravar espera os blocos em andamento terminarem.
+        
+        Exemplo:
+            with banco.batch():
+                conta.realizar_transacao(Deposito(100))
+                conta.realizar_transacao(Saque(50))
+        """
+        with self._adiar_gravacao(), self._trava.leitura():
+            yield self
+    
+    @contextmanager
+    def _adiar_gravacao(self):
+        """Adia a persistência até o fim do bloco, sem travar alterações.
+        
+        Usado por quem coordena alterações feitas em outros threads (cada uma
+        em seu próprio batch), como o MotorTransacoes: a gravação acontece
+        uma vez, quando o último bloco aberto termina.
+        """
+        with self._trava_lote:
+            self._profundidade_lote += 1
         try:
-            for conta in self._contas:
-                if isinstance(conta, ContaPoupanca):
-                    conta._rodando = False
-            
-            for conta in self._contas:
-                if not hasattr(conta, 'senha_hash'):
-                    conta.senha_hash = ""
-            
-            dados = {
-                'usuarios': [u.to_dict() for u in self._usuarios],
-                'contas': [self._conta_to_dict(c) for c in self._contas],
-                'ultimo_numero_conta': self._ultimo_numero_conta
-            }
-            
-            self.db_manager.save_data(dados)
-            
-            for conta in self._contas:
-                if isinstance(conta, ContaPoupanca) and not conta._rodando:
-                    conta._rodando = True
-                    if conta._thread_rendimento is None or not conta._thread_rendimento.is_alive():
-                        conta._iniciar_rendimento_automatico()
-                    
+            yield
+        finally:
+            with self._trava_lote:
+                self._profundidade_lote -= 1
+                fim = self._profundidade_lote == 0
+            if fim:
+                self._salvar_dados()
+
+    def flush(self):
+        """Grava imediatamente todas as alterações pendentes (fora de um batch)."""
+        with self._trava_commit:
+            if self._timer_commit is not None:
+                self._timer_commit.cancel()
+                self._timer_commit = None
+            self._gravar_pendentes()
+
+    def _flush_agendado(self):
+        """Fim da janela de commit; um bloco batch() aberto grava ao terminar."""
+        with self._trava_commit:
+            self._timer_commit = None
+            with self._trava_lote:
+                em_lote = self._profundidade_lote
+            if not em_lote:
+                self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        """Grava as alterações pendentes com tratamento de erros.
+        
+        Só os usuários/contas marcados como alterados são serializados de
+        novo; os demais reaproveitam o fragmento em cache. Em armazenamentos
+        incrementais (journal ou SQLite), apenas as alterações e remoções são
+        gravadas.
+        
+        O estado é capturado no modo exclusivo da trava (sem alterações em
+        andamento); a escrita em disco acontece depois, já fora dela, sem
+        parar o agendador de rendimentos nem outros threads.
+        """
+        with self._trava.escrita():
+            sujos, self._sujos = self._sujos, set()
+            removidos, self._removidos = self._removidos, []
+            ultimo = self._ultimo_numero_conta
+            if not sujos and not removidos and ultimo == self._ultimo_numero_persistido:
+                return
+            try:
+                if self.db_manager.incremental:
+                    registros = [
+                        {'op': 'usuario', 'dados': self._fragmento(obj)}
+                        if isinstance(obj, Usuario) else self._registro_conta(obj)
+                        for obj in sujos
+                    ]
+                    registros.extend(removidos)
+                    if ultimo != self._ultimo_numero_persistido:
+                        registros.append({'op': 'ultimo_numero_conta', 'valor': ultimo})
+                    dados = None
+                else:
+                    dados = {
+                        'usuarios': [self._fragmento(u) for u in self._usuarios],
+                        'contas': [self._fragmento(c) for c in self._contas],
+                        'ultimo_numero_conta': ultimo
+                    }
+            except Exception as e:
+                self._manter_pendentes(sujos, removidos, e)
+                return
+        
+        def falhou(erro):
+            # Gravação em segundo plano: as alterações voltam a ficar pendentes
+            with self._trava.escrita():
+                self._ultimo_numero_persistido = None
+                self._manter_pendentes(sujos, removidos, erro)
+        
+        try:
+            if dados is None:
+                self.db_manager.apply_records(registros, on_failure=falhou)
+            else:
+                self.db_manager.save_data(dados, on_failure=falhou)
+            self._ultimo_numero_persistido = ultimo
         except Exception as e:
-            print(f"ERRO AO SALVAR DADOS: {str(e)}")
-            traceback.print_exc()
+            with self._trava.escrita():
+                self._manter_pendentes(sujos, removidos, e)
 
-    def _conta_to_dict(self, conta):
-        """Converte objeto Conta para dicionário garantindo que todos os campos são serializáveis."""
-        dados = conta.to_dict()
+    def _manter_pendentes(self, sujos, removidos, erro):
+        """Devolve as alterações não gravadas à fila para a próxima tentativa."""
+        for obj in sujos:
+            obj._alterado = True
+            # O próximo registro da conta vai completo
+            self._historicos_gravados.pop(obj, None)
+        self._sujos |= sujos
+        self._removidos = removidos + self._removidos
+        print(f"ERRO AO SALVAR DADOS: {str(erro)}")
+        traceback.print_exc()
+
+    def _conta_to_dict(self, conta, historico=True):
+        """Converte objeto Conta para dicionário (para persistência).
         
-        def convert_decimal(obj):
-            if isinstance(obj, Decimal):
-                return float(obj)
-            elif isinstance(obj, dict):
-                return {k: convert_decimal(v) for k, v in obj.items()}
-            elif isinstance(obj, (list, tuple)):
-                return [convert_decimal(item) for item in obj]
-            return obj
+        Valores Dinheiro ficam como estão: o DecimalEncoder os grava como número.
         
-        dados = convert_decimal(dados)
+        Args:
+            historico: Inclui as entradas em memória do histórico
+        """
+        dados = conta.to_dict(historico)
         
         if 'data_ultimo_saque' in dados and dados['data_ultimo_saque']:
             if isinstance(dados['data_ultimo_saque'], date):
@@ -236,26 +653,67 @@ class Banco:
         return dados
     def _buscar_usuario(self, cpf):
         """Busca usuário pelo CPF (com ou sem formatação)"""
-        cpf_limpo = cpf.replace(".", "").replace("-", "")
-        
-        for usuario in self._usuarios:
-            usuario_cpf_limpo = usuario.get_cpf().replace(".", "").replace("-", "")
-            if usuario_cpf_limpo == cpf_limpo:
-                return usuario
-        return None
+        return self._usuarios_por_cpf.get(cpf.replace(".", "").replace("-", ""))
+    
+    def buscar_conta(self, numero):
+        """Busca uma conta pelo número; retorna None se não existir."""
+        return self._contas_por_numero.get(numero)
     
 
     def realizar_transacao(self, transacao):
         """Registra uma transação na conta e salva os dados"""
         try:
-            if transacao.registrar(self):
-                self._salvar_dados()  
-                return True
+            with self.batch():
+                if transacao.registrar(self):
+                    self._salvar_dados()  
+                    return True
             return False
         except Exception as e:
             print(f"Erro na transação: {str(e)}")
             return False
 
+    def executar_transacoes(self, operacoes, trabalhadores=None, tamanho_lote=1000):
+        """
+        Executa um fluxo de transações em paralelo (ver MotorTransacoes).
+        
+        Operações sobre contas independentes rodam ao mesmo tempo; as que
+        compartilham contas são executadas em ordem de chegada. Cada lote é
+        gravado uma única vez.
+        
+        Args:
+            operacoes: Iterável de pares (conta, transacao)
+            trabalhadores (int): Threads do pool (padrão: número de CPUs)
+            tamanho_lote (int): Operações por lote
+        
+        Returns:
+            RelatorioExecucao: Contagens, vazão e latências
+        """
+        motor = MotorTransacoes(self, trabalhadores, tamanho_lote)
+        return motor.executar(operacoes)
+
+    def ultimas_movimentacoes(self, n=10):
+        """
+        Últimas movimentações de todas as contas, da mais recente para a mais antiga.
+        
+        Faz um merge por heap dos históricos das contas, cada um percorrido do
+        fim para o começo em ordem cronológica: custa O(contas + n log contas)
+        e não monta, copia nem altera as entradas guardadas.
+        
+        Args:
+            n (int): Quantidade de movimentações
+        
+        Returns:
+            list: Movimentacao (conta e posição da entrada no histórico)
+        """
+        def recentes(conta):
+            historico = conta.get_historico()
+            for indice in historico.indices_recentes():
+                yield historico.segundos(indice), conta, indice
+
+        fluxos = [recentes(conta) for conta in list(self._contas)]
+        mescladas = heapq.merge(*fluxos, key=lambda item: item[0], reverse=True)
+        return [Movimentacao(conta, indice) for _, conta, indice in islice(mescladas, max(n, 0))]
+
     def get_usuarios(self):
         """Retorna lista de usuários."""
         return self._usuarios
@@ -278,10 +736,47 @@ class Banco:
             raise ValueError("Usuário com este CPF já existe")
         
         usuario = Usuario(nome, cpf, data_nascimento, endereco)
-        self._usuarios.append(usuario)
-        self._salvar_dados()
+        usuario._banco = self
+        with self.batch():
+            self._usuarios.append(usuario)
+            self._usuarios_por_cpf[usuario._cpf] = usuario
+            self._salvar_dados(usuario)
         return usuario
     
+    def remover_usuario(self, cpf):
+        """Remove um usuário e todas as suas contas do sistema."""
+        usuario = self._buscar_usuario(cpf)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        
+        with self.batch():
+            for conta in usuario.get_contas():
+                if isinstance(conta, ContaPoupanca):
+                    self._agendador.cancelar(conta)
+                if conta in self._contas:
+                    self._contas.remove(conta)
+                self._contas_por_numero.pop(conta.get_numero(), None)
+                self._descartar(conta)
+                self._removidos.append({'op': 'remover_conta', 'numero': conta.get_numero()})
+            
+            self._usuarios.remove(usuario)
+            self._usuarios_por_cpf.pop(usuario._cpf, None)
+            self._descartar(usuario)
+            self._removidos.append({'op': 'remover_usuario', 'cpf': usuario.to_dict()['cpf']})
+            self._salvar_dados()
+    
+    def _descartar(self, obj):
+        """Desvincula um objeto removido do banco e do cache de persistência."""
+        self._sujos.discard(obj)
+        self._fragmentos.pop(obj, None)
+        self._historicos_gravados.pop(obj, None)
+        self._historicos_serializados.pop(obj, None)
+        if isinstance(obj, Conta):
+            # Os arquivos são apagados pelo DatabaseManager quando a remoção for gravada
+            obj.get_historico().fechar_segmentos()
+        if hasattr(obj, '_banco'):
+            del obj._banco
+    
     def criar_conta_corrente(self, cpf, senha):
         """Cria uma nova conta corrente verificando se já existe uma para o CPF"""
         if not valida_senha(senha, 4):
@@ -299,10 +794,14 @@ class Banco:
         numero = self._proximo_numero_conta()
         conta = ContaCorrente(usuario, numero)
         conta.senha_hash = self._hash_senha(senha)
+        conta._banco = self
+        self._vincular_historico(conta)
         
-        self._contas.append(conta)
-        usuario.add_conta(conta)
-        self._salvar_dados()
+        with self.batch():
+            self._contas.append(conta)
+            self._contas_por_numero[numero] = conta
+            usuario.add_conta(conta)
+            self._salvar_dados(conta, usuario)
         
         return conta
 
@@ -323,10 +822,15 @@ class Banco:
         numero = self._proximo_numero_conta()
         conta = ContaPoupanca(usuario, numero)
         conta.senha_hash = self._hash_senha(senha)
+        conta._banco = self
+        self._vincular_historico(conta)
         
-        self._contas.append(conta)
-        usuario.add_conta(conta)
-        self._salvar_dados()
+        with self.batch():
+            self._contas.append(conta)
+            self._contas_por_numero[numero] = conta
+            usuario.add_conta(conta)
+            self._agendar_rendimento(conta)
+            self._salvar_dados(conta, usuario)
         
         return conta
 
@@ -350,23 +854,21 @@ class Banco:
             cpf_limpo = cpf.replace(".", "").replace("-", "")
             senha_hash = self._hash_senha(senha)
             
-            for conta in self._contas:
-                conta_cpf = conta.get_cliente().get_cpf().replace(".", "").replace("-", "")
+            conta = self._contas_por_numero.get(numero)
+            if conta is not None and conta.get_cliente()._cpf == cpf_limpo:
+                # Debug
+                print(f"Hash armazenado: {conta.senha_hash}")
+                print(f"Hash fornecido: {senha_hash}")
+                
+                if not conta.senha_hash:
+                    print("AVISO: Conta sem senha_hash definido!")
+                    return None
                 
-                if conta_cpf == cpf_limpo and conta.get_numero() == numero:
-                    # Debug
-                    print(f"Hash armazenado: {conta.senha_hash}")
-                    print(f"Hash fornecido: {senha_hash}")
-                    
-                    if not conta.senha_hash:
-                        print("AVISO: Conta sem senha_hash definido!")
-                        return None
-                    
-                    if conta.senha_hash == senha_hash:
-                        return conta
-                    else:
-                        print("Senha não corresponde")
-                        return None
+                if conta.senha_hash == senha_hash:
+                    return conta
+                else:
+                    print("Senha não corresponde")
+                    return None
             
             print("Conta não encontrada")
             return None
@@ -380,4 +882,5 @@ class Banco:
             if not hasattr(conta, 'senha_hash') or not conta.senha_hash:
                 print(f"Corrigindo conta {conta.get_numero()}") 
                 conta.senha_hash = self._hash_senha(senha_padrao)
+                conta._marcar_alterado()
         self._salvar_dados()
\ No newline at end of file
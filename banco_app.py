@@ -7,17 +7,24 @@ from pessoa import Usuario
 from conta import ContaCorrente, ContaPoupanca
 from transacao import Deposito, Saque, Transferencia
 from datetime import datetime, timedelta
+from itertools import islice
 import os
 
 class BankAppTkinter:
     def __init__(self, root):
         self.root = root
-        self.banco = Banco()
+        self.banco = Banco(gravacao_assincrona=True, ao_falhar_gravacao=self._erro_gravacao)
         self.current_account = None
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.setup_ui()
 
+    def _erro_gravacao(self, erro):
+        """Informa falhas da gravação em segundo plano (chamado fora da thread do Tk)."""
+        print(f"Erro ao salvar dados: {str(erro)}")
+        self.root.after(0, lambda: messagebox.showerror(
+            "Erro", f"Falha ao salvar dados: {str(erro)}", parent=self.root))
+
     def mostrar_rendimento_tempo_real(self):
         """Mostra o rendimento em tempo real da poupança."""
         if not isinstance(self.current_account, ContaPoupanca):
@@ -402,46 +409,22 @@ class BankAppTkinter:
 
     def get_recent_transactions(self, limit=10):
         """Retorna as últimas transações de todas as contas"""
-        all_transactions = []
-        for conta in self.banco.get_contas():
-            historico = conta.get_historico().get_transacoes()
-            for trans in historico:
-                trans['conta_numero'] = conta.get_numero()
-                trans['conta_tipo'] = "Corrente" if isinstance(conta, ContaCorrente) else "Poupança"
-                all_transactions.append(trans)
-        
-        all_transactions.sort(key=lambda x: x['data'], reverse=True)
-        
-        return all_transactions[:limit]
+        return self.banco.ultimas_movimentacoes(limit)
 
     def update_recent_transactions(self):
         """Atualiza a tabela de transações recentes no dashboard"""
         for item in self.dashboard_tree.get_children():
             self.dashboard_tree.delete(item)
         
-        transactions = self.get_recent_transactions()
-        
-        for trans in transactions:
-            valor = trans['valor']
-            saldo = trans.get('saldo_atual', 0)
+        for movimentacao in self.get_recent_transactions():
+            conta = movimentacao.conta
+            conta_tipo = "Corrente" if isinstance(conta, ContaCorrente) else "Poupança"
 
-            data = trans['data']
-            if isinstance(data, str):
-                try:
-                    data = datetime.strptime(data, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    try:
-                        data = datetime.strptime(data, "%d/%m/%Y %H:%M:%S") 
-                    except ValueError:
-                        print(f"[ERRO] Data inválida: {data}")
-                        continue
-            
             self.dashboard_tree.insert("", "end", values=(
-                data.strftime("%d/%m/%Y %H:%M"),
-                f"{trans['conta_numero']} ({trans['conta_tipo']})",
-                trans['tipo'],
-                f"{valor:,.2f}",
-                f"{saldo:,.2f}"
+                movimentacao.momento.strftime("%d/%m/%Y %H:%M"),
+                f"{conta.get_numero()} ({conta_tipo})",
+                movimentacao.tipo,
+                f"{movimentacao.valor:,.2f}"
             ))
 
 
@@ -606,15 +589,8 @@ class BankAppTkinter:
         
         if messagebox.askyesno("Confirmar", f"Excluir cliente {values[1]}?", parent=self.root):
             try:
-                # Remove todas as contas do cliente primeiro
-                usuario = self.banco._buscar_usuario(cpf)
-                if usuario:
-                    for conta in usuario.get_contas():
-                        self.banco._contas.remove(conta)
-                
-                # Remove o usuário
-                self.banco._usuarios.remove(usuario)
-                self.banco._salvar_dados()
+                # Remove o usuário e todas as suas contas
+                self.banco.remover_usuario(str(cpf))
                 
                 self.update_clientes_table()
                 self.update_contas_table()
@@ -1107,11 +1083,7 @@ class BankAppTkinter:
             if valor <= 0:
                 raise ValueError("O valor deve ser positivo")
                 
-            conta_destino = None
-            for c in self.banco.get_contas():
-                if c.get_numero() == numero_destino:
-                    conta_destino = c
-                    break
+            conta_destino = self.banco.buscar_conta(numero_destino)
             
             if conta_destino:
                 transacao = Transferencia(valor, conta_destino)
@@ -1164,9 +1136,22 @@ class BankAppTkinter:
         
         scrollbar.config(command=extrato_text.yview)
         
-        extrato = self.current_account.gerar_extrato()
-        extrato_text.insert(tk.END, extrato)
+        # Insere o extrato em blocos de linhas, sem montá-lo inteiro em memória
+        # nem travar a janela em contas com histórico longo
+        linhas = self.current_account.extrato().linhas()
+        
+        def inserir_bloco():
+            if not extrato_text.winfo_exists():
+                return
+            bloco = list(islice(linhas, 500))
+            if bloco:
+                extrato_text.config(state=tk.NORMAL)
+                extrato_text.insert(tk.END, "\n".join(bloco) + "\n")
+                extrato_text.config(state=tk.DISABLED)
+                extrato_window.after(1, inserir_bloco)
+        
         extrato_text.config(state=tk.DISABLED)
+        inserir_bloco()
         
         ttk.Button(main_frame, text="Fechar", 
                   command=extrato_window.destroy).pack(pady=10)
@@ -1210,20 +1195,14 @@ class BankAppTkinter:
         historico_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        transacoes = self.current_account.get_historico().get_transacoes()
-        saldo = 0
+        historico = self.current_account.get_historico()
         
-        for transacao in transacoes:
-            if transacao['tipo'] == 'Deposito':
-                saldo += transacao['valor']
-            else:
-                saldo -= transacao['valor']
-            
+        for indice, transacao in enumerate(historico.get_transacoes()):
             historico_tree.insert("", tk.END, values=(
                 transacao['data'],
                 transacao['tipo'],
-                f"{transacao['valor']:,.2f}",
-                f"{saldo:,.2f}"
+                f"{historico.movimento(indice):+,.2f}",
+                f"{historico.saldo_apos(indice):,.2f}"
             ))
         
         ttk.Button(main_frame, text="Fechar", 
@@ -1364,7 +1343,7 @@ class BankAppTkinter:
     def on_close(self):
         """Executado quando a janela principal é fechada"""
         try:
-            self.banco._salvar_dados()  
+            self.banco.encerrar_contas_poupanca()
             self.root.destroy()
         except Exception as e:
             print(f"Erro ao salvar dados: {str(e)}")
@@ -1372,11 +1351,7 @@ class BankAppTkinter:
     def on_closing(self):
         """Executado quando a janela principal é fechada"""
         try:
-            for conta in self.banco.get_contas():
-                if isinstance(conta, ContaPoupanca):
-                    conta.encerrar()
-            
-            self.banco._salvar_dados()
+            self.banco.encerrar_contas_poupanca()
             self.root.destroy()
         except Exception as e:
             print(f"Erro ao fechar aplicação: {str(e)}")
@@ -0,0 +1,87 @@
+"""Benchmark da inicialização do Banco: JSON completo x snapshot binário.
+
+Gera um arquivo sintético com N clientes (conta corrente para todos e
+poupança para 1 em cada 10), cada conta com um histórico de transações, e
+mede o tempo de ``Banco(...)`` nos dois caminhos de carga.
+
+Uso:
+    python benchmarks/bench_inicializacao.py [N ...]
+"""
+from datetime import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from banco import Banco
+from database_manager import DatabaseManager
+
+TRANSACOES_POR_CONTA = 20
+
+
+def gerar_dados(n):
+    """Monta dados sintéticos no formato do arquivo JSON."""
+    usuarios, contas = [], []
+    numero = 0
+    # Sem rendimento retroativo pendente, para medir apenas a carga
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    historico = [{'tipo': 'Deposito', 'valor': 10.0 + i, 'data': '01/01/2024 10:00:00'}
+                 for i in range(TRANSACOES_POR_CONTA)]
+    for i in range(n):
+        cpf = f"{i:011d}"
+        usuario = {'nome': f"Cliente Numero {chr(65 + i % 26)}", 'cpf': cpf,
+                   'data_nascimento': '01/01/1990', 'endereco': 'Rua de Teste, 100', 'contas': []}
+        numero += 1
+        contas.append({'numero': numero, 'cpf_cliente': cpf, 'saldo': 1234.56,
+                       'historico': list(historico), 'senha_hash': 'x' * 64, 'tipo': 'corrente',
+                       'limite': 500.0, 'limite_saques': 3, 'saques_realizados': 1,
+                       'data_ultimo_saque': '2024-01-01', 'emprestimos': []})
+        usuario['contas'].append(numero)
+        if i % 10 == 0:
+            numero += 1
+            contas.append({'numero': numero, 'cpf_cliente': cpf, 'saldo': 100.0,
+                           'historico': list(historico), 'senha_hash': 'x' * 64,
+                           'tipo': 'poupanca', 'taxa_rendimento': 0.05,
+                           'ultima_atualizacao': agora})
+            usuario['contas'].append(numero)
+        usuarios.append(usuario)
+    return {'usuarios': usuarios, 'contas': contas, 'ultimo_numero_conta': numero}
+
+
+def medir(arquivo, snapshot_binario):
+    inicio = time.perf_counter()
+    banco = Banco(arquivo, snapshot_binario=snapshot_binario)
+    decorrido = time.perf_counter() - inicio
+    banco._agendador.parar()
+    return decorrido, len(banco.get_contas())
+
+
+def main():
+    tamanhos = [int(n) for n in sys.argv[1:]] or [1000, 5000]
+    print(f"{'clientes':>9} {'contas':>7} {'json (s)':>9} {'snap (s)':>9} {'ganho':>6}"
+          f" {'json MB':>8} {'snap MB':>8}")
+    for n in tamanhos:
+        diretorio = tempfile.mkdtemp()
+        try:
+            arquivo = os.path.join(diretorio, 'banco_ufs.json')
+            DatabaseManager(arquivo, backup_every=10 ** 9,
+                            binary_snapshot=True).save_data(gerar_dados(n))
+
+            tempo_json, contas = medir(arquivo, snapshot_binario=False)
+            dm = DatabaseManager(arquivo, binary_snapshot=True)
+            dm.backend.write_snapshot()
+            tempo_snap, _ = medir(arquivo, snapshot_binario=True)
+
+            tamanho_json = os.path.getsize(arquivo) / 2 ** 20
+            tamanho_snap = os.path.getsize(dm.backend.snapshot_path) / 2 ** 20
+            print(f"{n:>9} {contas:>7} {tempo_json:>9.3f} {tempo_snap:>9.3f}"
+                  f" {tempo_json / tempo_snap:>5.1f}x {tamanho_json:>8.2f} {tamanho_snap:>8.2f}")
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
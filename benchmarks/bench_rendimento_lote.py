@@ -0,0 +1,71 @@
+"""Benchmark do rendimento da poupança: conta a conta x em lote.
+
+Mede a vazão (contas/s) de um período de rendimento aplicado por um laço
+de referência, conta a conta com ``Dinheiro * taxa``, e por
+``rendimento.aplicar_lote`` (NumPy se instalado, senão módulo array).
+Cada forma roda sobre a sua cópia das contas, e os saldos finais das duas
+são comparados. A persistência não entra na medição.
+
+Uso:
+    python benchmarks/bench_rendimento_lote.py [N ...]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from conta import ContaPoupanca
+from dinheiro import Dinheiro
+from pessoa import Usuario
+import rendimento
+
+
+def criar_contas(n, cliente):
+    contas = []
+    for numero in range(1, n + 1):
+        conta = ContaPoupanca(cliente, numero, taxa_rendimento=0.005)
+        conta._saldo = Dinheiro(100 + numero % 1000)
+        contas.append(conta)
+    return contas
+
+
+def medir(funcao, contas):
+    inicio = time.perf_counter()
+    funcao(contas)
+    return time.perf_counter() - inicio
+
+
+def por_conta(contas):
+    """Referência: o rendimento de um período, conta a conta."""
+    agora = datetime.now()
+    for conta in contas:
+        if conta._saldo > 0:
+            rendimento_conta = conta._saldo * conta._taxa_rendimento
+            conta._saldo += rendimento_conta
+            conta._ultima_atualizacao = agora
+            conta._historico.registrar_valor('Rendimento', rendimento_conta, agora)
+
+
+def main():
+    tamanhos = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    cliente = Usuario("Cliente Teste", "52998224725", "01/01/1990", "Rua de Teste, 100")
+    motor = "numpy" if rendimento.numpy is not None else "array"
+    print(f"motor vetorizado: {motor}")
+    print(f"{'contas':>9} {'por conta (s)':>14} {'lote (s)':>9} {'contas/s lote':>14} {'ganho':>6}")
+    for n in tamanhos:
+        individuais = criar_contas(n, cliente)
+        tempo_individual = medir(por_conta, individuais)
+        em_lote = criar_contas(n, cliente)
+        tempo_lote = medir(rendimento.aplicar_lote, em_lote)
+        assert all(a._saldo == b._saldo and len(a._historico) == len(b._historico) == 1
+                   for a, b in zip(individuais, em_lote)), \
+            "Rendimento em lote diverge do aplicado conta a conta"
+        print(f"{n:>9} {tempo_individual:>14.3f} {tempo_lote:>9.3f}"
+              f" {n / tempo_lote:>14,.0f} {tempo_individual / tempo_lote:>5.1f}x")
+        del individuais, em_lote
+
+
+if __name__ == '__main__':
+    main()
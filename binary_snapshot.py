@@ -0,0 +1,231 @@
+"""Snapshot binário compacto dos dados do banco, para inicialização rápida.
+
+O formato é colunar: cada campo de usuário/conta é uma coluna (listas ou
+``array`` tipados), com datas já convertidas em números e valores monetários
+em centavos inteiros (lidos de volta como ``Dinheiro``). O conteúdo é serializado com ``marshal``, que é muito
+mais rápido de ler do que JSON indentado.
+
+Um snapshot só é válido para o arquivo JSON cuja impressão digital (tamanho e
+mtime) ele registra; qualquer outra escrita no JSON o invalida.
+"""
+from array import array
+from datetime import date, datetime, timedelta
+import json
+import marshal
+
+from dinheiro import Dinheiro
+
+MAGIC = b'UFSBANK-SNAP2\n'
+EPOCA = datetime(1970, 1, 1)
+
+TIPO_CORRENTE = 1
+TIPO_POUPANCA = 2
+
+
+def fingerprint(path):
+    """Impressão digital do arquivo JSON ao qual o snapshot corresponde."""
+    stat = path.stat()
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _json_default(obj):
+    """Mesma conversão do DecimalEncoder para campos guardados como JSON."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return float(obj)
+
+
+def _centavos(valor):
+    """Converte para centavos; devolve também os centavos que não cabem na coluna.
+
+    Valores fora da faixa de um inteiro de 64 bits vão para a coluna esparsa
+    (o marshal grava inteiros de qualquer tamanho).
+    """
+    centavos = Dinheiro(valor).centavos
+    if not -2 ** 63 < centavos < 2 ** 63:
+        return 0, centavos
+    return centavos, None
+
+
+def _transacao(entrada):
+    """Entrada do histórico com o valor como número (o marshal não grava Dinheiro)."""
+    entrada = dict(entrada)
+    if isinstance(entrada.get('valor'), Dinheiro):
+        entrada['valor'] = float(entrada['valor'])
+    return entrada
+
+
+def encode(data, marca):
+    """
+    Monta o snapshot colunar a partir dos dados no formato do DatabaseManager.
+
+    Args:
+        data (dict): Dados completos (usuarios, contas, ultimo_numero_conta)
+        marca (tuple): Impressão digital do JSON correspondente
+
+    Returns:
+        bytes: Conteúdo do snapshot
+
+    Raises:
+        ValueError: Se algum valor não puder ser representado
+    """
+    usuarios = data['usuarios']
+    contas = data['contas']
+
+    numero = array('q')
+    tipo = array('b')
+    saldo = array('q')
+    saldo_grande = {}
+    limite = array('q')
+    limite_saques = array('q')
+    saques = array('q')
+    ultimo_saque = array('q')
+    taxa = array('d')
+    atualizacao = array('q')
+    cpf, senha, historico, emprestimos = [], [], [], []
+    arquivado = {}
+
+    for i, conta in enumerate(contas):
+        numero.append(int(conta['numero']))
+        cpf.append(conta['cpf_cliente'])
+        senha.append(conta.get('senha_hash', "") or "")
+        centavos, grande = _centavos(conta.get('saldo', 0.0))
+        saldo.append(centavos)
+        if grande is not None:
+            saldo_grande[i] = grande
+        historico.append([_transacao(t) for t in conta.get('historico', [])])
+        if conta.get('historico_arquivado'):
+            arquivado[i] = conta['historico_arquivado']
+
+        if conta['tipo'] == 'corrente':
+            tipo.append(TIPO_CORRENTE)
+            centavos, grande = _centavos(conta.get('limite', 500.0))
+            if grande is not None:
+                raise ValueError(f"Limite da conta {conta['numero']} fora da faixa")
+            limite.append(centavos)
+            limite_saques.append(int(conta.get('limite_saques', 3)))
+            saques.append(int(conta.get('saques_realizados', 0)))
+            data_saque = conta.get('data_ultimo_saque')
+            ultimo_saque.append(
+                datetime.strptime(data_saque, "%Y-%m-%d").date().toordinal() if data_saque else 0)
+            emprestimos.append(json.dumps(conta.get('emprestimos', []), default=_json_default))
+            taxa.append(0.0)
+            atualizacao.append(0)
+        else:
+            tipo.append(TIPO_POUPANCA)
+            taxa.append(float(conta.get('taxa_rendimento', 0.05)))
+            ultima = datetime.strptime(conta['ultima_atualizacao'], "%Y-%m-%d %H:%M:%S")
+            atualizacao.append(int((ultima - EPOCA).total_seconds()))
+            limite.append(0)
+            limite_saques.append(0)
+            saques.append(0)
+            ultimo_saque.append(0)
+            emprestimos.append("[]")
+
+    payload = {
+        'marca': marca,
+        'ultimo_numero_conta': data['ultimo_numero_conta'],
+        'u_nome': [u['nome'] for u in usuarios],
+        'u_cpf': [u['cpf'] for u in usuarios],
+        'u_nascimento': [u['data_nascimento'] for u in usuarios],
+        'u_endereco': [u['endereco'] for u in usuarios],
+        'c_numero': numero.tobytes(),
+        'c_tipo': tipo.tobytes(),
+        'c_cpf': cpf,
+        'c_saldo': saldo.tobytes(),
+        'c_saldo_grande': saldo_grande,
+        'c_senha': senha,
+        'c_limite': limite.tobytes(),
+        'c_limite_saques': limite_saques.tobytes(),
+        'c_saques': saques.tobytes(),
+        'c_ultimo_saque': ultimo_saque.tobytes(),
+        'c_taxa': taxa.tobytes(),
+        'c_atualizacao': atualizacao.tobytes(),
+        'c_emprestimos': emprestimos,
+        'c_historico': historico,
+        'c_historico_arquivado': arquivado,
+    }
+    return MAGIC + marshal.dumps(payload)
+
+
+def _coluna(tipo, dados):
+    coluna = array(tipo)
+    coluna.frombytes(dados)
+    return coluna
+
+
+def decode(conteudo, marca):
+    """
+    Lê um snapshot, devolvendo None se ele não corresponder ao JSON atual.
+
+    Args:
+        conteudo (bytes): Conteúdo do arquivo de snapshot
+        marca (tuple): Impressão digital atual do JSON
+
+    Returns:
+        SnapshotColunar | None
+    """
+    if not conteudo.startswith(MAGIC):
+        return None
+    try:
+        payload = marshal.loads(conteudo[len(MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if tuple(payload.get('marca', ())) != tuple(marca):
+        return None
+    return SnapshotColunar(payload)
+
+
+class SnapshotColunar:
+    """Acesso às colunas de um snapshot já decodificado."""
+
+    def __init__(self, payload):
+        self.ultimo_numero_conta = payload['ultimo_numero_conta']
+        self.usuarios = list(zip(payload['u_nome'], payload['u_cpf'],
+                                 payload['u_nascimento'], payload['u_endereco']))
+        self._payload = payload
+
+    def contas(self):
+        """
+        Gera as contas com os campos já convertidos.
+
+        Yields:
+            dict: numero, tipo, cpf_cliente, saldo (Dinheiro), senha_hash, historico,
+                historico_arquivado (se houver) e os campos específicos de cada tipo (datas como date/datetime)
+        """
+        p = self._payload
+        numero = _coluna('q', p['c_numero'])
+        tipo = _coluna('b', p['c_tipo'])
+        saldo = _coluna('q', p['c_saldo'])
+        limite = _coluna('q', p['c_limite'])
+        limite_saques = _coluna('q', p['c_limite_saques'])
+        saques = _coluna('q', p['c_saques'])
+        ultimo_saque = _coluna('q', p['c_ultimo_saque'])
+        taxa = _coluna('d', p['c_taxa'])
+        atualizacao = _coluna('q', p['c_atualizacao'])
+        saldo_grande = p['c_saldo_grande']
+        arquivado = p.get('c_historico_arquivado', {})
+
+        for i in range(len(numero)):
+            conta = {
+                'numero': numero[i],
+                'cpf_cliente': p['c_cpf'][i],
+                'saldo': Dinheiro.de_centavos(saldo_grande.get(i, saldo[i])),
+                'senha_hash': p['c_senha'][i],
+                'historico': p['c_historico'][i],
+            }
+            if i in arquivado:
+                conta['historico_arquivado'] = arquivado[i]
+            if tipo[i] == TIPO_CORRENTE:
+                conta['tipo'] = 'corrente'
+                conta['limite'] = Dinheiro.de_centavos(limite[i])
+                conta['limite_saques'] = limite_saques[i]
+                conta['saques_realizados'] = saques[i]
+                conta['data_ultimo_saque'] = (
+                    date.fromordinal(ultimo_saque[i]) if ultimo_saque[i] else None)
+                conta['emprestimos'] = json.loads(p['c_emprestimos'][i])
+            else:
+                conta['tipo'] = 'poupanca'
+                conta['taxa_rendimento'] = taxa[i]
+                conta['ultima_atualizacao'] = EPOCA + timedelta(seconds=atualizacao[i])
+            yield conta
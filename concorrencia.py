@@ -0,0 +1,97 @@
+from contextlib import ExitStack, contextmanager
+import threading
+
+
+class TravaLeituraEscrita:
+    """Trava de leitura/escrita com preferência para escritores.
+
+    Vários threads podem estar no modo compartilhado ao mesmo tempo; o modo
+    exclusivo espera todos saírem e impede novas entradas enquanto aguarda.
+    O modo compartilhado é reentrante por thread (um thread que já o possui
+    não fica bloqueado por um escritor à espera).
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition(threading.Lock())
+        self._leitores = 0
+        self._escritor = None
+        self._escritores_esperando = 0
+        self._local = threading.local()
+
+    def _minhas_leituras(self):
+        return getattr(self._local, 'leituras', 0)
+
+    def adquirir_leitura(self):
+        """Entra no modo compartilhado."""
+        atual = self._minhas_leituras()
+        with self._condicao:
+            if not atual:
+                while self._escritor is not None or self._escritores_esperando:
+                    if self._escritor is threading.current_thread():
+                        break
+                    self._condicao.wait()
+            self._leitores += 1
+        self._local.leituras = atual + 1
+
+    def liberar_leitura(self):
+        """Sai do modo compartilhado."""
+        with self._condicao:
+            self._leitores -= 1
+            self._local.leituras = self._minhas_leituras() - 1
+            if not self._leitores:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        """Entra no modo exclusivo.
+
+        Raises:
+            RuntimeError: Se o thread estiver no modo compartilhado (deadlock)
+        """
+        if self._minhas_leituras():
+            raise RuntimeError("Thread no modo compartilhado não pode obter o modo exclusivo")
+        with self._condicao:
+            self._escritores_esperando += 1
+            try:
+                while self._escritor is not None or self._leitores:
+                    self._condicao.wait()
+            finally:
+                self._escritores_esperando -= 1
+            self._escritor = threading.current_thread()
+
+    def liberar_escrita(self):
+        """Sai do modo exclusivo."""
+        with self._condicao:
+            self._escritor = None
+            self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self):
+        """Bloco no modo compartilhado."""
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self):
+        """Bloco no modo exclusivo."""
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+@contextmanager
+def travar_contas(*contas):
+    """Bloco com as travas de várias contas, obtidas em ordem de número.
+
+    A ordem determinística evita deadlock entre operações que envolvem as
+    mesmas contas em sentidos opostos (ex.: transferências A→B e B→A).
+    """
+    travas = [conta._trava for conta in sorted(set(contas), key=lambda c: c.get_numero())]
+    with ExitStack() as pilha:
+        for trava in travas:
+            pilha.enter_context(trava)
+        yield
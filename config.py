@@ -1,2 +1,21 @@
 SENHA_TAMANHO = 4
-AGENCIA = "0001"
\ No newline at end of file
+AGENCIA = "0001"
+INTERVALO_RENDIMENTO = 60  # segundos entre rendimentos da poupança
+# 'periodico': o agendador aplica e grava o rendimento a cada intervalo.
+# 'sob_demanda': o saldo é calculado na leitura (juros compostos) e o
+# rendimento só é lançado no histórico em saques, depósitos e extratos.
+MODO_RENDIMENTO = 'periodico'
+MATERIALIZAR_RENDIMENTO_NO_EXTRATO = True
+# Ao iniciar, aplica (no modo periódico) o rendimento dos intervalos em que
+# o sistema ficou fora do ar, em um único lançamento por conta. Desligado
+# por padrão: com a taxa de demonstração (5% a cada INTERVALO_RENDIMENTO),
+# poucos dias parado já levam o saldo além da faixa representável.
+RENDIMENTO_RETROATIVO = False
+# Entradas do histórico de cada conta mantidas em memória; as mais antigas
+# são seladas em segmentos imutáveis em disco, ao lado do arquivo de dados.
+HISTORICO_EM_MEMORIA = 5000
+# Teto, em reais, do saldo alcançado pelo rendimento sob demanda: o saldo
+# com juros acumulados para nele (o excedente não é creditado) e saldos já
+# acima dele não rendem. Assim a leitura do saldo é sempre exata e nunca
+# falha, por mais tempo que a conta fique parada.
+TETO_RENDIMENTO_SOB_DEMANDA = 10 ** 15
\ No newline at end of file
@@ -1,41 +1,18 @@
-from datetime import datetime
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
 from decimal import Decimal
 import hashlib
 import os
 import threading
-import time
 from datetime import datetime
 
-class Historico:
-    """Classe responsável por registrar e gerenciar o histórico de transações da conta."""
-    
-    def __init__(self):
-        self._transacoes = []
-    
-    def adicionar_transacao(self, transacao):
-        """Adiciona uma transação ao histórico com data e hora."""
-        self._transacoes.append({
-            'tipo': transacao.__class__.__name__,
-            'valor': transacao.get_valor(),
-            'data': datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        })
-    
-    def gerar_extrato(self, saldo_atual):
-        """Gera um extrato formatado com todas as transações e saldo atual."""
-        extrato = "\n========== EXTRATO ==========\n"
-        if not self._transacoes:
-            extrato += "Não foram realizadas movimentações.\n"
-        else:
-            for transacao in self._transacoes:
-                extrato += (f"{transacao['data']} - {transacao['tipo']}: "
-                           f"R$ {transacao['valor']:.2f}\n")
-        extrato += f"\nSaldo atual: R$ {saldo_atual:.2f}\n"
-        extrato += "==========================="
-        return extrato
-    
-    def get_transacoes(self):
-        """Retorna a lista de transações."""
-        return self._transacoes
+from concorrencia import travar_contas
+from config import (INTERVALO_RENDIMENTO, MODO_RENDIMENTO, MATERIALIZAR_RENDIMENTO_NO_EXTRATO,
+                    TETO_RENDIMENTO_SOB_DEMANDA)
+from dinheiro import Dinheiro, ZERO
+from extrato import Extrato
+from historico import Historico
+from rendimento import montante_centavos
 
 class Conta:
     """Classe base para contas bancárias."""
@@ -43,9 +20,34 @@ class Conta:
     def __init__(self, cliente, numero):
         self._cliente = cliente
         self._numero = numero
-        self._saldo = 0.0
+        self._saldo = ZERO
         self._historico = Historico()
+        self._historico._ao_alterar = self._marcar_alterado
         self.senha_hash = ""  
+        self._alterado = True
+        self._trava = threading.RLock()
+    
+    def _marcar_alterado(self):
+        """Marca a conta como alterada para a próxima persistência incremental."""
+        self._alterado = True
+        banco = getattr(self, '_banco', None)
+        if banco is not None:
+            banco._registrar_alteracao(self)
+    
+    @contextmanager
+    def _em_lote(self, *outras):
+        """Contexto das alterações da conta: o batch() do banco, se vinculada,
+        e a trava desta conta (e de ``outras``, em ordem de número).
+        
+        Dentro dele a alteração não se mistura com a captura do estado que
+        está sendo gravado nem com outras operações nas mesmas contas, e a
+        persistência acontece uma vez no fim. As travas das contas são sempre
+        obtidas depois de entrar no batch.
+        """
+        banco = getattr(self, '_banco', None)
+        with banco.batch() if banco is not None else nullcontext():
+            with travar_contas(self, *outras):
+                yield
     
     def get_numero(self):
         """Retorna o número da conta."""
@@ -57,7 +59,8 @@ class Conta:
     
     def get_saldo(self):
         """Retorna o saldo atual da conta."""
-        return self._saldo
+        with self._trava:
+            return self._saldo
     
     def get_historico(self):
         """Retorna o histórico de transações."""
@@ -73,16 +76,18 @@ class Conta:
     def depositar(self, valor):
         """Realiza um depósito na conta com validação"""
         try:
-            if not isinstance(valor, (int, float, Decimal)):
+            if not isinstance(valor, (int, float, Decimal, Dinheiro)):
                 raise ValueError("Valor deve ser numérico")
                 
-            valor = Decimal(str(valor)).quantize(Decimal('0.01'))
+            valor = Dinheiro(valor)
             
             if valor <= 0:
                 raise ValueError("Valor do depósito deve ser positivo")
                 
-            self._saldo = float(Decimal(str(self._saldo)) + valor)
-            self._salvar_atualizacao() 
+            with self._em_lote():
+                self._saldo = self._saldo + valor
+                self._marcar_alterado()
+                self._salvar_atualizacao() 
             return True
             
         except Exception as e:
@@ -92,22 +97,21 @@ class Conta:
     def _salvar_atualizacao(self):
         """Força a atualização dos dados no banco"""
         if hasattr(self, '_banco'):
-            self._banco._salvar_dados()   
+            self._banco._salvar_dados(self)   
     
     def sacar(self, valor):
         """Realiza um saque na conta com tratamento de tipos"""
         try:
-            # Converte para Decimal se não for
-            if not isinstance(valor, Decimal):
-                valor = Decimal(str(valor)).quantize(Decimal('0.01'))
+            valor = Dinheiro(valor)
             
             if valor <= 0:
                 raise ValueError("Valor do saque deve ser positivo")
                 
-            valor_float = float(valor)  # Converte para float para operação
-            if self._saldo >= valor_float:
-                self._saldo -= valor_float
-                return True
+            with self._em_lote():
+                if self._saldo >= valor:
+                    self._saldo -= valor
+                    self._marcar_alterado()
+                    return True
             return False
             
         except Exception as e:
@@ -115,37 +119,65 @@ class Conta:
             raise
     
     def transferir(self, valor, conta_destino):
-        """Realiza uma transferência para outra conta."""
-        if self.sacar(valor):
-            if conta_destino.depositar(valor):
-                return True
-            # Se o depósito falhar, devolve o valor
-            self._saldo += valor
+        """Realiza uma transferência para outra conta (com as duas contas travadas)."""
+        with self._em_lote(conta_destino):
+            if self.sacar(valor):
+                if conta_destino.depositar(valor):
+                    return True
+                # Se o depósito falhar, devolve o valor
+                self._saldo += valor
+                self._marcar_alterado()
         return False
     
     def realizar_transacao(self, transacao):
-        """Registra uma transação na conta."""
-        return transacao.registrar(self)
+        """Registra uma transação na conta.
+        
+        Todas as gravações disparadas pela transação (saque, depósito e
+        histórico) são agrupadas em uma única escrita.
+        """
+        with self._em_lote():
+            return transacao.registrar(self)
     
     def gerar_extrato(self):
         """Gera o extrato da conta."""
-        return self._historico.gerar_extrato(self._saldo)
+        return self._historico.gerar_extrato(self.get_saldo())
+    
+    def extrato(self, inicio=None, fim=None):
+        """Extrato da conta no período, com as linhas geradas sob demanda (ver Extrato).
+        
+        Com ``fim``, o extrato fecha com o saldo naquele instante, e não com o atual.
+        """
+        saldo = self.get_saldo() if fim is None else self._historico.saldo_em(fim)
+        return Extrato(self._historico, saldo, inicio, fim)
     
-    def to_dict(self):
-        """Converte os dados da conta para dicionário (para persistência)."""
-        return {
+    def to_dict(self, historico=True):
+        """Converte os dados da conta para dicionário (para persistência).
+        
+        O 'historico' traz só as entradas em memória; as seladas em disco
+        entram como referências, em 'historico_arquivado'.
+        
+        Args:
+            historico: Inclui as entradas em memória do histórico (False:
+                só os campos da conta e as referências aos segmentos)
+        """
+        dados = {
             'numero': self._numero,
             'cpf_cliente': self._cliente.get_cpf().replace(".", "").replace("-", ""), 
             'saldo': float(self._saldo),
             'senha_hash': getattr(self, 'senha_hash', ""), 
-            'historico': [transacao for transacao in self._historico.get_transacoes()]  
         }
+        if historico:
+            dados['historico'] = self._historico.to_dict()
+        arquivado = self._historico.arquivado()
+        if arquivado:
+            dados['historico_arquivado'] = arquivado
+        return dados
 class ContaCorrente(Conta):
     """Classe que representa uma conta corrente com limite básico."""
     
     def __init__(self, cliente, numero, limite=500.0, limite_saques=3):
         super().__init__(cliente, numero)
-        self._limite = limite
+        self._limite = Dinheiro(limite)
         self._limite_saques = limite_saques
         self._saques_realizados = 0
         self._data_ultimo_saque = None
@@ -154,34 +186,32 @@ class ContaCorrente(Conta):
     def sacar(self, valor):
         """Realiza um saque na conta corrente, considerando o limite."""
         try:
-            if not isinstance(valor, Decimal):
-                valor = Decimal(str(valor)).quantize(Decimal('0.01'))
-            
-            hoje = datetime.now().date()
+            valor = Dinheiro(valor)
             
-            if self._data_ultimo_saque != hoje:
-                self._saques_realizados = 0
-                self._data_ultimo_saque = hoje
+            with self._em_lote():
+                hoje = datetime.now().date()
             
-            if self._saques_realizados >= self._limite_saques:
-                raise ValueError("Limite diário de saques atingido")
+                if self._data_ultimo_saque != hoje:
+                    self._saques_realizados = 0
+                    self._data_ultimo_saque = hoje
             
-            if valor <= 0:
-                raise ValueError("Valor do saque deve ser positivo")
+                if self._saques_realizados >= self._limite_saques:
+                    raise ValueError("Limite diário de saques atingido")
             
-            saldo_decimal = Decimal(str(self._saldo))
-            limite_decimal = Decimal(str(self._limite))
+                if valor <= 0:
+                    raise ValueError("Valor do saque deve ser positivo")
             
-            if valor > (saldo_decimal + limite_decimal):
-                raise ValueError("Saldo insuficiente (incluindo limite)")
+                if valor > self._saldo + self._limite:
+                    raise ValueError("Saldo insuficiente (incluindo limite)")
             
-            self._saldo = float(saldo_decimal - valor)
-            self._saques_realizados += 1
+                self._saldo = self._saldo - valor
+                self._saques_realizados += 1
+                self._marcar_alterado()
             
-            if hasattr(self, '_banco'):
-                self._banco._salvar_dados()
+                if hasattr(self, '_banco'):
+                    self._banco._salvar_dados(self)
                 
-            return True
+                return True
             
         except Exception as e:
             print(f"Erro no saque: {str(e)}")
@@ -194,12 +224,15 @@ class ContaCorrente(Conta):
     def set_limite(self, novo_limite):
         """Define um novo limite para a conta."""
         if novo_limite >= 0:
-            self._limite = novo_limite
+            with self._em_lote():
+                self._limite = Dinheiro(novo_limite)
+                self._marcar_alterado()
             return True
         return False
     
     def solicitar_emprestimo(self, valor, parcelas):
         """Solicita um empréstimo."""
+        valor = Dinheiro(valor)
         if valor <= 0:
             raise ValueError("Valor do empréstimo deve ser positivo")
         if parcelas <= 0:
@@ -214,18 +247,20 @@ class ContaCorrente(Conta):
             'parcelas': parcelas,
             'data': datetime.now(),
             'parcelas_pagas': 0,
-            'valor_pago': 0.0
+            'valor_pago': ZERO
         }
-        self._emprestimos.append(emprestimo)
-        self._saldo += valor
+        with self._em_lote():
+            self._emprestimos.append(emprestimo)
+            self._saldo += valor
+            self._marcar_alterado()
         return True
     
     def get_emprestimos(self):
         """Retorna lista de empréstimos."""
         return self._emprestimos.copy()
     
-    def to_dict(self):
-        dados = super().to_dict()
+    def to_dict(self, historico=True):
+        dados = super().to_dict(historico)
         dados.update({
             'tipo': 'corrente',
             'limite': float(self._limite),
@@ -237,76 +272,116 @@ class ContaCorrente(Conta):
         return dados
 
 class ContaPoupanca(Conta):
-    def __init__(self, cliente, numero, taxa_rendimento=0.05):
+    def __init__(self, cliente, numero, taxa_rendimento=0.05, modo_rendimento=None):
+        """
+        Args:
+            modo_rendimento: 'periodico' ou 'sob_demanda' (padrão em
+                config.MODO_RENDIMENTO)
+        """
         super().__init__(cliente, numero)
         self._taxa_rendimento = taxa_rendimento
         self._ultima_atualizacao = datetime.now()
-        self._thread_rendimento = None
-        self._rodando = False
+        self._modo_rendimento = modo_rendimento or MODO_RENDIMENTO
         self.senha_hash = ""
+    
+    def _periodos_pendentes(self, agora=None):
+        """Intervalos completos de rendimento desde a última atualização."""
+        decorrido = ((agora or datetime.now()) - self._ultima_atualizacao).total_seconds()
+        return max(0, int(decorrido // INTERVALO_RENDIMENTO))
+    
+    def _saldo_com_rendimento(self, periodos):
+        """Saldo após ``periodos`` capitalizações compostas (forma fechada).
         
-        self._iniciar_rendimento_automatico()
+        Exato em centavos e limitado a config.TETO_RENDIMENTO_SOB_DEMANDA:
+        a conta pode ficar parada por qualquer tempo sem que a leitura falhe.
+        """
+        if not periodos:
+            return self._saldo
+        return Dinheiro.de_centavos(montante_centavos(
+            self._saldo.centavos, self._taxa_rendimento, periodos,
+            TETO_RENDIMENTO_SOB_DEMANDA * 100))
     
-    def _aplicar_rendimento(self):
-        """Aplica o rendimento com tratamento de erros"""
-        try:
-            if self._saldo > 0:
-                rendimento = self._saldo * self._taxa_rendimento
-                self._saldo += rendimento
-                self._ultima_atualizacao = datetime.now()
-                
-                transacao = {
-                    'tipo': 'Rendimento',
-                    'valor': rendimento,
-                    'data': self._ultima_atualizacao.strftime("%d/%m/%Y %H:%M:%S")
-                }
-                self._historico._transacoes.append(transacao)
-                
-                if hasattr(self, '_banco'):
-                    try:
-                        self._banco._salvar_dados()
-                    except Exception as e:
-                        print(f"Erro ao salvar rendimento: {str(e)}")
-        except Exception as e:
-            print(f"Erro ao aplicar rendimento: {str(e)}")
+    def _materializar_rendimento(self):
+        """No modo sob demanda, incorpora ao saldo o rendimento acumulado.
+        
+        Todo o rendimento pendente vira um único lançamento no histórico. A
+        data da última atualização avança apenas os intervalos completos,
+        preservando a fração do intervalo em curso.
+        
+        Deve ser chamado com a trava da conta (dentro de ``_em_lote``).
+        
+        Returns:
+            bool: True se o estado da conta mudou
+        """
+        if self._modo_rendimento != 'sob_demanda':
+            return False
+        periodos = self._periodos_pendentes()
+        if not periodos:
+            return False
+        saldo = self._saldo_com_rendimento(periodos)
+        rendimento = saldo - self._saldo
+        self._ultima_atualizacao += timedelta(seconds=periodos * INTERVALO_RENDIMENTO)
+        if rendimento > 0:
+            self._saldo = saldo
+            self._historico.registrar_valor('Rendimento', rendimento, self._ultima_atualizacao)
+        self._marcar_alterado()
+        return True
     
-    def _iniciar_rendimento_automatico(self):
-        """Inicia a thread que calcula rendimentos automaticamente."""
-        if not self._rodando:
-            self._rodando = True
-            self._thread_rendimento = threading.Thread(
-                target=self._calcular_rendimento_continuo, 
-                daemon=True
-            )
-            self._thread_rendimento.start()
+    def depositar(self, valor):
+        """Realiza um depósito, incorporando antes o rendimento pendente."""
+        with self._em_lote():
+            self._materializar_rendimento()
+            return super().depositar(valor)
     
-    def _calcular_rendimento_continuo(self):
-        """Calcula rendimentos a cada minuto enquanto a conta existir."""
-        while self._rodando:
-            time.sleep(60)  # 60 segundos
-            self._aplicar_rendimento()
+    def sacar(self, valor):
+        """Realiza um saque, incorporando antes o rendimento pendente."""
+        with self._em_lote():
+            self._materializar_rendimento()
+            return super().sacar(valor)
+    
+    def _fechar_extrato(self):
+        """No fechamento do extrato, lança o rendimento pendente, se configurado."""
+        if MATERIALIZAR_RENDIMENTO_NO_EXTRATO:
+            with self._em_lote():
+                if self._materializar_rendimento():
+                    self._salvar_atualizacao()
+    
+    def gerar_extrato(self):
+        """Gera o extrato; o fechamento lança o rendimento pendente, se configurado."""
+        self._fechar_extrato()
+        return super().gerar_extrato()
+    
+    def extrato(self, inicio=None, fim=None):
+        """Extrato sob demanda; o fechamento lança o rendimento pendente, se configurado."""
+        self._fechar_extrato()
+        return super().extrato(inicio, fim)
     
     def encerrar(self):
-        """Encerra a thread de rendimento automático."""
-        self._rodando = False
-        if self._thread_rendimento and self._thread_rendimento != threading.current_thread():
-            self._thread_rendimento.join(timeout=1)
+        """Retira a conta do agendador de rendimentos e salva o estado."""
+        banco = getattr(self, '_banco', None)
+        if banco is not None:
+            banco._agendador.cancelar(self)
         self._salvar_imediato()
 
 
     def _salvar_imediato(self):
         """Força o salvamento imediato dos dados"""
         if hasattr(self, '_banco'):
-            self._banco._salvar_dados()
+            self._banco._salvar_dados(self)
             print("Dados da poupança salvos imediatamente")  
     
     def get_saldo(self):
-        """Retorna o saldo atual, garantindo thread safety."""
-        with threading.Lock():
+        """Retorna o saldo atual, sob a trava da conta.
+        
+        No modo sob demanda, inclui o rendimento acumulado ainda não lançado.
+        """
+        with self._trava:
+            if self._modo_rendimento == 'sob_demanda':
+                return self._saldo_com_rendimento(self._periodos_pendentes())
             return self._saldo
     
-    def to_dict(self):
-        dados = super().to_dict()
+    def to_dict(self, historico=True):
+        dados = super().to_dict(historico)
         dados.update({
             'tipo': 'poupanca',
             'taxa_rendimento': float(self._taxa_rendimento),
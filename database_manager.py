@@ -1,41 +1,1037 @@
 import json
+import os
 from pathlib import Path
+import queue
 import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
 from decimal import Decimal
 from datetime import datetime, date
 
+from backup_manager import BackupManager
+import binary_snapshot
+from dinheiro import Dinheiro
+from segmento_historico import diretorio_da_conta
+
+
+# Máscara de criação de arquivos do processo (lida uma vez: os.umask só
+# consulta o valor trocando-o)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, Decimal):
+        if isinstance(obj, (Decimal, Dinheiro)):
             return float(obj)
         if isinstance(obj, (datetime, date)):
             return obj.isoformat()
         return super().default(obj)
-    
+
+
+class StorageBackend:
+    """Interface dos mecanismos de armazenamento usados pelo DatabaseManager.
+
+    Os dados trafegam no mesmo formato lógico do arquivo JSON: um dicionário com
+    'usuarios', 'contas' e 'ultimo_numero_conta'. Alterações incrementais são
+    registros com a chave ``op`` ('usuario', 'conta', 'remover_usuario',
+    'remover_conta' ou 'ultimo_numero_conta').
+
+    Um registro 'conta' com 'historico_novos' é parcial: traz os campos da
+    conta sem o 'historico' e só as entradas novas, a partir da posição
+    'historico_desde' (ver ``merge_account``).
+    """
+
+    suffix = ''
+    incremental = False
+
+    def exists(self):
+        """Indica se o armazenamento já foi criado."""
+        raise NotImplementedError("Método exists deve ser implementado")
+
+    def load(self):
+        """Carrega todos os dados."""
+        raise NotImplementedError("Método load deve ser implementado")
+
+    def save(self, data):
+        """Substitui todos os dados armazenados."""
+        raise NotImplementedError("Método save deve ser implementado")
+
+    def apply_records(self, records):
+        """Aplica registros de alteração incrementais."""
+        raise DatabaseError("Armazenamento não suporta gravação incremental")
+
+    def recover(self):
+        """Tenta recuperar o armazenamento após uma escrita interrompida.
+
+        Returns:
+            bool: True se algo foi recuperado
+        """
+        return False
+
+    def iter_load(self, keys=None):
+        """
+        Percorre os dados registro a registro.
+
+        Args:
+            keys (set): Se informado, recebe as chaves de primeiro nível
+                encontradas (inclusive listas vazias), para validação
+
+        Yields:
+            tuple: (chave, valor), com chave 'usuario' ou 'conta' para cada
+                item das listas e o nome da chave para os demais campos
+        """
+        yield from iter_records(self.load(), keys)
+
+    def load_snapshot(self):
+        """Retorna o snapshot binário válido, se houver (carga rápida)."""
+        return None
+
+    def get_usuario(self, cpf):
+        """Retorna o dicionário de um usuário pelo CPF (sem formatação)."""
+        cpf = cpf.replace(".", "").replace("-", "")
+        for usuario in self.load()['usuarios']:
+            if usuario['cpf'] == cpf:
+                return usuario
+        return None
+
+    def get_conta(self, numero):
+        """Retorna o dicionário de uma conta pelo número."""
+        for conta in self.load()['contas']:
+            if conta['numero'] == numero:
+                return conta
+        return None
+
+    def close(self):
+        """Libera os recursos abertos."""
+        pass
+
+
+_ITEM_KEYS = {'usuarios': 'usuario', 'contas': 'conta'}
+
+
+def merge_account(current, record):
+    """
+    Aplica um registro 'conta' sobre a versão anterior da conta.
+
+    Um registro completo substitui a conta. Um parcial atualiza os campos e
+    anexa 'historico_novos' ao histórico anterior, descartando antes o que
+    houver dele a partir de 'historico_desde'. As posições contam as entradas
+    seladas em segmentos ('historico_arquivado'), que não estão no histórico.
+
+    Args:
+        current (dict): Versão anterior (é alterada), ou None
+        record (dict): Registro com a chave ``op`` igual a 'conta'
+
+    Returns:
+        dict: Versão atual da conta
+    """
+    if 'historico_novos' not in record:
+        return record['dados']
+    if current is None:
+        current = {}
+    historico = current.setdefault('historico', [])
+    current.update(record['dados'])
+    base = (current.get('historico_arquivado') or {}).get('base', 0)
+    del historico[max(record['historico_desde'] - base, 0):]
+    historico.extend(record['historico_novos'])
+    return current
+
+
+def iter_records(data, keys=None):
+    """Percorre um dicionário de dados completo no formato de ``iter_load``."""
+    for key, value in data.items():
+        if keys is not None:
+            keys.add(key)
+        if key in _ITEM_KEYS:
+            for item in value:
+                yield _ITEM_KEYS[key], item
+        else:
+            yield key, value
+
+
+class _JsonStreamReader:
+    """Leitor incremental do documento JSON principal.
+
+    Lê o arquivo em blocos e decodifica um item por vez das listas
+    'usuarios' e 'contas', sem montar a árvore completa em memória.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, file, keys=None):
+        self._file = file
+        self.keys = keys if keys is not None else set()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Lê mais um bloco, descartando o que já foi consumido."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Retorna o próximo caractere significativo (ou '' no fim)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos:self._pos + 1]
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"JSON inválido: esperado '{char}' na posição {self._pos}")
+        self._pos += 1
+
+    def _value(self):
+        """Decodifica o próximo valor completo, lendo mais blocos se preciso."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Um número no fim do bloco pode continuar no próximo
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _separator(self, closing):
+        """Consome ',' entre elementos; retorna False ao encontrar o fechamento."""
+        char = self._peek()
+        if char == ',':
+            self._pos += 1
+            return True
+        if char == closing:
+            self._pos += 1
+            return False
+        raise ValueError(f"JSON inválido na posição {self._pos}")
+
+    def __iter__(self):
+        if self._peek() != '{':
+            raise DatabaseError("Dados devem ser um dicionário")
+        self._pos += 1
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self.keys.add(key)
+            self._expect(':')
+            if key in _ITEM_KEYS and self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield _ITEM_KEYS[key], self._value()
+                        if not self._separator(']'):
+                            break
+            else:
+                yield key, self._value()
+            if not self._separator('}'):
+                break
+        if self._peek():
+            raise ValueError("JSON inválido: conteúdo após o fim do documento")
+
+
+class JsonBackend(StorageBackend):
+    """Armazenamento em um único documento JSON.
+
+    No modo journal, cada alteração é anexada como um registro compacto em um
+    arquivo de log (``<arquivo>.journal``) em vez de reescrever o JSON inteiro.
+    O JSON principal passa a ser um snapshot, periodicamente compactado com o log.
+
+    Com ``binary_snapshot``, ao fechar é gravada também uma cópia colunar
+    compacta (``<arquivo>.snap``) usada para acelerar a próxima inicialização.
+    """
+
+    suffix = '.json'
+
+    def __init__(self, file_path, journal=False, fsync_batch=32, compact_threshold=1000,
+                 binary_snapshot=False):
+        """
+        Args:
+            file_path (Path): Caminho para o arquivo JSON principal
+            journal (bool): Ativa o modo journal (log de alterações só de anexação)
+            fsync_batch (int): Número de registros do journal entre cada fsync
+            compact_threshold (int): Número de registros no journal que dispara
+                a compactação no snapshot
+            binary_snapshot (bool): Mantém o snapshot binário para carga rápida
+        """
+        self.file_path = Path(file_path)
+        self.journal = journal
+        self.incremental = journal
+        self.journal_path = self.file_path.with_suffix('.journal')
+        self.fsync_batch = max(1, int(fsync_batch))
+        self.compact_threshold = max(1, int(compact_threshold))
+        self._journal_file = None
+        self._journal_pending = 0
+        self._journal_records = self._count_journal_records() if journal else 0
+        self.binary_snapshot = binary_snapshot
+        self.snapshot_path = self.file_path.with_suffix('.snap')
+        self._last_data = None
+
+    def exists(self):
+        return self.file_path.exists()
+
+    def _save_to_file(self, data):
+        """Salva dados no arquivo de forma atômica.
+
+        O JSON é escrito em um arquivo temporário no mesmo diretório, que é
+        sincronizado em disco e então renomeado sobre o arquivo principal. Uma
+        queda no meio da escrita nunca deixa o arquivo principal truncado.
+
+        O temporário recebe as permissões do arquivo principal (ou, se ele
+        ainda não existir, as de um arquivo novo do processo), já que o
+        mkstemp o cria só para o dono.
+        """
+        tmp_path = None
+        try:
+            try:
+                mode = stat.S_IMODE(os.stat(self.file_path).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            fd, tmp_path = tempfile.mkstemp(dir=self.file_path.parent,
+                                            prefix=f".{self.file_path.name}.", suffix='.tmp')
+            os.chmod(tmp_path, mode)
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=4, ensure_ascii=False, cls=DecimalEncoder)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.file_path)
+            tmp_path = None
+            self._sync_dir()
+        except Exception as e:
+            raise DatabaseError(f"Falha ao salvar dados: {str(e)}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _sync_dir(self):
+        """Sincroniza o diretório para tornar o rename durável (POSIX)."""
+        if os.name == 'nt':
+            return
+        try:
+            fd = os.open(self.file_path.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _temp_files(self):
+        """Arquivos temporários deixados por escritas interrompidas."""
+        return sorted(self.file_path.parent.glob(f".{self.file_path.name}.*.tmp"),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+
+    def recover(self):
+        """Promove o temporário completo mais recente a arquivo principal.
+
+        Temporários incompletos (JSON inválido) são descartados.
+        """
+        for tmp in self._temp_files():
+            try:
+                with open(tmp, 'r', encoding='utf-8') as file:
+                    if not isinstance(json.load(file), dict):
+                        raise ValueError("Conteúdo inválido")
+                os.replace(tmp, self.file_path)
+                self._sync_dir()
+                return True
+            except (ValueError, OSError):
+                tmp.unlink(missing_ok=True)
+        return False
+
+    def _count_journal_records(self):
+        """Conta os registros já presentes no journal."""
+        if not self.journal_path.exists():
+            return 0
+        with open(self.journal_path, 'rb') as file:
+            return sum(1 for line in file if line.strip())
+
+    def _open_journal(self):
+        """Abre (uma única vez) o journal para anexação."""
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+        return self._journal_file
+
+    def _sync_journal(self):
+        """Descarrega o buffer do journal e força a gravação em disco."""
+        if self._journal_file is not None and self._journal_pending:
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+            self._journal_pending = 0
+
+    def _truncate_journal(self):
+        """Descarta o journal após seu conteúdo ter sido incorporado ao snapshot."""
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        self._journal_pending = 0
+        self._journal_records = 0
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+
+    def _read_journal(self):
+        """Lê os registros do journal.
+
+        Uma última linha truncada (queda durante a escrita) é ignorada.
+        """
+        if not self.journal_path.exists():
+            return []
+        records = []
+        with open(self.journal_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    @staticmethod
+    def _replay(data, records):
+        """Aplica os registros do journal sobre um snapshot."""
+        usuarios = {u['cpf']: i for i, u in enumerate(data['usuarios'])}
+        contas = {c['numero']: i for i, c in enumerate(data['contas'])}
+        removidos = False
+
+        for record in records:
+            op = record.get('op')
+            if op == 'usuario':
+                dados = record['dados']
+                if dados['cpf'] in usuarios:
+                    data['usuarios'][usuarios[dados['cpf']]] = dados
+                else:
+                    usuarios[dados['cpf']] = len(data['usuarios'])
+                    data['usuarios'].append(dados)
+            elif op == 'conta':
+                numero = record['dados']['numero']
+                if numero in contas:
+                    data['contas'][contas[numero]] = merge_account(
+                        data['contas'][contas[numero]], record)
+                else:
+                    contas[numero] = len(data['contas'])
+                    data['contas'].append(merge_account(None, record))
+            elif op == 'remover_usuario':
+                if usuarios.pop(record['cpf'], None) is not None:
+                    removidos = True
+            elif op == 'remover_conta':
+                if contas.pop(record['numero'], None) is not None:
+                    removidos = True
+            elif op == 'ultimo_numero_conta':
+                data['ultimo_numero_conta'] = record['valor']
+
+        if removidos:
+            data['usuarios'] = [data['usuarios'][i] for i in sorted(usuarios.values())]
+            data['contas'] = [data['contas'][i] for i in sorted(contas.values())]
+        return data
+
+    def load(self):
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        # O arquivo principal é válido: temporários antigos são lixo
+        for tmp in self._temp_files():
+            tmp.unlink(missing_ok=True)
+        if self.journal and isinstance(data, dict):
+            self._sync_journal()
+            self._replay(data, self._read_journal())
+        return data
+
+    def iter_load(self, keys=None):
+        """
+        Percorre o JSON principal sem carregá-lo inteiro em memória.
+
+        No modo journal, a versão mais recente de cada usuário/conta no
+        journal substitui a do snapshot (registros parciais de conta são
+        aplicados sobre ela); removidos são omitidos e os novos vêm ao final.
+        """
+        alterados = {'usuario': {}, 'conta': {}}
+        ultimo = None
+        if self.journal:
+            self._sync_journal()
+            for record in self._read_journal():
+                op = record.get('op')
+                if op == 'usuario':
+                    alterados['usuario'][record['dados']['cpf']] = record['dados']
+                elif op == 'conta':
+                    # Registros da conta desde o último completo, na ordem
+                    registros = alterados['conta'].get(record['dados']['numero'])
+                    if 'historico_novos' in record and registros:
+                        registros.append(record)
+                    else:
+                        alterados['conta'][record['dados']['numero']] = [record]
+                elif op == 'remover_usuario':
+                    alterados['usuario'][record['cpf']] = None
+                elif op == 'remover_conta':
+                    alterados['conta'][record['numero']] = None
+                elif op == 'ultimo_numero_conta':
+                    ultimo = record['valor']
+        chave = {'usuario': 'cpf', 'conta': 'numero'}
+
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            for key, value in _JsonStreamReader(file, keys):
+                if key == 'usuario':
+                    value = alterados[key].pop(value[chave[key]], value)
+                elif key == 'conta':
+                    registros = alterados[key].pop(value[chave[key]], ())
+                    value = self._merge_records(value, registros)
+                if key in alterados and value is None:
+                    continue
+                elif key == 'ultimo_numero_conta' and ultimo is not None:
+                    value = ultimo
+                yield key, value
+        for tmp in self._temp_files():
+            tmp.unlink(missing_ok=True)
+        for value in alterados['usuario'].values():
+            if value is not None:
+                yield 'usuario', value
+        for registros in alterados['conta'].values():
+            if registros is not None:
+                yield 'conta', self._merge_records(None, registros)
+
+    @staticmethod
+    def _merge_records(value, records):
+        """Aplica em ordem os registros de uma conta (None se ela foi removida)."""
+        if records is None:
+            return None
+        for record in records:
+            value = merge_account(value, record)
+        return value
+
+    def save(self, data):
+        """Grava o snapshot completo; no modo journal funciona como checkpoint."""
+        self._save_to_file(data)
+        if self.journal:
+            self._truncate_journal()
+        self._last_data = data if self.binary_snapshot else None
+
+    def apply_records(self, records):
+        """
+        Anexa registros de alteração ao journal.
+
+        O fsync é feito a cada ``fsync_batch`` registros e o journal é
+        compactado no snapshot ao atingir ``compact_threshold`` registros.
+        """
+        if not self.journal:
+            raise DatabaseError("Modo journal não está ativo")
+        try:
+            file = self._open_journal()
+            for record in records:
+                file.write(json.dumps(record, separators=(',', ':'),
+                                      ensure_ascii=False, cls=DecimalEncoder))
+                file.write('\n')
+                self._journal_pending += 1
+                self._journal_records += 1
+            self._last_data = None
+
+            if self._journal_pending >= self.fsync_batch:
+                self._sync_journal()
+            if self._journal_records >= self.compact_threshold:
+                self.compact()
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError(f"Falha ao gravar journal: {str(e)}")
+
+    def compact(self):
+        """Incorpora o journal ao snapshot JSON e descarta o journal."""
+        if not self.journal:
+            return
+        self._sync_journal()
+        data = self.load()
+        self._save_to_file(data)
+        self._truncate_journal()
+        self._last_data = data if self.binary_snapshot else None
+
+    def load_snapshot(self):
+        """
+        Lê o snapshot binário se ele corresponder ao JSON atual.
+
+        O snapshot é ignorado se houver registros no journal ainda não
+        compactados, se estiver corrompido ou se o JSON mudou depois dele.
+
+        Returns:
+            binary_snapshot.SnapshotColunar | None
+        """
+        if not self.binary_snapshot or not self.snapshot_path.exists():
+            return None
+        if self.journal and self.journal_path.exists() and self.journal_path.stat().st_size:
+            return None
+        try:
+            return binary_snapshot.decode(self.snapshot_path.read_bytes(),
+                                          binary_snapshot.fingerprint(self.file_path))
+        except OSError:
+            return None
+
+    def write_snapshot(self):
+        """Grava o snapshot binário correspondente ao JSON atual.
+
+        Usa os últimos dados gravados nesta sessão; sem gravações, o snapshot
+        existente continua válido e só é criado se ainda não existir.
+        """
+        if self.journal and self._journal_records:
+            self.compact()
+        data = self._last_data
+        if data is None:
+            if self.load_snapshot() is not None:
+                return
+            data = self.load()
+        try:
+            content = binary_snapshot.encode(data, binary_snapshot.fingerprint(self.file_path))
+        except (ValueError, TypeError, KeyError) as e:
+            # O JSON continua sendo a fonte da verdade; sem snapshot a carga é a normal
+            print(f"Snapshot binário não gravado: {str(e)}")
+            return
+        tmp = self.snapshot_path.with_suffix('.snap.tmp')
+        tmp.write_bytes(content)
+        os.replace(tmp, self.snapshot_path)
+
+    def close(self):
+        """Garante que registros pendentes do journal estejam em disco.
+
+        Com ``binary_snapshot``, grava também o snapshot para a próxima carga.
+        """
+        try:
+            self._sync_journal()
+            if self.binary_snapshot:
+                self.write_snapshot()
+        finally:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+
+
+class SqliteBackend(StorageBackend):
+    """Armazenamento em SQLite (stdlib) com tabelas normalizadas.
+
+    Usuários, contas e transações ficam em tabelas próprias, com o banco em
+    modo WAL. Alterações incrementais viram upserts por linha, e o histórico
+    de uma conta só recebe as transações novas.
+    """
+
+    suffix = '.db'
+    incremental = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            cpf TEXT PRIMARY KEY,
+            nome TEXT NOT NULL,
+            data_nascimento TEXT NOT NULL,
+            endereco TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS contas (
+            numero INTEGER PRIMARY KEY,
+            cpf_cliente TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            saldo REAL NOT NULL,
+            senha_hash TEXT NOT NULL DEFAULT '',
+            extras TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_contas_cpf ON contas (cpf_cliente);
+        CREATE TABLE IF NOT EXISTS transacoes (
+            conta_numero INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            valor REAL NOT NULL,
+            data TEXT NOT NULL,
+            extras TEXT,
+            PRIMARY KEY (conta_numero, seq)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS metadata (
+            chave TEXT PRIMARY KEY,
+            valor TEXT NOT NULL
+        );
+    """
+
+    # Campos de conta com coluna própria; o restante vai para 'extras'
+    _CAMPOS_CONTA = ('numero', 'cpf_cliente', 'tipo', 'saldo', 'senha_hash', 'historico')
+    _CAMPOS_TRANSACAO = ('tipo', 'valor', 'data')
+
+    def __init__(self, file_path):
+        """
+        Args:
+            file_path (Path): Caminho para o arquivo SQLite
+        """
+        self.file_path = Path(file_path)
+        self._lock = threading.RLock()
+        self._conn = None
+
+    def exists(self):
+        return self.file_path.exists()
+
+    def _connection(self):
+        """Abre (uma única vez) a conexão com o banco SQLite."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.file_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self._SCHEMA)
+        return self._conn
+
+    @staticmethod
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, cls=DecimalEncoder)
+
+    def _upsert_usuario(self, cur, dados):
+        cur.execute(
+            "INSERT INTO usuarios (cpf, nome, data_nascimento, endereco) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(cpf) DO UPDATE SET nome = excluded.nome, "
+            "data_nascimento = excluded.data_nascimento, endereco = excluded.endereco",
+            (dados['cpf'], dados['nome'], dados['data_nascimento'], dados['endereco']))
+
+    def _upsert_conta(self, cur, dados, novos=None, desde=0):
+        """
+        Grava uma conta e as transações ainda não gravadas do histórico.
+
+        Args:
+            dados (dict): Conta (completa, ou sem o 'historico' se ``novos``)
+            novos (list): Só as transações novas, a partir da posição ``desde``
+        """
+        extras = {k: v for k, v in dados.items() if k not in self._CAMPOS_CONTA}
+        cur.execute(
+            "INSERT INTO contas (numero, cpf_cliente, tipo, saldo, senha_hash, extras) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(numero) DO UPDATE SET cpf_cliente = excluded.cpf_cliente, "
+            "tipo = excluded.tipo, saldo = excluded.saldo, "
+            "senha_hash = excluded.senha_hash, extras = excluded.extras",
+            (dados['numero'], dados['cpf_cliente'], dados.get('tipo', ''),
+             float(dados.get('saldo', 0.0)), dados.get('senha_hash', ''), self._dumps(extras)))
+
+        # As primeiras 'base' transações foram seladas em segmentos de histórico
+        # (ver 'historico_arquivado') e saem da tabela; seq continua contando delas.
+        base = (dados.get('historico_arquivado') or {}).get('base', 0)
+        if base:
+            cur.execute("DELETE FROM transacoes WHERE conta_numero = ? AND seq < ?",
+                        (dados['numero'], base))
+        # Registro parcial: só as transações novas. Completo (primeira gravação
+        # da conta, depois de selar ou de uma falha): a parte em memória inteira
+        # substitui a gravada, mesmo que faltem transações no meio
+        if novos is None:
+            novos, desde = dados.get('historico', []), base
+        cur.execute("DELETE FROM transacoes WHERE conta_numero = ? AND seq >= ?",
+                    (dados['numero'], desde))
+        cur.executemany(
+            "INSERT INTO transacoes (conta_numero, seq, tipo, valor, data, extras) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [self._linha_transacao(dados['numero'], seq, t)
+             for seq, t in enumerate(novos, start=desde)])
+
+    def _linha_transacao(self, numero, seq, transacao):
+        extras = {k: v for k, v in transacao.items() if k not in self._CAMPOS_TRANSACAO}
+        return (numero, seq, transacao['tipo'], float(transacao['valor']),
+                transacao['data'], self._dumps(extras) if extras else None)
+
+    def _remover_conta(self, cur, numero):
+        cur.execute("DELETE FROM transacoes WHERE conta_numero = ?", (numero,))
+        cur.execute("DELETE FROM contas WHERE numero = ?", (numero,))
+
+    def _set_ultimo_numero_conta(self, cur, valor):
+        cur.execute(
+            "INSERT INTO metadata (chave, valor) VALUES ('ultimo_numero_conta', ?) "
+            "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor", (str(valor),))
+
+    def _montar_conta(self, row, historico):
+        numero, cpf_cliente, tipo, saldo, senha_hash, extras = row
+        conta = {
+            'numero': numero,
+            'cpf_cliente': cpf_cliente,
+            'saldo': saldo,
+            'senha_hash': senha_hash,
+            'historico': historico,
+            'tipo': tipo
+        }
+        conta.update(json.loads(extras))
+        return conta
+
+    def _montar_transacao(self, row):
+        tipo, valor, data, extras = row
+        transacao = {'tipo': tipo, 'valor': valor, 'data': data}
+        if extras:
+            transacao.update(json.loads(extras))
+        return transacao
+
+    def load(self):
+        with self._lock:
+            conn = self._connection()
+            historicos = {}
+            for row in conn.execute(
+                    "SELECT conta_numero, tipo, valor, data, extras FROM transacoes "
+                    "ORDER BY conta_numero, seq"):
+                historicos.setdefault(row[0], []).append(self._montar_transacao(row[1:]))
+
+            contas = []
+            contas_por_cpf = {}
+            for row in conn.execute(
+                    "SELECT numero, cpf_cliente, tipo, saldo, senha_hash, extras "
+                    "FROM contas ORDER BY numero"):
+                contas.append(self._montar_conta(row, historicos.get(row[0], [])))
+                contas_por_cpf.setdefault(row[1], []).append(row[0])
+
+            usuarios = [
+                {'nome': nome, 'cpf': cpf, 'data_nascimento': nasc, 'endereco': endereco,
+                 'contas': contas_por_cpf.get(cpf, [])}
+                for cpf, nome, nasc, endereco in conn.execute(
+                    "SELECT cpf, nome, data_nascimento, endereco FROM usuarios ORDER BY rowid")
+            ]
+
+            row = conn.execute(
+                "SELECT valor FROM metadata WHERE chave = 'ultimo_numero_conta'").fetchone()
+            return {
+                'usuarios': usuarios,
+                'contas': contas,
+                'ultimo_numero_conta': int(row[0]) if row else 0
+            }
+
+    def save(self, data):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cur = conn.cursor()
+                cur.execute("DELETE FROM transacoes")
+                cur.execute("DELETE FROM contas")
+                cur.execute("DELETE FROM usuarios")
+                for usuario in data['usuarios']:
+                    self._upsert_usuario(cur, usuario)
+                for conta in data['contas']:
+                    self._upsert_conta(cur, conta)
+                self._set_ultimo_numero_conta(cur, data['ultimo_numero_conta'])
+                if 'metadata' in data:
+                    cur.execute(
+                        "INSERT OR REPLACE INTO metadata (chave, valor) VALUES ('metadata', ?)",
+                        (self._dumps(data['metadata']),))
+
+    def apply_records(self, records):
+        """Aplica os registros como upserts/remoções em uma única transação."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cur = conn.cursor()
+                for record in records:
+                    op = record.get('op')
+                    if op == 'usuario':
+                        self._upsert_usuario(cur, record['dados'])
+                    elif op == 'conta':
+                        self._upsert_conta(cur, record['dados'], record.get('historico_novos'),
+                                           record.get('historico_desde', 0))
+                    elif op == 'remover_usuario':
+                        cur.execute("DELETE FROM usuarios WHERE cpf = ?", (record['cpf'],))
+                    elif op == 'remover_conta':
+                        self._remover_conta(cur, record['numero'])
+                    elif op == 'ultimo_numero_conta':
+                        self._set_ultimo_numero_conta(cur, record['valor'])
+
+    def get_usuario(self, cpf):
+        cpf = cpf.replace(".", "").replace("-", "")
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT cpf, nome, data_nascimento, endereco FROM usuarios WHERE cpf = ?",
+                (cpf,)).fetchone()
+            if row is None:
+                return None
+            contas = [numero for (numero,) in conn.execute(
+                "SELECT numero FROM contas WHERE cpf_cliente = ? ORDER BY numero", (cpf,))]
+            return {'nome': row[1], 'cpf': row[0], 'data_nascimento': row[2],
+                    'endereco': row[3], 'contas': contas}
+
+    def get_conta(self, numero):
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT numero, cpf_cliente, tipo, saldo, senha_hash, extras "
+                "FROM contas WHERE numero = ?", (numero,)).fetchone()
+            if row is None:
+                return None
+            historico = [self._montar_transacao(t) for t in conn.execute(
+                "SELECT tipo, valor, data, extras FROM transacoes "
+                "WHERE conta_numero = ? ORDER BY seq", (numero,))]
+            return self._montar_conta(row, historico)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+BACKENDS = {
+    'json': JsonBackend,
+    'sqlite': SqliteBackend,
+}
+
+
 class DatabaseManager:
-    """Gerencia a persistência dos dados em arquivo JSON com backup automático."""
+    """Gerencia a persistência dos dados com backup automático.
+
+    O armazenamento é delegado a um ``StorageBackend``: um documento JSON
+    (opcionalmente com journal de alterações) ou um banco SQLite normalizado.
     
-    def __init__(self, file_path='database/banco_ufs.json'):
+    Com ``async_writes``, as gravações são enfileiradas e executadas por uma
+    thread dedicada, liberando quem chamou (ex.: a interface gráfica).
+    """
+
+    def __init__(self, file_path='database/banco_ufs.json', journal=False,
+                 fsync_batch=32, compact_threshold=1000, backend=None,
+                 async_writes=False, queue_size=64, on_error=None,
+                 backup_keep=5, backup_interval=300, backup_every=100,
+                 binary_snapshot=False, history_dir=None):
         """
         Inicializa o gerenciador de banco de dados.
-        
+
         Args:
-            file_path (str): Caminho para o arquivo JSON principal
+            file_path (str): Caminho para o arquivo de dados principal
+            journal (bool): Ativa o modo journal do armazenamento JSON
+            fsync_batch (int): Número de registros do journal entre cada fsync
+            compact_threshold (int): Número de registros no journal que dispara
+                a compactação no snapshot
+            backend (str | StorageBackend): 'json', 'sqlite' ou uma instância de
+                StorageBackend. Se omitido, é escolhido pela extensão do arquivo
+                (.db/.sqlite/.sqlite3 usam SQLite).
+            async_writes (bool): Grava em uma thread de fundo
+            queue_size (int): Tamanho máximo da fila de gravações; quando cheia,
+                quem grava fica bloqueado até haver espaço (backpressure)
+            on_error (callable): Chamado com a exceção quando uma gravação em
+                segundo plano falha
+            backup_keep (int): Quantidade de snapshots de backup mantidos
+            backup_interval (float): Segundos entre snapshots de backup
+            backup_every (int): Número de gravações que força um snapshot
+            binary_snapshot (bool): Mantém um snapshot binário compacto ao lado
+                do JSON para acelerar a inicialização (apenas armazenamento JSON)
+            history_dir (str): Raiz dos segmentos selados do histórico das
+                contas. Os segmentos entram nos backups e os de uma conta
+                removida são apagados depois que a remoção é gravada.
         """
         self.file_path = Path(file_path)
         self.backup_dir = self.file_path.parent / 'backups'
+        self.history_dir = history_dir
+
+        if backend is None:
+            backend = 'sqlite' if self.file_path.suffix in ('.db', '.sqlite', '.sqlite3') else 'json'
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise DatabaseError(f"Armazenamento desconhecido: {backend}")
+            if backend == 'json':
+                backend = JsonBackend(self.file_path, journal=journal,
+                                      fsync_batch=fsync_batch,
+                                      compact_threshold=compact_threshold,
+                                      binary_snapshot=binary_snapshot)
+            else:
+                backend = BACKENDS[backend](self.file_path)
+        self.backend = backend
+        self.backups = BackupManager(self.backup_dir, keep=backup_keep,
+                                     interval=backup_interval, every_ops=backup_every,
+                                     encoder=DecimalEncoder, segment_dir=history_dir)
         self._create_file_if_not_exists()
-    
+
+        self.on_error = on_error
+        self.last_error = None
+        self._queue = None
+        self._writer = None
+        if async_writes:
+            self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        """Executa as gravações enfileiradas, na ordem em que chegaram.
+        
+        Snapshots completos consecutivos na fila são agrupados: só o mais
+        recente precisa ser gravado. Se a gravação falhar, o ``on_failure``
+        de cada tarefa envolvida é chamado antes de ``on_error``.
+        """
+        pending = None
+        while True:
+            task = pending if pending is not None else self._queue.get()
+            pending = None
+
+            func, args, on_failure = task
+            failure_handlers = [on_failure]
+            skipped = 0
+            while func == self._save_data_sync and not self._queue.empty():
+                try:
+                    next_task = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_task[0] == self._save_data_sync:
+                    func, args, on_failure = next_task
+                    failure_handlers.append(on_failure)
+                    skipped += 1
+                else:
+                    pending = next_task
+                    break
+
+            try:
+                func(*args)
+            except Exception as e:
+                self.last_error = e
+                for handler in failure_handlers:
+                    if handler is None:
+                        continue
+                    try:
+                        handler(e)
+                    except Exception:
+                        pass
+                if self.on_error:
+                    try:
+                        self.on_error(e)
+                    except Exception:
+                        pass
+                else:
+                    print(f"ERRO NA GRAVAÇÃO EM SEGUNDO PLANO: {str(e)}")
+            finally:
+                for _ in range(skipped + 1):
+                    self._queue.task_done()
+
+    def _submit(self, func, *args, on_failure=None):
+        """Executa a gravação agora ou a enfileira (modo assíncrono).
+
+        Args:
+            on_failure (callable): No modo assíncrono, chamado na thread de
+                gravação com a exceção se a tarefa falhar (no modo síncrono a
+                exceção chega a quem chamou)
+        """
+        if self._queue is None:
+            return func(*args)
+        self._queue.put((func, args, on_failure))
+
+    def drain(self):
+        """Aguarda até que todas as gravações enfileiradas terminem."""
+        if self._queue is not None:
+            self._queue.join()
+
+    @property
+    def incremental(self):
+        """Indica se o armazenamento aceita gravações incrementais (apply_records)."""
+        return self.backend.incremental
+
     def _create_file_if_not_exists(self):
-        """Cria o arquivo JSON com estrutura inicial se não existir."""
+        """Cria o armazenamento com estrutura inicial se não existir."""
         try:
             # Garante que o diretório existe
             self.file_path.parent.mkdir(parents=True, exist_ok=True)
-            
+
             # Cria arquivo apenas se não existir
-            if not self.file_path.exists():
+            if not self.backend.exists():
                 initial_data = {
                     "usuarios": [],
                     "contas": [],
@@ -45,11 +1041,11 @@ class DatabaseManager:
                         "versao": "1.0"
                     }
                 }
-                self._save_to_file(initial_data)
-                
+                self.backend.save(initial_data)
+
             # Garante que o diretório de backups existe
             self.backup_dir.mkdir(exist_ok=True)
-                
+
         except Exception as e:
             raise DatabaseError(f"Falha ao inicializar arquivo de dados: {str(e)}")
 
@@ -57,86 +1053,259 @@ class DatabaseManager:
         """Valida a estrutura básica dos dados."""
         if not isinstance(data, dict):
             raise DatabaseError("Dados devem ser um dicionário")
-        
+        return self._validate_keys(data.keys())
+
+    def _validate_keys(self, keys):
+        """Valida que as chaves obrigatórias estão presentes."""
         required_keys = {'usuarios', 'contas', 'ultimo_numero_conta'}
-        if not required_keys.issubset(data.keys()):
+        if not required_keys.issubset(keys):
             raise DatabaseError(f"Dados devem conter as chaves: {required_keys}")
-        
+
         return True
 
-    def _create_backup(self):
-        """Cria um backup do arquivo atual com timestamp."""
+    def _record_backup(self, data=None):
+        """Conta uma gravação e tira um snapshot de backup quando for devido.
+        
+        Args:
+            data (dict): Dados completos recém-gravados; se omitido (gravação
+                incremental), são lidos do armazenamento só se houver snapshot
+        """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = self.backup_dir / f"banco_ufs_backup_{timestamp}.json"
-            shutil.copy2(self.file_path, backup_file)
-            
-            backups = sorted(self.backup_dir.glob("banco_ufs_backup_*.json"))
-            for old_backup in backups[:-5]:
-                old_backup.unlink()
-                
+            self.backups.record_operation(lambda: data if data is not None else self.backend.load())
         except Exception as e:
             raise DatabaseError(f"Falha ao criar backup: {str(e)}")
 
-    def _save_to_file(self, data):
-        """Salva dados no arquivo com tratamento de erro."""
-        try:
-            with open(self.file_path, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=4, ensure_ascii=False, cls=DecimalEncoder)
-        except Exception as e:
-            raise DatabaseError(f"Falha ao salvar dados: {str(e)}")
-
     def load_data(self):
         """
-        Carrega os dados do arquivo JSON.
-        
+        Carrega os dados do armazenamento.
+
+        No modo journal, os registros do journal são reaplicados sobre o snapshot.
+        Se o arquivo estiver corrompido, tenta recuperar automaticamente a
+        partir de uma escrita interrompida ou, em último caso, do último backup.
+
         Returns:
             dict: Dados carregados do arquivo
-            
+
         Raises:
             DatabaseError: Se houver erro ao carregar ou validar os dados
         """
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                
-            self._validate_data(data)
+            self.drain()
+            try:
+                data = self.backend.load()
+                self._validate_data(data)
+            except (ValueError, DatabaseError) as e:
+                data = self._recover(e)
             return data
-            
-        except json.JSONDecodeError as e:
-            raise DatabaseError(f"Arquivo corrompido: {str(e)}")
+
+        except DatabaseError:
+            raise
         except Exception as e:
             raise DatabaseError(f"Falha ao carregar dados: {str(e)}")
 
-    def save_data(self, data):
+    def iter_data(self):
         """
-        Salva dados no arquivo JSON com backup automático.
-        
+        Carrega os dados de forma incremental, um usuário/conta por vez.
+
+        Cada registro pode ser descartado por quem consome assim que for
+        processado, evitando manter a árvore JSON inteira em memória. A
+        validação de estrutura é a mesma de ``load_data``; ela é concluída
+        quando o documento termina.
+
+        Yields:
+            tuple: (chave, valor), ver ``StorageBackend.iter_load``
+
+        Raises:
+            DatabaseError: Se o arquivo estiver ilegível ou com estrutura
+                inválida. Registros já entregues devem ser descartados e a
+                carga refeita com ``load_data`` (que tenta a recuperação).
+        """
+        self.drain()
+        keys = set()
+        try:
+            yield from self.backend.iter_load(keys)
+            self._validate_keys(keys)
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError(f"Falha ao carregar dados: {str(e)}")
+
+    def load_snapshot(self):
+        """
+        Carrega o snapshot binário colunar, se existir e estiver em dia com o
+        armazenamento principal. Os dados dele já passaram pela validação ao
+        serem gravados.
+
+        Returns:
+            binary_snapshot.SnapshotColunar | None: None quando a carga normal
+                (load_data) deve ser usada
+        """
+        self.drain()
+        return self.backend.load_snapshot()
+
+    def _recover(self, erro):
+        """Recupera dados ilegíveis; JSONDecodeError é um ValueError."""
+        if self.backend.recover():
+            data = self.backend.load()
+            self._validate_data(data)
+            print("Arquivo de dados recuperado de uma escrita interrompida")
+            return data
+        if self.backups.find_snapshot() is not None:
+            data = self._restore_backup_sync()
+            print("Arquivo de dados corrompido; restaurado do último backup")
+            return data
+        raise DatabaseError(f"Arquivo corrompido: {str(erro)}")
+
+    def save_data(self, data, on_failure=None):
+        """
+        Salva todos os dados com backup automático (snapshots incrementais
+        tirados conforme a política de tempo/número de gravações).
+
+        No modo journal, funciona como um checkpoint: grava o snapshot completo
+        e descarta o journal.
+
         Args:
             data (dict): Dados a serem salvos
-            
+            on_failure (callable): No modo assíncrono, chamado com a exceção
+                se a gravação em segundo plano falhar, para quem gerou os
+                dados poder gravá-los de novo
+
         Raises:
             DatabaseError: Se houver erro ao validar ou salvar os dados
         """
+        self._validate_data(data)
+        self._submit(self._save_data_sync, data, on_failure=on_failure)
+
+    def _save_data_sync(self, data):
+        # A escrita é atômica: em caso de falha o arquivo anterior continua intacto
         try:
             self._validate_data(data)
-            self._create_backup()
-            self._save_to_file(data)
+            self.backend.save(data)
         except Exception as e:
-            # Tenta restaurar do backup em caso de erro
-            try:
-                backups = sorted(self.backup_dir.glob("banco_ufs_backup_*.json"))
-                if backups:
-                    shutil.copy2(backups[-1], self.file_path)
-            except:
-                pass
             raise DatabaseError(f"Erro ao salvar dados: {str(e)}")
+        self._remove_orphan_segments(data)
+        self._record_backup(data)
+
+    def apply_records(self, records, on_failure=None):
+        """
+        Grava apenas as alterações informadas (journal ou upserts no SQLite).
+
+        Args:
+            records (list): Registros com a chave ``op`` ('usuario', 'conta',
+                'remover_usuario', 'remover_conta' ou 'ultimo_numero_conta')
+            on_failure (callable): No modo assíncrono, chamado com a exceção
+                se a gravação em segundo plano falhar; os registros não são
+                regravados sozinhos, quem os gerou deve reenviá-los
+
+        Raises:
+            DatabaseError: Se o armazenamento não for incremental ou a escrita falhar
+        """
+        if not self.incremental:
+            raise DatabaseError("Armazenamento não suporta gravação incremental")
+        self._submit(self._apply_records_sync, records, on_failure=on_failure)
+
+    def _apply_records_sync(self, records):
+        try:
+            self.backend.apply_records(records)
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError(f"Erro ao salvar alterações: {str(e)}")
+        self._remove_segments(record['numero'] for record in records
+                              if record['op'] == 'remover_conta')
+        self._record_backup()
+
+    def _remove_segments(self, numeros):
+        """Apaga os segmentos do histórico de contas cuja remoção já foi gravada."""
+        if self.history_dir is None:
+            return
+        for numero in numeros:
+            shutil.rmtree(diretorio_da_conta(self.history_dir, numero), ignore_errors=True)
+
+    def _remove_orphan_segments(self, data):
+        """Apaga os segmentos de contas que não constam mais dos dados gravados.
+
+        Números de conta nunca são reaproveitados, então só contam como
+        removidas as contas com número até ``ultimo_numero_conta``: as criadas
+        depois que estes dados foram montados ainda não aparecem neles.
+        """
+        if self.history_dir is None or not os.path.isdir(self.history_dir):
+            return
+        existentes = {conta['numero'] for conta in data['contas']}
+        orfas = []
+        for nome in os.listdir(self.history_dir):
+            prefixo, _, numero = nome.partition('_')
+            if prefixo != 'conta' or not numero.isdigit():
+                continue
+            numero = int(numero)
+            if numero <= data['ultimo_numero_conta'] and numero not in existentes:
+                orfas.append(numero)
+        self._remove_segments(orfas)
+
+    def compact(self):
+        """Compacta o journal no snapshot (apenas armazenamento JSON com journal)."""
+        if isinstance(self.backend, JsonBackend):
+            self._submit(self.backend.compact)
+
+    def get_usuario(self, cpf):
+        """Busca um usuário diretamente no armazenamento (indexado no SQLite).
+
+        O Banco mantém todos os usuários e contas em memória e não usa esta
+        consulta; ela serve a ferramentas que leem o armazenamento sem montar
+        o Banco (relatórios, conferência de outro processo).
+        """
+        self.drain()
+        return self.backend.get_usuario(cpf)
+
+    def get_conta(self, numero):
+        """Busca uma conta diretamente no armazenamento (indexado no SQLite).
+
+        Como ``get_usuario``, não é usada pelo Banco, que carrega tudo ao iniciar.
+        """
+        self.drain()
+        return self.backend.get_conta(numero)
+
+    def close(self):
+        """Garante que alterações pendentes estejam em disco e libera recursos.
+        
+        No modo assíncrono, esvazia a fila de gravações antes de fechar.
+        """
+        self.drain()
+        self._submit(self.backend.close)
+        self.drain()
 
     def get_backup_files(self):
-        """Retorna lista de arquivos de backup disponíveis."""
-        return sorted(self.backup_dir.glob("banco_ufs_backup_*.json"))
+        """Retorna lista de snapshots de backup disponíveis."""
+        return self.backups.list_snapshots()
+
+    def restore_backup(self, when=None):
+        """
+        Restaura o armazenamento para o estado de um snapshot de backup.
+
+        Args:
+            when (datetime): Instante desejado; usa o snapshot mais recente
+                tirado até ele. Se omitido, usa o último snapshot.
+
+        Returns:
+            dict: Dados restaurados
+
+        Raises:
+            DatabaseError: Se não houver snapshot até o instante informado
+        """
+        self.drain()
+        return self._restore_backup_sync(when)
+
+    def _restore_backup_sync(self, when=None):
+        manifest = self.backups.find_snapshot(when)
+        if manifest is None:
+            raise DatabaseError("Nenhum backup disponível para o instante informado")
+        data = self.backups.load_snapshot(manifest)
+        self._validate_data(data)
+        self.backups.restore_segments(manifest)
+        self.backend.save(data)
+        return data
 
 
 class DatabaseError(Exception):
     """Exceção personalizada para erros do DatabaseManager."""
-    pass
\ No newline at end of file
+    pass
@@ -0,0 +1,235 @@
+"""Valor monetário imutável em centavos inteiros.
+
+``Dinheiro`` substitui as conversões float → str → Decimal → float espalhadas
+pelas contas e transações: a conversão (com arredondamento para centavos,
+meio-para-par, como o ``quantize`` usado antes) acontece uma única vez, na
+entrada, e daí em diante soma, subtração e comparação são operações com
+inteiros, exatas.
+
+Para o restante do sistema ele se comporta como um número: aceita
+``float``/``int``/``Decimal`` nas operações, funciona com ``sum()``,
+``abs()`` e com formatações como ``f"{valor:,.2f}"``, e converte com
+``float()``. Na persistência é gravado como número (ver DecimalEncoder).
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN, localcontext
+import math
+import sys
+
+# Abaixo deste módulo, valor * 100 em float ainda representa o centavo com folga
+_LIMITE_RAPIDO = 2.0 ** 44
+
+
+def _para_centavos(valor):
+    """Converte um número (ou string numérica) em centavos inteiros."""
+    tipo = type(valor)
+    if tipo is Dinheiro:
+        return valor._centavos
+    if tipo is int:
+        return valor * 100
+    if tipo is float:
+        if not math.isfinite(valor):
+            raise ValueError(f"Valor monetário inválido: {valor!r}")
+        escalado = valor * 100
+        if abs(escalado) < _LIMITE_RAPIDO:
+            centavos = round(escalado)
+            # Já está em centavos (caso comum): dispensa o Decimal
+            if abs(escalado - centavos) < 1e-6:
+                return centavos
+        valor = Decimal(repr(valor))
+    elif isinstance(valor, bool):
+        raise TypeError("Valor monetário não pode ser booleano")
+    elif isinstance(valor, Dinheiro):
+        return valor._centavos
+    elif isinstance(valor, int):
+        return int(valor) * 100
+    elif not isinstance(valor, Decimal):
+        if not isinstance(valor, str):
+            raise TypeError(f"Valor monetário inválido: {valor!r}")
+        try:
+            valor = Decimal(valor.strip())
+        except InvalidOperation:
+            raise ValueError(f"Valor monetário inválido: {valor!r}")
+    if not valor.is_finite():
+        raise ValueError(f"Valor monetário inválido: {valor!r}")
+    return int(valor.scaleb(2).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+class Dinheiro:
+    """Quantia em reais, guardada como um inteiro de centavos."""
+
+    __slots__ = ('_centavos',)
+
+    def __init__(self, valor=0):
+        """
+        Args:
+            valor: Reais como int, float, Decimal, str ou Dinheiro
+                (arredondado para centavos)
+
+        Raises:
+            ValueError: Se o valor não for um número finito
+            TypeError: Se o tipo não for numérico
+        """
+        object.__setattr__(self, '_centavos', _para_centavos(valor))
+
+    @classmethod
+    def de_centavos(cls, centavos):
+        """Cria a partir de um inteiro de centavos (sem conversão)."""
+        dinheiro = object.__new__(cls)
+        object.__setattr__(dinheiro, '_centavos', int(centavos))
+        return dinheiro
+
+    @property
+    def centavos(self):
+        """Valor em centavos (int)."""
+        return self._centavos
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Dinheiro é imutável")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (Dinheiro.de_centavos, (self._centavos,))
+
+    # Conversões
+
+    def como_decimal(self):
+        """Valor exato em reais, como Decimal."""
+        return Decimal(self._centavos).scaleb(-2)
+
+    def __float__(self):
+        try:
+            return self._centavos / 100
+        except OverflowError:
+            # Valor além da faixa do float: satura
+            return -sys.float_info.max if self._centavos < 0 else sys.float_info.max
+
+    def __int__(self):
+        reais = abs(self._centavos) // 100
+        return reais if self._centavos >= 0 else -reais
+
+    def __bool__(self):
+        return self._centavos != 0
+
+    def __str__(self):
+        sinal = '-' if self._centavos < 0 else ''
+        reais, centavos = divmod(abs(self._centavos), 100)
+        return f"{sinal}{reais}.{centavos:02d}"
+
+    def __repr__(self):
+        return f"Dinheiro('{self}')"
+
+    def __format__(self, especificacao):
+        if not especificacao:
+            return str(self)
+        return format(self.como_decimal(), especificacao)
+
+    # Aritmética
+
+    def __add__(self, outro):
+        try:
+            return Dinheiro.de_centavos(self._centavos + _para_centavos(outro))
+        except TypeError:
+            return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        try:
+            return Dinheiro.de_centavos(self._centavos - _para_centavos(outro))
+        except TypeError:
+            return NotImplemented
+
+    def __rsub__(self, outro):
+        try:
+            return Dinheiro.de_centavos(_para_centavos(outro) - self._centavos)
+        except TypeError:
+            return NotImplemented
+
+    def __mul__(self, fator):
+        """Multiplica por um número (ex.: taxa), arredondando para centavos."""
+        if isinstance(fator, Dinheiro):
+            return NotImplemented
+        if type(fator) is int:
+            return Dinheiro.de_centavos(self._centavos * fator)
+        if type(fator) is float and abs(self._centavos) < _LIMITE_RAPIDO:
+            produto = self._centavos * fator
+            if abs(produto) < _LIMITE_RAPIDO:
+                return Dinheiro.de_centavos(round(produto))
+        try:
+            fator = Decimal(fator)
+        except (TypeError, ValueError, InvalidOperation):
+            return NotImplemented
+        # Precisão suficiente para o produto exato, qualquer que seja a magnitude
+        with localcontext() as contexto:
+            contexto.prec = len(str(abs(self._centavos))) + len(fator.as_tuple().digits)
+            produto = Decimal(self._centavos) * fator
+        return Dinheiro.de_centavos(produto.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        """Dinheiro / Dinheiro é uma razão (float); Dinheiro / número, uma quantia."""
+        if isinstance(divisor, Dinheiro):
+            return self._centavos / divisor._centavos
+        if isinstance(divisor, bool) or not isinstance(divisor, (int, float, Decimal)):
+            return NotImplemented
+        quociente = Decimal(self._centavos) / Decimal(divisor)
+        return Dinheiro.de_centavos(quociente.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+    def __round__(self, casas=None):
+        if casas is None:
+            return round(self.como_decimal())
+        if casas >= 2:
+            return self
+        return Dinheiro(round(self.como_decimal(), casas))
+
+    def __neg__(self):
+        return Dinheiro.de_centavos(-self._centavos)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self._centavos >= 0 else -self
+
+    # Comparação
+
+    def _comparavel(self, outro):
+        """Par de valores comparáveis: centavos, ou o valor no tipo do outro número."""
+        if isinstance(outro, Dinheiro):
+            return self._centavos, outro._centavos
+        if isinstance(outro, bool) or not isinstance(outro, (int, float, Decimal)):
+            return None
+        if isinstance(outro, int):
+            return self._centavos, outro * 100
+        if isinstance(outro, float):
+            return float(self), outro
+        return self.como_decimal(), outro
+
+    def __eq__(self, outro):
+        par = self._comparavel(outro)
+        return NotImplemented if par is None else par[0] == par[1]
+
+    def __lt__(self, outro):
+        par = self._comparavel(outro)
+        return NotImplemented if par is None else par[0] < par[1]
+
+    def __le__(self, outro):
+        par = self._comparavel(outro)
+        return NotImplemented if par is None else par[0] <= par[1]
+
+    def __gt__(self, outro):
+        par = self._comparavel(outro)
+        return NotImplemented if par is None else par[0] > par[1]
+
+    def __ge__(self, outro):
+        par = self._comparavel(outro)
+        return NotImplemented if par is None else par[0] >= par[1]
+
+    def __hash__(self):
+        # Igual ao hash do Decimal de mesmo valor (e do int/float, quando iguais)
+        return hash(self.como_decimal())
+
+
+ZERO = Dinheiro.de_centavos(0)
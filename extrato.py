@@ -0,0 +1,222 @@
+"""Geração de extratos sob demanda.
+
+As linhas do extrato são geradas uma a uma a partir do histórico da conta
+(inclusive das partes seladas em disco), com filtro de período e paginação,
+e podem ser gravadas direto em arquivo texto ou CSV sem montar o extrato
+inteiro em memória. O modo em massa gera, em paralelo, os extratos de
+fechamento de mês de todas as contas, com uma única gravação do banco no fim.
+
+Uso:
+    python extrato.py ANO MES [--banco banco_ufs.json] [--saida DIR]
+                      [--formato txt|csv] [--trabalhadores N]
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from datetime import datetime, timedelta
+import os
+import time
+
+from historico import natureza
+
+FORMATOS = ('txt', 'csv')
+CABECALHO = "========== EXTRATO =========="
+RODAPE = "==========================="
+POR_PAGINA = 50
+
+
+def formatar_transacao(transacao):
+    """Linha do extrato de uma transação (dicionário do histórico)."""
+    return f"{transacao['data']} - {transacao['tipo']}: R$ {transacao['valor']:.2f}"
+
+
+def periodo_do_mes(ano, mes):
+    """Primeiro e último segundo do mês, como datetimes."""
+    inicio = datetime(ano, mes, 1)
+    seguinte = datetime(ano + mes // 12, mes % 12 + 1, 1)
+    return inicio, seguinte - timedelta(seconds=1)
+
+
+class Extrato:
+    """Extrato de um histórico em um período, gerado sob demanda."""
+
+    def __init__(self, historico, saldo, inicio=None, fim=None):
+        """
+        Args:
+            historico (Historico): Histórico da conta
+            saldo: Saldo mostrado no fechamento do extrato: o atual ou, com
+                ``fim``, o saldo final do período
+            inicio (datetime): Início do período (padrão: desde a primeira transação)
+            fim (datetime): Fim do período, inclusive (padrão: até a última)
+        """
+        self._historico = historico
+        self.saldo = saldo
+        self.inicio = inicio
+        self.fim = fim
+
+    def total(self):
+        """Quantidade de transações no período."""
+        return self._historico.contar_entre(self.inicio, self.fim)
+
+    def paginas(self, por_pagina=POR_PAGINA):
+        """Quantidade de páginas do extrato (pelo menos uma)."""
+        return max(1, -(-self.total() // por_pagina))
+
+    def transacoes(self, pagina=None, por_pagina=POR_PAGINA):
+        """
+        Gera as transações do período (ou de uma página), em ordem cronológica.
+
+        Args:
+            pagina (int): Página, a partir de 1 (padrão: todas as transações)
+            por_pagina (int): Transações por página
+        """
+        if pagina is None:
+            return self._historico.iterar_entre(self.inicio, self.fim)
+        if pagina < 1 or por_pagina < 1:
+            raise ValueError("Página inválida")
+        return self._historico.iterar_entre(self.inicio, self.fim,
+                                            (pagina - 1) * por_pagina, por_pagina)
+
+    def linhas(self, pagina=None, por_pagina=POR_PAGINA):
+        """
+        Gera as linhas do extrato (sem quebra de linha no fim), sob demanda.
+
+        Args:
+            pagina (int): Página, a partir de 1 (padrão: o extrato completo)
+            por_pagina (int): Transações por página
+        """
+        yield CABECALHO
+        if self.inicio is not None or self.fim is not None:
+            de = self.inicio.strftime("%d/%m/%Y") if self.inicio else "início"
+            ate = self.fim.strftime("%d/%m/%Y") if self.fim else "hoje"
+            yield f"Período: {de} a {ate}"
+        if pagina is not None:
+            yield f"Página {pagina} de {self.paginas(por_pagina)}"
+        vazio = True
+        for transacao in self.transacoes(pagina, por_pagina):
+            vazio = False
+            yield formatar_transacao(transacao)
+        if vazio:
+            yield "Não foram realizadas movimentações."
+        yield ""
+        rotulo = "Saldo atual" if self.fim is None else "Saldo final do período"
+        yield f"{rotulo}: R$ {self.saldo:.2f}"
+        yield RODAPE
+
+    def escrever(self, arquivo, formato='txt'):
+        """
+        Grava o extrato completo do período em um arquivo aberto, linha a linha.
+
+        Args:
+            arquivo: Arquivo texto aberto para escrita (no CSV, com newline='')
+            formato (str): 'txt' (o extrato formatado) ou 'csv' (uma linha por
+                transação: data, tipo, natureza e valor)
+
+        Returns:
+            int: Transações gravadas
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: {formato}")
+        if formato == 'txt':
+            for linha in self.linhas():
+                arquivo.write(linha + "\n")
+            return self.total()
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['data', 'tipo', 'natureza', 'valor'])
+        total = 0
+        for transacao in self.transacoes():
+            escritor.writerow([transacao['data'], transacao['tipo'], natureza(transacao),
+                               f"{transacao['valor']:.2f}"])
+            total += 1
+        return total
+
+
+class ResumoExtratos:
+    """Totais de uma geração de extratos em massa."""
+
+    def __init__(self):
+        self.gerados = 0
+        self.transacoes = 0
+        self.erros = []  # (número da conta, mensagem)
+        self.duracao = 0.0
+
+    def __str__(self):
+        return (f"{self.gerados} extrato(s) gerado(s) em {self.duracao:.2f}s "
+                f"({self.transacoes} transação(ões)), {len(self.erros)} erro(s)")
+
+
+def gerar_extratos_mensais(banco, ano, mes, diretorio, formato='txt', trabalhadores=None):
+    """
+    Gera os extratos de fechamento de um mês de todas as contas, em paralelo.
+
+    Cada conta vira um arquivo ``extrato_<numero>_<aaaa>-<mm>.<formato>`` em
+    ``diretorio``. Os extratos são gravados linha a linha; o fechamento
+    (ex.: rendimento pendente das poupanças) é persistido uma única vez, no fim.
+
+    Args:
+        banco (Banco): Banco dono das contas
+        ano, mes (int): Mês de referência
+        diretorio (str): Onde gravar os extratos
+        formato (str): 'txt' ou 'csv'
+        trabalhadores (int): Threads (padrão: número de CPUs)
+
+    Returns:
+        ResumoExtratos
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}")
+    inicio, fim = periodo_do_mes(ano, mes)
+    os.makedirs(diretorio, exist_ok=True)
+    resumo = ResumoExtratos()
+    comeco = time.perf_counter()
+
+    def gerar(conta):
+        caminho = os.path.join(diretorio, f"extrato_{conta.get_numero()}_{ano:04d}-{mes:02d}.{formato}")
+        try:
+            with open(caminho, 'w', newline='' if formato == 'csv' else None,
+                      encoding='utf-8') as arquivo:
+                return conta.extrato(inicio, fim).escrever(arquivo, formato), None
+        except Exception as e:
+            return 0, str(e)
+
+    contas = list(banco.get_contas())
+    with banco._adiar_gravacao(), \
+            ThreadPoolExecutor(max_workers=trabalhadores or os.cpu_count() or 4,
+                               thread_name_prefix="Extratos") as pool:
+        for conta, (transacoes, erro) in zip(contas, pool.map(gerar, contas)):
+            if erro is None:
+                resumo.gerados += 1
+                resumo.transacoes += transacoes
+            else:
+                resumo.erros.append((conta.get_numero(), erro))
+    resumo.duracao = time.perf_counter() - comeco
+    return resumo
+
+
+def main(argv=None):
+    from banco import Banco
+
+    parser = argparse.ArgumentParser(description="Gera os extratos mensais de todas as contas.")
+    parser.add_argument('ano', type=int, help="Ano de referência")
+    parser.add_argument('mes', type=int, choices=range(1, 13), metavar='MES',
+                        help="Mês de referência (1-12)")
+    parser.add_argument('--banco', default='banco_ufs.json', help="Arquivo de dados do banco")
+    parser.add_argument('--saida', default='extratos', help="Diretório dos extratos")
+    parser.add_argument('--formato', choices=FORMATOS, default='txt', help="Formato dos extratos")
+    parser.add_argument('--trabalhadores', type=int, help="Threads (padrão: número de CPUs)")
+    args = parser.parse_args(argv)
+
+    banco = Banco(args.banco)
+    try:
+        resumo = gerar_extratos_mensais(banco, args.ano, args.mes, args.saida,
+                                        args.formato, args.trabalhadores)
+    finally:
+        banco.encerrar_contas_poupanca()
+    print(resumo)
+    for numero, erro in resumo.erros:
+        print(f"Conta {numero}: {erro}")
+    return 0 if not resumo.erros else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,99 +1,718 @@
-from datetime import datetime
-from typing import List, Dict, Optional, Union
-from transacao import Deposito, Saque, Transferencia
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from itertools import islice
+import os
+import threading
+from typing import List, Dict, Optional
+
+from config import HISTORICO_EM_MEMORIA
+from dinheiro import Dinheiro
+from segmento_historico import SegmentoHistorico, gravar_segmento
+
+# Tipos de transação conhecidos; a coluna de tipo guarda o índice nesta lista
+TIPOS: List[str] = ['Deposito', 'Saque', 'Transferencia', 'Rendimento']
+_CODIGOS: Dict[str, int] = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+_trava_tipos = threading.Lock()
+
+DEPOSITO, SAQUE, TRANSFERENCIA, RENDIMENTO = range(4)
+
+# Tipos que entram como crédito por padrão; os demais (inclusive tipos novos)
+# são débitos. Uma entrada pode indicar a natureza explicitamente (ex.: a
+# transferência recebida, que é crédito), com 'natureza': 'credito'/'debito'.
+_CREDITOS = frozenset((DEPOSITO, RENDIMENTO))
+CREDITO, DEBITO = 'credito', 'debito'
+
+_EPOCA = datetime(1970, 1, 1)
+_ORDINAL_EPOCA = _EPOCA.toordinal()
+_LIMITE_COLUNA = 2 ** 63
+
+
+def codigo_tipo(tipo: str) -> int:
+    """Retorna o código do tipo de transação, registrando tipos novos."""
+    codigo = _CODIGOS.get(tipo)
+    if codigo is None:
+        with _trava_tipos:
+            codigo = _CODIGOS.get(tipo)
+            if codigo is None:
+                codigo = len(TIPOS)
+                TIPOS.append(tipo)
+                _CODIGOS[tipo] = codigo
+    return codigo
+
+
+def instante(momento: datetime) -> int:
+    """Converte um datetime (hora local) em segundos desde 01/01/1970."""
+    return ((momento.toordinal() - _ORDINAL_EPOCA) * 86400
+            + momento.hour * 3600 + momento.minute * 60 + momento.second)
+
+
+def data_hora(segundos: int) -> datetime:
+    """Converte um instante (segundos desde 01/01/1970) de volta em datetime."""
+    return _EPOCA + timedelta(seconds=segundos)
+
+
+def formatar_instante(segundos: int) -> str:
+    """Formata um instante como 'dd/mm/aaaa hh:mm:ss'."""
+    dias, segundos = divmod(segundos, 86400)
+    dia = date.fromordinal(_ORDINAL_EPOCA + dias)
+    horas, segundos = divmod(segundos, 3600)
+    minutos, segundos = divmod(segundos, 60)
+    return (f"{dia.day:02d}/{dia.month:02d}/{dia.year:04d} "
+            f"{horas:02d}:{minutos:02d}:{segundos:02d}")
+
+
+def natureza(entrada: Dict) -> str:
+    """Natureza ('credito' ou 'debito') de uma entrada no formato de dicionário."""
+    if 'natureza' in entrada:
+        return entrada['natureza']
+    return CREDITO if _CODIGOS.get(entrada['tipo']) in _CREDITOS else DEBITO
+
+
+def ler_data(data: str) -> Optional[int]:
+    """Converte 'dd/mm/aaaa hh:mm:ss' em instante; None se fora do formato."""
+    try:
+        if (len(data) != 19 or data[2] != '/' or data[5] != '/' or data[10] != ' '
+                or data[13] != ':' or data[16] != ':'):
+            return None
+        campos = (data[0:2], data[3:5], data[6:10], data[11:13], data[14:16], data[17:19])
+        if not all(campo.isdigit() for campo in campos):
+            return None
+        dia, mes, ano, horas, minutos, segundos = map(int, campos)
+        if horas > 23 or minutos > 59 or segundos > 59:
+            return None
+        dias = date(ano, mes, dia).toordinal() - _ORDINAL_EPOCA
+    except (TypeError, ValueError):
+        return None
+    return dias * 86400 + horas * 3600 + minutos * 60 + segundos
+
+
+_TAMANHO_PAGINA = 4096  # Entradas lidas por vez de um segmento
+
+
+def _montar_entrada(codigo: int, segundos: int, movimento: int, extras: Optional[Dict]) -> Dict:
+    """Monta o dicionário de uma entrada a partir dos valores das colunas.
+
+    A natureza só aparece quando difere da padrão do tipo (ex.:
+    transferência recebida).
+    """
+    entrada = {
+        'tipo': TIPOS[codigo],
+        'valor': Dinheiro.de_centavos(abs(movimento)),
+        'data': formatar_instante(segundos),
+    }
+    if extras:
+        entrada.update(extras)
+    if movimento and (movimento > 0) != (codigo in _CREDITOS):
+        entrada['natureza'] = CREDITO if movimento > 0 else DEBITO
+    return entrada
+
+
+class _ColunaSegmentada:
+    """Coluna do histórico formada pelos segmentos selados seguidos da cauda em memória.
+
+    Acessada por índice como a coluna em ``array``; ``append`` inclui na cauda.
+    """
+
+    __slots__ = ('_nome', '_segmentos', '_inicios', '_base', 'cauda')
+
+    def __init__(self, nome, segmentos, inicios, base, cauda):
+        self._nome = nome
+        self._segmentos = segmentos
+        self._inicios = inicios
+        self._base = base
+        self.cauda = cauda
+
+    def __len__(self):
+        return self._base + len(self.cauda)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+            if indice < 0:
+                raise IndexError("Índice fora do histórico")
+        if indice >= self._base:
+            return self.cauda[indice - self._base]
+        s = bisect_right(self._inicios, indice) - 1
+        return self._segmentos[s].ler(self._nome, indice - self._inicios[s])
+
+    def append(self, valor):
+        self.cauda.append(valor)
+
 
 class Historico:
-    """Classe responsável por registrar e gerenciar o histórico de transações bancárias.
-    
-    Attributes:
-        _transacoes (List[Dict]): Lista de transações registradas, cada uma representada como um dicionário
-                                  contendo 'tipo', 'valor' e 'data'.
+    """Classe responsável por registrar e gerenciar o histórico de transações da conta.
+
+    As entradas ficam em colunas paralelas de ``array`` (instante em segundos,
+    código do tipo e valor em centavos, com sinal: crédito positivo, débito
+    negativo), em vez de um dicionário com a data formatada. Campos adicionais
+    de entradas antigas ficam em um dicionário esparso. ``get_transacoes``
+    devolve uma visão somente leitura que monta os dicionários sob demanda.
+
+    Uma coluna de saldo acumulado (soma dos créditos menos os débitos desde a
+    primeira entrada) é mantida a cada inclusão, de modo que o saldo após uma
+    entrada sai em O(1) e o saldo em um instante, por busca binária.
+
+    As consultas por período (``entre``, ``ultimas``, ``por_tipo``) fazem
+    busca binária na coluna de instantes, que já está em ordem cronológica
+    quando as entradas são registradas na hora. Se alguma entrada antiga
+    estiver fora de ordem, um índice com a ordem cronológica é montado sob
+    demanda e descartado na inclusão seguinte.
+
+    Com um diretório de arquivo (``arquivar_em``), só as ``LIMITE_MEMORIA``
+    entradas mais recentes ficam em memória: as mais antigas são seladas em
+    segmentos imutáveis em disco (ver segmento_historico), lidos por mmap.
+    Os índices continuam contando desde a primeira entrada, e as consultas e
+    visões percorrem os segmentos de forma transparente; ``to_dict`` devolve
+    só a parte em memória, e ``arquivado`` as referências aos segmentos.
     """
-    
+
+    LIMITE_MEMORIA = HISTORICO_EM_MEMORIA
+
     def __init__(self):
-        """Inicializa um novo histórico com lista vazia de transações."""
-        self._transacoes: List[Dict[str, Union[str, float]]] = []
-    
-    def adicionar_transacao(self, transacao: Union[Deposito, Saque, Transferencia]) -> None:
+        """Inicializa um novo histórico vazio."""
+        self._instantes = array('q')
+        self._tipos = array('H')
+        self._centavos = array('q')
+        self._centavos_grandes: Dict[int, int] = {}  # Valores fora da faixa de 64 bits
+        self._saldos = array('q')  # Vira lista de int se sair da faixa de 64 bits
+        # Colunas em memória (sem segmentos, as próprias colunas acima)
+        self._caudas = (self._instantes, self._tipos, self._centavos, self._saldos)
+        self._extras: Dict[int, Dict] = {}
+        self._ordenado = True  # Instantes em ordem não decrescente
+        self._ordem = None  # (instantes ordenados, índices) quando fora de ordem
+        self._segmentos: List[SegmentoHistorico] = []
+        self._inicios: List[int] = []  # Índice da primeira entrada de cada segmento
+        self._base = 0  # Entradas seladas em segmentos
+        self._diretorio = None
+        self._geracao = 0  # Muda quando o conteúdo é substituído (carregar), não ao anexar
+        self._alterado = False
+        self._ao_alterar = None
+
+    def __len__(self):
+        return len(self._instantes)
+
+    def arquivar_em(self, diretorio: str):
+        """Define o diretório dos segmentos selados deste histórico."""
+        self._diretorio = diretorio
+
+    def arquivado(self) -> Optional[Dict]:
+        """Referências aos segmentos selados (para persistência), ou None se não houver.
+
+        Returns:
+            {'base': entradas seladas, 'segmentos': nomes dos arquivos}
+        """
+        if not self._segmentos:
+            return None
+        return {'base': self._base, 'segmentos': [s.nome for s in self._segmentos]}
+
+    def fechar_segmentos(self):
+        """Libera os mmaps dos segmentos selados (ex.: antes de apagar os arquivos)."""
+        for segmento in self._segmentos:
+            segmento.fechar()
+
+    def _segmento_de(self, indice: int):
+        """Segmento que contém a entrada selada ``indice`` e a posição nele."""
+        s = bisect_right(self._inicios, indice) - 1
+        return self._segmentos[s], indice - self._inicios[s]
+
+    def _montar_colunas(self, segmentos, instantes, tipos, centavos, saldos):
+        """Troca as colunas: ``segmentos`` selados seguidos das caudas dadas."""
+        inicios, base = [], 0
+        for segmento in segmentos:
+            inicios.append(base)
+            base += segmento.total
+        self._caudas = (instantes, tipos, centavos, saldos)
+        if segmentos:
+            instantes, tipos, centavos, saldos = (
+                _ColunaSegmentada(nome, segmentos, inicios, base, cauda)
+                for nome, cauda in (('instantes', instantes), ('tipos', tipos),
+                                    ('centavos', centavos), ('saldos', saldos)))
+        self._centavos = centavos
+        self._tipos = tipos
+        self._saldos = saldos
+        self._instantes = instantes  # Por último: define o tamanho visível
+        self._segmentos = segmentos
+        self._inicios = inicios
+        self._base = base
+
+    def selar(self) -> bool:
+        """Sela em um segmento as entradas mais antigas, se a parte em memória passou do limite.
+
+        Mantém em memória as ``LIMITE_MEMORIA // 2`` entradas mais recentes,
+        de modo que cada segmento tem pelo menos metade do limite.
+
+        Returns:
+            bool: True se algo foi selado (a persistência da conta mudou)
+        """
+        if self._diretorio is None:
+            return False
+        inicio = self._base
+        quantidade = len(self) - inicio - self.LIMITE_MEMORIA // 2
+        if len(self) - inicio <= self.LIMITE_MEMORIA or quantidade <= 0:
+            return False
+        fim = inicio + quantidade
+        caudas = self._caudas
+        instantes, tipos, centavos, saldos = caudas
+        # Nome único: um segmento nunca é sobrescrito, mesmo que o mesmo
+        # trecho seja selado de novo a partir de um estado restaurado
+        nome = f"{inicio:012d}-{fim - 1:012d}-{os.urandom(4).hex()}.seg"
+        segmento = gravar_segmento(
+            os.path.join(self._diretorio, nome),
+            instantes[:quantidade], tipos[:quantidade], centavos[:quantidade], saldos[:quantidade],
+            {i - inicio: v for i, v in self._centavos_grandes.items() if i < fim},
+            {i - inicio: v for i, v in self._extras.items() if i < fim})
+        self._montar_colunas(self._segmentos + [segmento],
+                             *(cauda[quantidade:] for cauda in caudas))
+        self._centavos_grandes = {i: v for i, v in self._centavos_grandes.items() if i >= fim}
+        self._extras = {i: v for i, v in self._extras.items() if i >= fim}
+        return True
+
+    def _extras_de(self, indice: int) -> Optional[Dict]:
+        """Campos extras da entrada ``indice`` (em memória ou no segmento)."""
+        if indice < self._base:
+            segmento, posicao = self._segmento_de(indice)
+            return segmento.extras(posicao)
+        return self._extras.get(indice)
+
+    def _marcar_alterado(self):
+        """Marca o histórico como alterado e avisa o dono (a conta)."""
+        self._alterado = True
+        if self._ao_alterar:
+            self._ao_alterar()
+
+    def _anexar(self, codigo: int, segundos: int, valor: Dinheiro, extras: Optional[Dict] = None,
+                credito: Optional[bool] = None):
+        """Anexa uma entrada às colunas, sem marcar o histórico como alterado.
+
+        Args:
+            credito: Natureza da entrada (padrão: a do tipo)
+        """
+        if credito is None:
+            credito = codigo in _CREDITOS
+        centavos = abs(valor.centavos)
+        if not credito:
+            centavos = -centavos
+        # Inclui direto nas colunas em memória (a cauda, se houver segmentos)
+        instantes, tipos, colunas_centavos, saldos = self._caudas
+        indice = self._base + len(instantes)
+        if instantes:
+            anterior, saldo = instantes[-1], saldos[-1]
+        elif indice:
+            anterior, saldo = self._instantes[-1], self._saldos[-1]
+        else:
+            anterior, saldo = segundos, 0
+        saldo += centavos
+        if not -_LIMITE_COLUNA < saldo < _LIMITE_COLUNA and isinstance(saldos, array):
+            saldos = saldos.tolist()
+            if self._segmentos:
+                self._saldos.cauda = saldos
+            else:
+                self._saldos = saldos
+            self._caudas = (instantes, tipos, colunas_centavos, saldos)
+        if not -_LIMITE_COLUNA < centavos < _LIMITE_COLUNA:
+            self._centavos_grandes[indice] = centavos
+            centavos = 0
+        if extras:
+            self._extras[indice] = extras
+        if segundos < anterior:
+            self._ordenado = False
+        self._ordem = None
+        colunas_centavos.append(centavos)
+        tipos.append(codigo)
+        saldos.append(saldo)
+        instantes.append(segundos)  # Por último: define o tamanho visível
+        if self._diretorio is not None and len(instantes) > self.LIMITE_MEMORIA:
+            self.selar()
+
+    def _anexar_entrada(self, entrada: Dict):
+        """Anexa uma entrada no formato de dicionário (tipo, valor, data e extras)."""
+        extras = {k: v for k, v in entrada.items() if k not in ('tipo', 'valor', 'data')}
+        natureza = extras.pop('natureza', None)
+        data = entrada.get('data')
+        segundos = ler_data(data) if isinstance(data, str) else None
+        if segundos is None:
+            # Data fora do formato: preserva o texto original
+            segundos = 0
+            extras['data'] = data
+        self._anexar(codigo_tipo(entrada['tipo']), segundos, Dinheiro(entrada['valor']), extras,
+                     None if natureza is None else natureza == CREDITO)
+
+    def carregar(self, entradas, arquivado: Optional[Dict] = None):
+        """Substitui o conteúdo pelas entradas já persistidas (lista de dicionários).
+
+        Args:
+            entradas: Entradas em memória (as mais recentes)
+            arquivado: Referências aos segmentos selados, como em ``arquivado()``
+
+        Raises:
+            ValueError: Se os segmentos não corresponderem às referências
+        """
+        ao_alterar, diretorio, geracao = self._ao_alterar, self._diretorio, self._geracao
+        Historico.__init__(self)
+        self._ao_alterar, self._diretorio = ao_alterar, diretorio
+        self._geracao = geracao + 1
+        if arquivado and arquivado.get('segmentos'):
+            if diretorio is None:
+                raise ValueError("Histórico com segmentos, mas sem diretório de arquivo")
+            segmentos = [SegmentoHistorico(os.path.join(diretorio, nome))
+                         for nome in arquivado['segmentos']]
+            if sum(s.total for s in segmentos) != arquivado.get('base'):
+                raise ValueError("Segmentos do histórico não conferem com a base registrada")
+            self._montar_colunas(segmentos, array('q'), array('H'), array('q'), array('q'))
+            self._ordenado = all(
+                s.ordenado and (i == 0 or segmentos[i - 1].ultimo_instante <= s.primeiro_instante)
+                for i, s in enumerate(segmentos))
+        # Sem selar durante a carga: quem carrega decide quando selar (e regravar)
+        self._diretorio = None
+        try:
+            for entrada in entradas:
+                self._anexar_entrada(entrada)
+        finally:
+            self._diretorio = diretorio
+
+    def registrar(self, entrada: Dict):
+        """Anexa uma entrada já formatada ao histórico."""
+        self._anexar_entrada(entrada)
+        self._marcar_alterado()
+
+    def registrar_valor(self, tipo: str, valor: Dinheiro, momento: Optional[datetime] = None,
+                        credito: Optional[bool] = None):
+        """Anexa uma entrada a partir do tipo, valor e instante (padrão: agora).
+
+        Args:
+            credito: Natureza da entrada (padrão: a do tipo)
+        """
+        self._anexar(codigo_tipo(tipo), instante(momento or datetime.now()), valor,
+                     credito=credito)
+        self._marcar_alterado()
+
+    def adicionar_transacao(self, transacao, credito: Optional[bool] = None):
         """Registra uma nova transação no histórico com data/hora atual.
-        
+
         Args:
             transacao: Objeto de transação (Deposito, Saque ou Transferencia)
-            
+            credito: Natureza da entrada (padrão: a do tipo; a transferência
+                é débito na origem e deve ser registrada como crédito no destino)
+
         Raises:
             ValueError: Se o objeto transação for inválido
         """
-        if not hasattr(transacao, 'get_valor') or not hasattr(transacao, '__class__'):
+        if not hasattr(transacao, 'get_valor'):
             raise ValueError("Objeto de transação inválido")
-            
-        self._transacoes.append({
-            'tipo': transacao.__class__.__name__,
-            'valor': transacao.get_valor(),
-            'data': datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        })
-    
-    def to_dict(self) -> List[Dict]:
-        """Converte o histórico para lista de dicionários serializável.
-        
+        self.registrar_valor(transacao.__class__.__name__, Dinheiro(transacao.get_valor()),
+                             credito=credito)
+
+    def _movimento(self, indice: int) -> int:
+        """Valor da entrada em centavos, com sinal (crédito positivo)."""
+        centavos = self._centavos[indice]
+        if centavos or not self._centavos_grandes:
+            return centavos
+        if indice < 0:
+            indice += len(self)
+        return self._centavos_grandes.get(indice, centavos)
+
+    def valor(self, indice: int) -> Dinheiro:
+        """Valor (absoluto) da entrada ``indice``."""
+        return Dinheiro.de_centavos(abs(self._movimento(indice)))
+
+    def movimento(self, indice: int) -> Dinheiro:
+        """Efeito da entrada ``indice`` no saldo: positivo se crédito, negativo se débito."""
+        return Dinheiro.de_centavos(self._movimento(indice))
+
+    def is_credito(self, indice: int) -> bool:
+        """Indica se a entrada ``indice`` é um crédito."""
+        movimento = self._movimento(indice)
+        return movimento > 0 if movimento else self._tipos[indice] in _CREDITOS
+
+    def entrada(self, indice: int) -> Dict:
+        """Monta o dicionário da entrada ``indice`` (tipo, valor, data e extras).
+
+        A natureza só aparece quando difere da padrão do tipo (ex.:
+        transferência recebida).
+        """
+        if indice < 0:
+            indice += len(self)
+        return _montar_entrada(self._tipos[indice], self._instantes[indice],
+                               self._movimento(indice), self._extras_de(indice))
+
+    def iterar(self, inicio: int = 0, fim: Optional[int] = None):
+        """Gera as entradas de ``inicio`` a ``fim`` (exclusive), como dicionários.
+
+        As entradas seladas são lidas dos segmentos em páginas, sem carregar
+        o segmento inteiro em memória.
+        """
+        fim = len(self) if fim is None else min(fim, len(self))
+        indice = max(inicio, 0)
+        while indice < fim and indice < self._base:
+            segmento, posicao = self._segmento_de(indice)
+            ate = min(segmento.total, posicao + _TAMANHO_PAGINA, posicao + fim - indice)
+            instantes, tipos, centavos, extras = segmento.ler_pagina(posicao, ate)
+            for k in range(ate - posicao):
+                yield _montar_entrada(tipos[k], instantes[k], centavos[k],
+                                      extras.get(posicao + k))
+            indice += ate - posicao
+        for indice in range(indice, fim):
+            yield self.entrada(indice)
+
+    def saldo_apos(self, indice: int) -> Dinheiro:
+        """Saldo acumulado do histórico após a entrada ``indice`` (O(1)).
+
+        Aceita índices negativos, como uma lista.
+
+        Raises:
+            IndexError: Se o índice estiver fora do histórico
+        """
+        return Dinheiro.de_centavos(self._saldos[indice])
+
+    def saldo_em(self, momento: datetime) -> Dinheiro:
+        """Saldo acumulado do histórico no instante ``momento``.
+
+        Considera as entradas com data até ``momento`` (inclusive, com
+        precisão de segundos). Com as datas em ordem, usa busca binária sobre
+        a coluna de instantes (O(log n)); se alguma entrada foi registrada com
+        data anterior à da entrada precedente, soma as entradas anteriores a
+        ``momento`` pelo índice cronológico.
+        """
+        if self._ordenado:
+            posicao = bisect_right(self._instantes, instante(momento))
+            return Dinheiro.de_centavos(self._saldos[posicao - 1] if posicao else 0)
+        return Dinheiro.de_centavos(sum(
+            self._movimento(i) for i in self._indices_entre(None, momento)))
+
+    def segundos(self, indice: int) -> int:
+        """Instante da entrada ``indice``, em segundos desde 01/01/1970."""
+        return self._instantes[indice]
+
+    def momento(self, indice: int) -> datetime:
+        """Data/hora da entrada ``indice``."""
+        return data_hora(self._instantes[indice])
+
+    def _indice_temporal(self):
+        """Instantes em ordem cronológica e a permutação correspondente.
+
         Returns:
-            Lista de transações no formato de dicionário
+            (instantes, índices): ``índices`` é None quando a ordem de
+            inclusão já é a cronológica
         """
-        return self._transacoes.copy()
-    
-    def get_transacoes(self) -> List[Dict]:
-        """Retorna uma cópia da lista de transações.
-        
+        if self._ordenado:
+            return self._instantes, None
+        ordem = self._ordem
+        if ordem is None:
+            instantes = self._instantes
+            indices = sorted(range(len(instantes)), key=instantes.__getitem__)
+            ordem = self._ordem = (array('q', (instantes[i] for i in indices)),
+                                   array('q', indices))
+        return ordem
+
+    def _indices_entre(self, inicio: Optional[datetime], fim: Optional[datetime]):
+        """Índices das entradas entre ``inicio`` e ``fim`` (inclusive), em ordem cronológica."""
+        instantes, indices = self._indice_temporal()
+        primeira = 0 if inicio is None else bisect_left(instantes, instante(inicio))
+        ultima = len(instantes) if fim is None else bisect_right(instantes, instante(fim))
+        if indices is None:
+            return range(primeira, ultima)
+        return indices[primeira:ultima]
+
+    def contar_entre(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> int:
+        """Quantidade de transações entre ``inicio`` e ``fim`` (inclusive), por busca binária."""
+        return len(self._indices_entre(inicio, fim))
+
+    def iterar_entre(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None,
+                     pular: int = 0, limite: Optional[int] = None):
+        """Gera, em ordem cronológica, as transações entre ``inicio`` e ``fim`` (inclusive).
+
+        Args:
+            inicio: Início do período (padrão: desde a primeira transação)
+            fim: Fim do período (padrão: até a última transação)
+            pular: Transações do período a saltar (paginação)
+            limite: Máximo de transações a gerar (padrão: todas)
+        """
+        indices = self._indices_entre(inicio, fim)
+        ate = len(indices) if limite is None else min(len(indices), pular + limite)
+        indices = indices[max(pular, 0):ate]
+        if isinstance(indices, range):
+            return self.iterar(indices.start, indices.stop)
+        return (self.entrada(i) for i in indices)
+
+    def indices_recentes(self):
+        """Itera os índices das entradas da mais recente para a mais antiga."""
+        instantes, indices = self._indice_temporal()
+        return reversed(range(len(instantes)) if indices is None else indices)
+
+    def entre(self, inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> List[Dict]:
+        """Transações registradas entre ``inicio`` e ``fim`` (inclusive).
+
+        Args:
+            inicio: Início do período (padrão: desde a primeira transação)
+            fim: Fim do período (padrão: até a última transação)
+
         Returns:
-            Lista de todas as transações registradas
+            Lista de transações em ordem cronológica
+        """
+        return [self.entrada(i) for i in self._indices_entre(inicio, fim)]
+
+    def ultimas(self, n: int = 10) -> List[Dict]:
+        """Retorna as ``n`` transações mais recentes, da mais nova para a mais antiga."""
+        return [self.entrada(i) for i in islice(self.indices_recentes(), max(n, 0))]
+
+    def por_tipo(self, tipo: str, inicio: Optional[datetime] = None,
+                 fim: Optional[datetime] = None) -> List[Dict]:
+        """Transações de um tipo registradas entre ``inicio`` e ``fim`` (inclusive).
+
+        Args:
+            tipo: Tipo de transação (Deposito, Saque, Transferencia, Rendimento)
+            inicio: Início do período (padrão: desde a primeira transação)
+            fim: Fim do período (padrão: até a última transação)
+
+        Returns:
+            Lista de transações em ordem cronológica
+        """
+        codigo = _CODIGOS.get(tipo)
+        if codigo is None:
+            return []
+        tipos = self._tipos
+        return [self.entrada(i) for i in self._indices_entre(inicio, fim) if tipos[i] == codigo]
+
+    def get_transacoes(self) -> 'VisaoHistorico':
+        """Retorna uma visão (somente leitura) das transações, como dicionários."""
+        return VisaoHistorico(self)
+
+    def to_dict(self) -> List[Dict]:
+        """Converte a parte do histórico em memória para lista de dicionários serializável.
+
+        As entradas seladas em segmentos ficam de fora (ver ``arquivado``).
+        """
+        return list(self.iterar(self._base))
+
+    def gerar_extrato(self, saldo_atual):
+        """Gera um extrato formatado com todas as transações e saldo atual.
+
+        Para extratos grandes, prefira ``extrato.Extrato``, que gera as linhas
+        sob demanda (com período e paginação) ou as grava direto em arquivo.
         """
-        return self._transacoes.copy()
-    
+        from extrato import Extrato
+        return "\n" + "\n".join(Extrato(self, saldo_atual).linhas())
+
     def get_ultimo_deposito(self) -> Optional[Dict]:
         """Obtém o último depósito registrado no histórico.
-        
+
         Returns:
             Dicionário com informações do último depósito ou None se não houver
         """
-        for transacao in reversed(self._transacoes):
-            if transacao['tipo'] == 'Deposito':
-                return transacao.copy()
+        tipos = self._tipos
+        for indice in range(len(self) - 1, -1, -1):
+            if tipos[indice] == DEPOSITO:
+                return self.entrada(indice)
         return None
-    
+
     def filtrar_por_tipo(self, tipo: str) -> List[Dict]:
         """Filtra transações por tipo (Deposito, Saque, Transferencia).
-        
+
         Args:
             tipo: Tipo de transação a filtrar
-            
+
         Returns:
             Lista de transações filtradas
         """
-        return [t.copy() for t in self._transacoes if t['tipo'] == tipo]
-    
+        codigo = _CODIGOS.get(tipo)
+        if codigo is None:
+            return []
+        tipos = self._tipos
+        return [self.entrada(i) for i in range(len(self)) if tipos[i] == codigo]
+
     def extrato(self, num_ultimas: int = 10) -> str:
         """Gera um extrato formatado das últimas transações.
-        
+
         Args:
             num_ultimas: Número de transações a incluir no extrato
-            
+
         Returns:
             String formatada com o extrato
         """
         extrato = []
-        for t in self._transacoes[-num_ultimas:]:
+        for t in self.get_transacoes()[-num_ultimas:]:
             extrato.append(f"{t['data']} - {t['tipo']}: R$ {t['valor']:.2f}")
         return "\n".join(extrato) if extrato else "Nenhuma transação registrada"
-    
-    def saldo_atual(self) -> float:
-        """Calcula o saldo atual baseado nas transações registradas.
-        
+
+    def saldo_atual(self) -> Dinheiro:
+        """Saldo acumulado de todas as transações registradas (O(1)).
+
         Returns:
-            Saldo calculado (soma de depósitos menos saques e transferências)
-        """
-        saldo = 0.0
-        for t in self._transacoes:
-            if t['tipo'] == 'Deposito':
-                saldo += t['valor']
-            else:  # Saque ou Transferencia
-                saldo -= t['valor']
-        return saldo
\ No newline at end of file
+            Soma dos créditos (depósitos, rendimentos, transferências
+            recebidas) menos os débitos (saques, transferências enviadas)
+        """
+        return self.saldo_apos(-1) if len(self) else Dinheiro.de_centavos(0)
+
+
+class VisaoHistorico(Sequence):
+    """Sequência somente leitura das entradas de um Historico, como dicionários.
+
+    Cada acesso monta um dicionário novo; alterá-lo não altera o histórico.
+    """
+
+    __slots__ = ('_historico',)
+
+    def __init__(self, historico: Historico):
+        self._historico = historico
+
+    def __len__(self):
+        return len(self._historico)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._historico.entrada(i) for i in range(*indice.indices(len(self)))]
+        tamanho = len(self)
+        if indice < 0:
+            indice += tamanho
+        if not 0 <= indice < tamanho:
+            raise IndexError("Índice fora do histórico")
+        return self._historico.entrada(indice)
+
+    def __iter__(self):
+        return self._historico.iterar()
+
+    def __reversed__(self):
+        entrada = self._historico.entrada
+        for indice in range(len(self) - 1, -1, -1):
+            yield entrada(indice)
+
+
+class Movimentacao:
+    """Referência a uma entrada do histórico de uma conta (sem copiá-la).
+
+    Os campos são lidos das colunas do histórico sob demanda; ``entrada()``
+    monta o dicionário completo, quando necessário.
+    """
+
+    __slots__ = ('conta', 'indice')
+
+    def __init__(self, conta, indice: int):
+        self.conta = conta
+        self.indice = indice
+
+    @property
+    def momento(self) -> datetime:
+        return self.conta.get_historico().momento(self.indice)
+
+    @property
+    def tipo(self) -> str:
+        return TIPOS[self.conta.get_historico()._tipos[self.indice]]
+
+    @property
+    def valor(self) -> Dinheiro:
+        return self.conta.get_historico().valor(self.indice)
+
+    @property
+    def movimento(self) -> Dinheiro:
+        return self.conta.get_historico().movimento(self.indice)
+
+    def entrada(self) -> Dict:
+        """Dicionário da entrada (tipo, valor, data e extras)."""
+        return self.conta.get_historico().entrada(self.indice)
+
+    def __repr__(self):
+        return f"Movimentacao(conta={self.conta.get_numero()}, indice={self.indice})"
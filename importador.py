@@ -0,0 +1,253 @@
+"""Importação em massa de transações a partir de arquivos CSV ou JSON Lines.
+
+Cada registro tem os campos ``conta`` (número da conta de origem), ``tipo``
+(deposito, saque ou transferencia), ``valor`` e, nas transferências,
+``destino`` (número da conta de destino). Exemplo em CSV::
+
+    conta,tipo,valor,destino
+    1,deposito,150.00,
+    2,transferencia,20.50,1
+
+O arquivo é lido de forma preguiçosa e aplicado em lotes: cada lote é gravado
+uma única vez, e só o lote corrente fica em memória. Registros inválidos ou
+recusados vão para o arquivo de rejeitados, com o número da linha e o motivo.
+
+Uso:
+    python importador.py ARQUIVO [--banco banco_ufs.json] [--rejeitados ARQ]
+                         [--formato csv|jsonl] [--lote N] [--journal]
+"""
+import argparse
+import csv
+from decimal import Decimal
+from itertools import islice
+import json
+import os
+import time
+
+from transacao import Deposito, Saque, Transferencia
+
+FORMATOS = ('csv', 'jsonl')
+
+_TIPOS = {
+    'deposito': Deposito, 'depósito': Deposito,
+    'saque': Saque,
+    'transferencia': Transferencia, 'transferência': Transferencia,
+}
+
+
+def detectar_formato(caminho):
+    """Formato pelo sufixo do arquivo (.csv ou .jsonl/.ndjson)."""
+    sufixo = os.path.splitext(caminho)[1].lower()
+    if sufixo == '.csv':
+        return 'csv'
+    if sufixo in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Formato não reconhecido para {caminho} (use --formato)")
+
+
+def ler_csv(arquivo):
+    """
+    Gera os registros de um CSV com cabeçalho.
+
+    Yields:
+        tuple: (número da linha, dict do registro)
+    """
+    leitor = csv.DictReader(arquivo)
+    for registro in leitor:
+        yield leitor.line_num, registro
+
+
+def ler_jsonl(arquivo):
+    """
+    Gera os registros de um arquivo JSON Lines (linhas em branco são ignoradas).
+
+    Os números são lidos como Decimal, passando pela mesma validação de
+    valores das transações digitadas.
+
+    Yields:
+        tuple: (número da linha, dict do registro ou a linha, se inválida)
+    """
+    for numero, linha in enumerate(arquivo, 1):
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha, parse_float=Decimal)
+        except ValueError:
+            registro = linha.rstrip('\n')
+        yield numero, registro
+
+
+class Rejeitados:
+    """Escreve os registros recusados, no formato do arquivo de entrada."""
+
+    def __init__(self, arquivo, formato):
+        self._arquivo = arquivo
+        self._formato = formato
+        self._escritor = None
+        self.total = 0
+
+    def escrever(self, linha, registro, motivo):
+        self.total += 1
+        if self._formato == 'jsonl':
+            if not isinstance(registro, dict):
+                registro = {'registro': registro}
+            saida = dict(registro, linha=linha, motivo=motivo)
+            self._arquivo.write(json.dumps(saida, ensure_ascii=False, default=str) + "\n")
+            return
+        if self._escritor is None:
+            campos = [c for c in registro if c is not None and c not in ('linha', 'motivo')]
+            self._escritor = csv.DictWriter(self._arquivo, campos + ['linha', 'motivo'],
+                                            extrasaction='ignore')
+            self._escritor.writeheader()
+        self._escritor.writerow(dict(registro, linha=linha, motivo=motivo))
+
+
+class ResumoImportacao:
+    """Totais de uma importação."""
+
+    def __init__(self):
+        self.lidos = 0
+        self.aplicados = 0
+        self.rejeitados = 0
+        self.lotes = 0
+        self.duracao = 0.0
+
+    def __str__(self):
+        vazao = self.lidos / self.duracao if self.duracao else 0.0
+        return (f"{self.lidos} registro(s) lido(s) em {self.duracao:.2f}s "
+                f"({vazao:.0f}/s, {self.lotes} lote(s)): {self.aplicados} aplicado(s), "
+                f"{self.rejeitados} rejeitado(s)")
+
+
+class Importador:
+    """Aplica fluxos de registros de transação a um Banco, em lotes."""
+
+    def __init__(self, banco, tamanho_lote=10000):
+        """
+        Args:
+            banco (Banco): Banco de destino
+            tamanho_lote (int): Registros por lote (uma gravação por lote)
+        """
+        if tamanho_lote <= 0:
+            raise ValueError("Tamanho do lote deve ser positivo")
+        self._banco = banco
+        self.tamanho_lote = tamanho_lote
+
+    def _conta(self, numero, campo):
+        try:
+            conta = self._banco.buscar_conta(int(str(numero).strip()))
+        except (TypeError, ValueError):
+            raise ValueError(f"Número da conta de {campo} inválido: {numero!r}")
+        if conta is None:
+            raise ValueError(f"Conta de {campo} {numero} não encontrada")
+        return conta
+
+    def montar(self, registro):
+        """
+        Valida um registro e o converte em (conta, transacao).
+
+        Raises:
+            ValueError: Se o registro for inválido
+        """
+        if not isinstance(registro, dict):
+            raise ValueError("Registro malformado")
+        tipo = _TIPOS.get(str(registro.get('tipo') or '').strip().lower())
+        if tipo is None:
+            raise ValueError(f"Tipo de transação inválido: {registro.get('tipo')!r}")
+        conta = self._conta(registro.get('conta'), 'origem')
+        valor = registro.get('valor')
+        if isinstance(valor, str):
+            valor = valor.strip()
+        if tipo is Transferencia:
+            destino = self._conta(registro.get('destino'), 'destino')
+            if destino is conta:
+                raise ValueError("Conta de destino igual à de origem")
+            return conta, Transferencia(valor, destino)
+        return conta, tipo(valor)
+
+    def importar(self, registros, rejeitados):
+        """
+        Importa um fluxo de registros.
+
+        Args:
+            registros: Iterável de (linha, registro), como os de ler_csv/ler_jsonl
+            rejeitados (Rejeitados): Destino dos registros recusados
+
+        Returns:
+            ResumoImportacao
+        """
+        resumo = ResumoImportacao()
+        inicio = time.perf_counter()
+        registros = iter(registros)
+        while True:
+            lote = list(islice(registros, self.tamanho_lote))
+            if not lote:
+                break
+            resumo.lidos += len(lote)
+            with self._banco.batch():
+                for linha, registro in lote:
+                    try:
+                        conta, transacao = self.montar(registro)
+                        if transacao._aplicar(conta):
+                            resumo.aplicados += 1
+                            continue
+                        motivo = "Operação recusada (saldo ou limite insuficiente)"
+                    except Exception as e:
+                        motivo = str(e)
+                    rejeitados.escrever(linha, registro, motivo)
+            resumo.lotes += 1
+        resumo.rejeitados = rejeitados.total
+        resumo.duracao = time.perf_counter() - inicio
+        return resumo
+
+    def importar_arquivo(self, caminho, caminho_rejeitados, formato=None):
+        """
+        Importa um arquivo CSV ou JSON Lines.
+
+        Args:
+            caminho (str): Arquivo de entrada
+            caminho_rejeitados (str): Arquivo onde gravar os registros recusados
+            formato (str): 'csv' ou 'jsonl' (padrão: pelo sufixo do arquivo)
+
+        Returns:
+            ResumoImportacao
+        """
+        formato = formato or detectar_formato(caminho)
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: {formato}")
+        ler = ler_csv if formato == 'csv' else ler_jsonl
+        with open(caminho, newline='' if formato == 'csv' else None, encoding='utf-8') as entrada, \
+                open(caminho_rejeitados, 'w', newline='' if formato == 'csv' else None,
+                     encoding='utf-8') as saida:
+            return self.importar(ler(entrada), Rejeitados(saida, formato))
+
+
+def main(argv=None):
+    from banco import Banco
+
+    parser = argparse.ArgumentParser(description="Importa transações de um arquivo CSV ou JSON Lines.")
+    parser.add_argument('arquivo', help="Arquivo de entrada (.csv ou .jsonl)")
+    parser.add_argument('--banco', default='banco_ufs.json', help="Arquivo de dados do banco")
+    parser.add_argument('--rejeitados', help="Arquivo dos registros recusados "
+                                             "(padrão: <arquivo>.rejeitados.<formato>)")
+    parser.add_argument('--formato', choices=FORMATOS, help="Formato da entrada (padrão: pelo sufixo)")
+    parser.add_argument('--lote', type=int, default=10000, help="Registros por lote/gravação")
+    parser.add_argument('--journal', action='store_true', help="Grava em modo journal (incremental)")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or detectar_formato(args.arquivo)
+    rejeitados = args.rejeitados or f"{os.path.splitext(args.arquivo)[0]}.rejeitados.{formato}"
+
+    banco = Banco(args.banco, modo_journal=args.journal)
+    try:
+        resumo = Importador(banco, args.lote).importar_arquivo(args.arquivo, rejeitados, formato)
+    finally:
+        banco.encerrar_contas_poupanca()
+    print(resumo)
+    if resumo.rejeitados:
+        print(f"Registros rejeitados em {rejeitados}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
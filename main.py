@@ -117,11 +117,7 @@ def main():
                             valor = ler_valor("Valor da transferência: R$ ")
                             numero_destino = int(input("Número da conta destino: "))
                             
-                            conta_destino = None
-                            for c in banco.get_contas():
-                                if c.get_numero_conta() == numero_destino:
-                                    conta_destino = c
-                                    break
+                            conta_destino = banco.buscar_conta(numero_destino)
                             
                             if conta_destino:
                                 transacao = Transferencia(valor, conta_destino)
@@ -0,0 +1,164 @@
+"""Execução paralela de transações (Deposito, Saque, Transferencia).
+
+As operações chegam como pares ``(conta, transacao)`` e são processadas em
+lotes. Dentro de um lote, as operações que envolvem contas em comum (direta ou
+indiretamente, via transferências) formam um grupo e são executadas em ordem
+de chegada por um mesmo trabalhador; grupos independentes rodam ao mesmo tempo
+no pool de threads. Cada lote é persistido com uma única gravação.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import os
+import time
+
+
+def _particionar(operacoes):
+    """
+    Agrupa as operações por contas em comum (union-find).
+
+    Args:
+        operacoes (list): Pares (indice, conta, transacao)
+
+    Returns:
+        list: Grupos de operações, cada um na ordem original
+    """
+    pai = {}
+
+    def raiz(conta):
+        pai.setdefault(conta, conta)
+        while pai[conta] is not conta:
+            pai[conta] = pai[pai[conta]]  # Compressão de caminho
+            conta = pai[conta]
+        return conta
+
+    for _, conta, transacao in operacoes:
+        destino = getattr(transacao, '_conta_destino', None)
+        if destino is not None:
+            a, b = raiz(conta), raiz(destino)
+            if a is not b:
+                pai[a] = b
+
+    grupos = {}
+    for operacao in operacoes:
+        grupos.setdefault(raiz(operacao[1]), []).append(operacao)
+    return list(grupos.values())
+
+
+class RelatorioExecucao:
+    """Resultado da execução: contagens, vazão e latências por operação."""
+
+    def __init__(self):
+        self.sucessos = 0
+        self.falhas = 0
+        self.erros = []  # (indice, mensagem) das operações que levantaram exceção
+        self.lotes = 0
+        self.duracao = 0.0
+        self._latencias = []
+
+    @property
+    def total(self):
+        """Quantidade de operações processadas."""
+        return self.sucessos + self.falhas
+
+    @property
+    def vazao(self):
+        """Operações por segundo."""
+        return self.total / self.duracao if self.duracao else 0.0
+
+    def latencia(self, percentil):
+        """
+        Latência (segundos) de uma operação, do início do lote até sua conclusão.
+
+        Args:
+            percentil (float): Entre 0 e 100
+        """
+        if not self._latencias:
+            return 0.0
+        ordenadas = sorted(self._latencias)
+        posicao = min(len(ordenadas) - 1, int(len(ordenadas) * percentil / 100))
+        return ordenadas[posicao]
+
+    def latencia_media(self):
+        """Latência média das operações (segundos)."""
+        if not self._latencias:
+            return 0.0
+        return sum(self._latencias) / len(self._latencias)
+
+    def __str__(self):
+        return (f"{self.total} operações em {self.duracao:.3f}s "
+                f"({self.vazao:.0f} op/s, {self.lotes} lote(s)) - "
+                f"{self.sucessos} ok, {self.falhas} falha(s) - latência "
+                f"média {self.latencia_media() * 1000:.2f} ms, "
+                f"p50 {self.latencia(50) * 1000:.2f} ms, "
+                f"p95 {self.latencia(95) * 1000:.2f} ms, "
+                f"p99 {self.latencia(99) * 1000:.2f} ms")
+
+
+class MotorTransacoes:
+    """Executa fluxos de transações de um Banco em um pool de threads."""
+
+    def __init__(self, banco, trabalhadores=None, tamanho_lote=1000):
+        """
+        Args:
+            banco (Banco): Banco dono das contas
+            trabalhadores (int): Threads do pool (padrão: número de CPUs)
+            tamanho_lote (int): Operações por lote (uma gravação por lote)
+        """
+        if tamanho_lote <= 0:
+            raise ValueError("Tamanho do lote deve ser positivo")
+        self._banco = banco
+        self.trabalhadores = trabalhadores or os.cpu_count() or 4
+        self.tamanho_lote = tamanho_lote
+
+    def executar(self, operacoes):
+        """
+        Executa um fluxo de operações.
+
+        Args:
+            operacoes: Iterável de pares (conta, transacao)
+
+        Returns:
+            RelatorioExecucao
+        """
+        relatorio = RelatorioExecucao()
+        inicio = time.perf_counter()
+        fluxo = enumerate(operacoes)
+        with ThreadPoolExecutor(max_workers=self.trabalhadores,
+                                thread_name_prefix="MotorTransacoes") as pool:
+            while True:
+                lote = [(i, conta, transacao) for i, (conta, transacao)
+                        in islice(fluxo, self.tamanho_lote)]
+                if not lote:
+                    break
+                self._executar_lote(pool, lote, relatorio)
+        relatorio.duracao = time.perf_counter() - inicio
+        return relatorio
+
+    def _executar_lote(self, pool, lote, relatorio):
+        """Executa um lote e grava suas alterações uma única vez, no fim."""
+        inicio = time.perf_counter()
+        with self._banco._adiar_gravacao():
+            grupos = _particionar(lote)
+            for resultados in pool.map(lambda grupo: self._executar_grupo(grupo, inicio), grupos):
+                for indice, ok, erro, latencia in resultados:
+                    relatorio._latencias.append(latencia)
+                    if ok:
+                        relatorio.sucessos += 1
+                    else:
+                        relatorio.falhas += 1
+                        if erro is not None:
+                            relatorio.erros.append((indice, erro))
+        relatorio.lotes += 1
+
+    @staticmethod
+    def _executar_grupo(grupo, inicio):
+        """Executa, em ordem, as operações de um grupo de contas relacionadas."""
+        resultados = []
+        for indice, conta, transacao in grupo:
+            erro = None
+            try:
+                ok = transacao._aplicar(conta)
+            except Exception as e:
+                ok, erro = False, str(e)
+            resultados.append((indice, ok, erro, time.perf_counter() - inicio))
+        return resultados
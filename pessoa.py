@@ -20,11 +20,19 @@ class Pessoa:
         Raises:
             ValueError: Se algum dado for inválido
         """
+        self._alterado = True
         self.set_nome(nome)
         self.set_cpf(cpf)
         self.set_data_nascimento(data_nascimento)
         self.set_endereco(endereco)
     
+    def _marcar_alterado(self) -> None:
+        """Marca a pessoa como alterada para a próxima persistência incremental."""
+        self._alterado = True
+        banco = getattr(self, '_banco', None)
+        if banco is not None:
+            banco._registrar_alteracao(self)
+    
     def get_nome(self) -> str:
         """Retorna o nome completo."""
         return self._nome
@@ -34,6 +42,7 @@ class Pessoa:
         if not nome or not all(c.isalpha() or c.isspace() for c in nome):
             raise ValueError("Nome deve conter apenas letras e espaços")
         self._nome = nome.strip()
+        self._marcar_alterado()
     
     def get_cpf(self) -> str:
         """Retorna o CPF formatado."""
@@ -45,6 +54,7 @@ class Pessoa:
         if len(cpf) != 11 or not cpf.isdigit():
             raise ValueError("CPF deve conter 11 dígitos")
         self._cpf = cpf
+        self._marcar_alterado()
     
     def get_data_nascimento(self) -> str:
         """Retorna a data de nascimento formatada."""
@@ -60,6 +70,7 @@ class Pessoa:
         except ValueError:
             raise ValueError("Data deve estar no formato DD/MM/AAAA")
         self._data_nascimento = data_nascimento
+        self._marcar_alterado()
     
     def get_endereco(self) -> str:
         """Retorna o endereço completo."""
@@ -70,6 +81,7 @@ class Pessoa:
         if not endereco or len(endereco) < 10:
             raise ValueError("Endereço muito curto")
         self._endereco = endereco.strip()
+        self._marcar_alterado()
     
     def get_idade(self) -> int:
         """Calcula e retorna a idade em anos."""
@@ -92,6 +104,23 @@ class Usuario(Pessoa):
         super().__init__(nome, cpf, data_nascimento, endereco)
         self._contas: List['Conta'] = []  # Referência a objetos Conta
     
+    @classmethod
+    def restaurar(cls, nome: str, cpf: str, data_nascimento: str, endereco: str) -> 'Usuario':
+        """
+        Recria um usuário a partir de dados já validados (carga confiável).
+        
+        Usado na carga do snapshot binário, cujos dados passaram pela validação
+        quando foram gravados; por isso os setters não são executados.
+        """
+        usuario = cls.__new__(cls)
+        usuario._nome = nome
+        usuario._cpf = cpf
+        usuario._data_nascimento = data_nascimento
+        usuario._endereco = endereco
+        usuario._contas = []
+        usuario._alterado = False
+        return usuario
+    
     def get_contas(self) -> List['Conta']:
         """Retorna lista de contas do usuário."""
         return self._contas.copy()  # Retorna cópia para evitar modificações externas
@@ -105,12 +134,14 @@ class Usuario(Pessoa):
                 raise ValueError(f"Usuário já possui uma conta do tipo {type(conta).__name__}")
                 
         self._contas.append(conta)
+        self._marcar_alterado()
     
     def remover_conta(self, numero_conta: int) -> bool:
         """Remove uma conta pelo número."""
         for i, conta in enumerate(self._contas):
             if conta.get_numero() == numero_conta:
                 self._contas.pop(i)
+                self._marcar_alterado()
                 return True
         return False
     
@@ -0,0 +1,212 @@
+"""Aplicação em lote do rendimento das contas poupança.
+
+Saldos e taxas são reunidos em arrays contíguos e o rendimento é calculado
+em uma única passada vetorizada (NumPy, se disponível; senão, o módulo
+``array`` da biblioteca padrão). Os resultados e os lançamentos de histórico
+são então devolvidos às contas em bloco.
+
+Juros compostos de vários períodos usam a forma fechada
+saldo * (1 + taxa) ** periodos, saturada no maior float representável. Cada
+chamador decide o que fazer com um resultado saturado: o rendimento
+retroativo não o aplica e informa a conta; o saldo sob demanda das contas
+usa ``montante_centavos``, exato em centavos inteiros e limitado por um teto.
+"""
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal, localcontext, MAX_EMAX, MIN_EMIN, ROUND_HALF_EVEN
+import math
+import sys
+
+from dinheiro import Dinheiro, _LIMITE_RAPIDO
+from historico import RENDIMENTO, instante
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Contas por lote no rendimento retroativo
+LOTE = 65536
+
+
+def montante(saldo, taxa, periodos):
+    """Saldo após ``periodos`` capitalizações compostas (forma fechada)."""
+    if periodos <= 0 or saldo <= 0:
+        return saldo
+    try:
+        resultado = saldo * math.pow(1 + taxa, periodos)
+    except OverflowError:
+        return sys.float_info.max
+    return min(resultado, sys.float_info.max)
+
+
+def montante_centavos(centavos, taxa, periodos, teto):
+    """Centavos após ``periodos`` capitalizações compostas, exatos e limitados.
+
+    A forma fechada é calculada em Decimal, com precisão folgada para o
+    teto, e arredondada para centavos (meio-para-par, como ``Dinheiro``).
+    O resultado nunca passa de ``teto``; saldos já acima dele não rendem.
+    Não levanta exceção para nenhum número de períodos.
+
+    Args:
+        centavos (int): Saldo inicial, em centavos
+        taxa (float): Taxa por período (maior que -1)
+        periodos (int): Capitalizações
+        teto (int): Maior saldo alcançável, em centavos
+    """
+    if periodos <= 0 or centavos <= 0 or centavos >= teto or taxa <= -1:
+        return centavos
+    # Estimativa em log para não elevar a potências enormes: bem acima do
+    # teto (folga de um fator e, além do erro do float), o resultado é o teto
+    if taxa > 0 and math.log(centavos) + periodos * math.log1p(taxa) > math.log(teto) + 1:
+        return teto
+    with localcontext() as contexto:
+        contexto.prec = len(str(teto)) + 20
+        contexto.Emax = MAX_EMAX
+        contexto.Emin = MIN_EMIN
+        resultado = Decimal(centavos) * (1 + Decimal(taxa)) ** periodos
+        resultado = int(resultado.to_integral_value(rounding=ROUND_HALF_EVEN))
+    return min(resultado, teto)
+
+
+def calcular_montantes(saldos, taxas, periodos):
+    """
+    Aplica ``montante`` a todas as posições.
+
+    Args:
+        saldos (array): Saldos (array('d'))
+        taxas (array): Taxas por período (array('d'))
+        periodos (array): Períodos de cada posição (array('d'))
+
+    Returns:
+        list: Saldo final de cada posição
+    """
+    if numpy is not None:
+        s = numpy.frombuffer(saldos, dtype=numpy.float64)
+        t = numpy.frombuffer(taxas, dtype=numpy.float64)
+        p = numpy.frombuffer(periodos, dtype=numpy.float64)
+        with numpy.errstate(over='ignore'):
+            resultado = numpy.minimum(s * numpy.power(1 + t, p), sys.float_info.max)
+        return numpy.where((s > 0) & (p > 0), resultado, s).tolist()
+    return [montante(s, t, p) for s, t, p in zip(saldos, taxas, periodos)]
+
+
+def calcular_rendimentos(saldos, taxas):
+    """
+    Calcula saldo * taxa para todas as posições.
+
+    Args:
+        saldos (array): Saldos (array('d'))
+        taxas (array): Taxas por período (array('d'))
+
+    Returns:
+        list: Rendimento de cada posição
+    """
+    if numpy is not None:
+        return (numpy.frombuffer(saldos, dtype=numpy.float64)
+                * numpy.frombuffer(taxas, dtype=numpy.float64)).tolist()
+    return [saldo * taxa for saldo, taxa in zip(saldos, taxas)]
+
+
+def aplicar_lote(contas, agora=None):
+    """
+    Aplica um período de rendimento a todas as contas com saldo positivo.
+
+    Cada conta recebe saldo * taxa (arredondado para centavos como
+    ``Dinheiro * taxa``) e um lançamento no histórico, todos com um único
+    instante e sem salvar: quem chama persiste as contas devolvidas
+    (marcadas como alteradas). É a única implementação do rendimento
+    periódico.
+
+    Args:
+        contas (list): Contas poupança
+        agora (datetime): Instante do rendimento (padrão: agora)
+
+    Returns:
+        list: Contas que renderam
+    """
+    contas = [conta for conta in contas if conta._saldo > 0]
+    if not contas:
+        return []
+    agora = agora or datetime.now()
+
+    # Só saldos exatos em float entram na passada vetorizada; os demais
+    # (magnitude arbitrária) são calculados com Dinheiro * taxa
+    vetorizadas = [conta for conta in contas if conta._saldo.centavos < _LIMITE_RAPIDO]
+    grandes = [conta for conta in contas if conta._saldo.centavos >= _LIMITE_RAPIDO]
+
+    # Em centavos, para arredondar exatamente como Dinheiro * taxa
+    saldos = array('d', [conta._saldo.centavos for conta in vetorizadas])
+    taxas = array('d', [conta._taxa_rendimento for conta in vetorizadas])
+    rendimentos = calcular_rendimentos(saldos, taxas) if vetorizadas else []
+    rendimentos.extend(None for _ in grandes)
+
+    segundos = instante(agora)
+    contas = vetorizadas + grandes
+    for conta, rendimento in zip(contas, rendimentos):
+        if rendimento is not None and abs(rendimento) < _LIMITE_RAPIDO:
+            rendimento = Dinheiro.de_centavos(round(rendimento))
+        else:
+            rendimento = conta._saldo * conta._taxa_rendimento
+        conta._saldo += rendimento
+        conta._ultima_atualizacao = agora
+        historico = conta._historico
+        historico._anexar(RENDIMENTO, segundos, rendimento)
+        historico._alterado = True
+        conta._alterado = True
+    return contas
+
+
+def aplicar_atrasados(contas, agora, intervalo):
+    """
+    Aplica de uma vez o rendimento dos intervalos completos já vencidos.
+
+    Cada conta custa O(1), independentemente de quantos intervalos se
+    passaram, e recebe um único lançamento consolidado no histórico. A data
+    da última atualização avança só os intervalos completos, preservando a
+    fração do intervalo em curso. As contas são processadas em lotes de
+    ``LOTE`` posições, cada um em uma única passada vetorizada.
+
+    Uma conta cujo saldo acumulado satura o float (ver ``montante``) não é
+    alterada: o estouro é informado e ela segue com o rendimento periódico a
+    partir de agora.
+
+    Args:
+        contas (list): Contas poupança
+        agora (datetime): Instante de referência
+        intervalo (float): Segundos por período de rendimento
+
+    Returns:
+        list: Contas alteradas (marcadas como alteradas, não salvas)
+    """
+    pendentes = []
+    for conta in contas:
+        periodos = int((agora - conta._ultima_atualizacao).total_seconds() // intervalo)
+        if periodos > 0:
+            pendentes.append((conta, periodos))
+
+    alteradas = []
+    for inicio in range(0, len(pendentes), LOTE):
+        lote = pendentes[inicio:inicio + LOTE]
+        montantes = calcular_montantes(
+            array('d', [float(conta._saldo) for conta, _ in lote]),
+            array('d', [conta._taxa_rendimento for conta, _ in lote]),
+            array('d', [periodos for _, periodos in lote]))
+
+        for (conta, periodos), saldo in zip(lote, montantes):
+            if saldo >= sys.float_info.max:
+                print(f"Rendimento retroativo da conta {conta.get_numero()} não aplicado: "
+                      f"{periodos} período(s) estouram a faixa representável")
+                continue
+            saldo = Dinheiro(saldo)
+            rendimento = saldo - conta._saldo
+            conta._ultima_atualizacao += timedelta(seconds=periodos * intervalo)
+            if rendimento > 0:
+                conta._saldo = saldo
+                historico = conta._historico
+                historico._anexar(RENDIMENTO, instante(conta._ultima_atualizacao), rendimento)
+                historico._alterado = True
+            conta._alterado = True
+            alteradas.append(conta)
+    return alteradas
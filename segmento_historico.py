@@ -0,0 +1,243 @@
+"""Segmentos imutáveis do histórico de transações, em disco.
+
+Quando a parte do histórico de uma conta mantida em memória passa do limite
+(``config.HISTORICO_EM_MEMORIA``), as entradas mais antigas são seladas em um
+arquivo de segmento, que nunca mais é alterado. O arquivo guarda as mesmas
+colunas do Historico (instante, valor com sinal e saldo acumulado em
+centavos, código do tipo) e é lido por mmap, sob demanda: de cada segmento
+só o cabeçalho fica em memória, e no máximo ``MAX_ABERTOS`` ficam mapeados
+ao mesmo tempo.
+
+Formato (inteiros nativos, como os arrays do Historico)::
+
+    MAGIC | cabeçalho (6 x int64) | instantes | centavos | saldos | tipos | JSON
+
+O JSON só existe quando necessário e traz os campos esparsos, por posição no
+segmento: valores e saldos fora da faixa de 64 bits e os campos extras das
+entradas.
+
+Os segmentos de cada conta ficam em ``<raiz>/conta_<número>/`` (ver
+``diretorio_da_conta``), onde a raiz fica ao lado do arquivo de dados.
+"""
+from array import array
+from collections import OrderedDict
+import json
+import mmap
+import os
+import struct
+import threading
+
+MAGIC = b'UFSHIST1'
+# total, tamanho do JSON, primeiro instante, último instante, saldo final, flags
+_CABECALHO = struct.Struct('=6q')
+_INICIO_COLUNAS = len(MAGIC) + _CABECALHO.size
+
+_ORDENADO = 1  # Instantes em ordem não decrescente
+_ESPARSOS = 2  # Há JSON com campos esparsos
+_SALDO_GRANDE = 4  # O saldo final está no JSON
+
+_LIMITE_COLUNA = 2 ** 63
+
+# Segmentos com mmap aberto (LRU): cada mmap mantém um descritor de arquivo
+MAX_ABERTOS = 64
+_abertos = OrderedDict()
+_trava = threading.Lock()
+
+
+def diretorio_da_conta(raiz, numero):
+    """Diretório dos segmentos da conta ``numero`` sob a ``raiz`` dos históricos."""
+    return os.path.join(raiz, f"conta_{numero}")
+
+
+def _json_default(obj):
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return float(obj)
+
+
+def gravar_segmento(caminho, instantes, tipos, centavos, saldos, centavos_grandes=None,
+                    extras=None):
+    """
+    Grava um segmento (de forma atômica) e o devolve pronto para leitura.
+
+    Args:
+        caminho (str): Arquivo do segmento
+        instantes, tipos, centavos, saldos: Colunas, de mesmo tamanho (os
+            saldos podem conter inteiros fora da faixa de 64 bits)
+        centavos_grandes (dict): Posição -> valor que não coube na coluna
+        extras (dict): Posição -> campos extras da entrada
+
+    Returns:
+        SegmentoHistorico
+    """
+    total = len(instantes)
+    if not total:
+        raise ValueError("Segmento de histórico vazio")
+
+    coluna_saldos = array('q')
+    saldos_grandes = {}
+    for posicao, saldo in enumerate(saldos):
+        if not -_LIMITE_COLUNA < saldo < _LIMITE_COLUNA:
+            saldos_grandes[posicao] = saldo
+            saldo = 0
+        coluna_saldos.append(saldo)
+
+    esparsos = {}
+    if centavos_grandes:
+        esparsos['centavos'] = centavos_grandes
+    if saldos_grandes:
+        esparsos['saldos'] = saldos_grandes
+    if extras:
+        esparsos['extras'] = extras
+    texto = (json.dumps(esparsos, ensure_ascii=False, default=_json_default).encode('utf-8')
+             if esparsos else b'')
+
+    flags = _ESPARSOS if esparsos else 0
+    if all(instantes[i] <= instantes[i + 1] for i in range(total - 1)):
+        flags |= _ORDENADO
+    saldo_final = coluna_saldos[-1]
+    if (total - 1) in saldos_grandes:
+        flags |= _SALDO_GRANDE
+
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(MAGIC)
+        arquivo.write(_CABECALHO.pack(total, len(texto), instantes[0], instantes[-1],
+                                      saldo_final, flags))
+        arquivo.write(array('q', instantes).tobytes())
+        arquivo.write(array('q', centavos).tobytes())
+        arquivo.write(coluna_saldos.tobytes())
+        arquivo.write(array('H', tipos).tobytes())
+        arquivo.write(texto)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+    return SegmentoHistorico(caminho)
+
+
+class SegmentoHistorico:
+    """Leitura de um segmento selado do histórico (via mmap, sob demanda)."""
+
+    def __init__(self, caminho):
+        """
+        Lê apenas o cabeçalho; as colunas são mapeadas no primeiro acesso.
+
+        Raises:
+            ValueError: Se o arquivo não for um segmento válido
+            OSError: Se o arquivo não puder ser lido
+        """
+        with open(caminho, 'rb') as arquivo:
+            inicio = arquivo.read(_INICIO_COLUNAS)
+        if len(inicio) != _INICIO_COLUNAS or not inicio.startswith(MAGIC):
+            raise ValueError(f"Segmento de histórico inválido: {caminho}")
+        (self.total, self._tamanho_json, self.primeiro_instante, self.ultimo_instante,
+         self._saldo_final, self._flags) = _CABECALHO.unpack(inicio[len(MAGIC):])
+        self.caminho = caminho
+        self._mapa = None
+        self._colunas = None
+        self._esparsos = None
+
+    @property
+    def nome(self):
+        """Nome do arquivo (como é referenciado na persistência da conta)."""
+        return os.path.basename(self.caminho)
+
+    @property
+    def ordenado(self):
+        """Indica se os instantes do segmento estão em ordem cronológica."""
+        return bool(self._flags & _ORDENADO)
+
+    @property
+    def saldo_final(self):
+        """Saldo acumulado (centavos) após a última entrada do segmento."""
+        if self._flags & _SALDO_GRANDE:
+            return self._esparso('saldos')[self.total - 1]
+        return self._saldo_final
+
+    def _abrir(self):
+        """Mapeia o arquivo, se preciso (com ``_trava``), e devolve as colunas."""
+        if self._colunas is not None:
+            _abertos.move_to_end(self)
+            return self._colunas
+        with open(self.caminho, 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        visao = memoryview(mapa)
+        colunas = {}
+        posicao = _INICIO_COLUNAS
+        for nome, formato, largura in (('instantes', 'q', 8), ('centavos', 'q', 8),
+                                       ('saldos', 'q', 8), ('tipos', 'H', 2)):
+            fim = posicao + self.total * largura
+            colunas[nome] = visao[posicao:fim].cast(formato)
+            posicao = fim
+        colunas['json'] = visao[posicao:posicao + self._tamanho_json]
+        self._mapa = mapa
+        self._colunas = colunas
+        _abertos[self] = None
+        while len(_abertos) > MAX_ABERTOS:
+            antigo, _ = _abertos.popitem(last=False)
+            antigo._fechar()
+        return colunas
+
+    def fechar(self):
+        """Desfaz o mapeamento, se aberto (ex.: antes de apagar o arquivo)."""
+        with _trava:
+            if self._colunas is not None:
+                _abertos.pop(self, None)
+                self._fechar()
+
+    def _fechar(self):
+        """Desfaz o mapeamento (com ``_trava``); o próximo acesso o refaz."""
+        for coluna in self._colunas.values():
+            coluna.release()
+        self._mapa.close()
+        self._mapa = None
+        self._colunas = None
+        self._esparsos = None
+
+    def _esparso(self, nome):
+        """Campos esparsos ``nome`` (posição -> valor), lidos do JSON."""
+        if not self._flags & _ESPARSOS:
+            return {}
+        with _trava:
+            colunas = self._abrir()
+            if self._esparsos is None:
+                dados = json.loads(colunas['json'].tobytes().decode('utf-8'))
+                self._esparsos = {campo: {int(k): v for k, v in valores.items()}
+                                  for campo, valores in dados.items()}
+            return self._esparsos.get(nome, {})
+
+    def ler(self, coluna, posicao):
+        """Valor da ``coluna`` (instantes, tipos, centavos ou saldos) na ``posicao``."""
+        with _trava:
+            valor = self._abrir()[coluna][posicao]
+        if not valor and coluna in ('centavos', 'saldos') and self._flags & _ESPARSOS:
+            if posicao < 0:
+                posicao += self.total
+            return self._esparso(coluna).get(posicao, valor)
+        return valor
+
+    def ler_pagina(self, inicio, fim):
+        """
+        Lê as entradas de ``inicio`` a ``fim`` (exclusive) de uma vez.
+
+        Returns:
+            tuple: (instantes, tipos, centavos, extras), os três primeiros como
+                listas e ``extras`` como dicionário posição -> campos
+        """
+        with _trava:
+            colunas = self._abrir()
+            instantes = colunas['instantes'][inicio:fim].tolist()
+            tipos = colunas['tipos'][inicio:fim].tolist()
+            centavos = colunas['centavos'][inicio:fim].tolist()
+        extras = {}
+        if self._flags & _ESPARSOS:
+            for posicao, valor in self._esparso('centavos').items():
+                if inicio <= posicao < fim:
+                    centavos[posicao - inicio] = valor
+            extras = {p: v for p, v in self._esparso('extras').items() if inicio <= p < fim}
+        return instantes, tipos, centavos, extras
+
+    def extras(self, posicao):
+        """Campos extras da entrada na ``posicao`` (ou None)."""
+        return self._esparso('extras').get(posicao)
@@ -0,0 +1,75 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from dinheiro import Dinheiro, _LIMITE_RAPIDO
+
+
+def test_conversao_arredonda_meio_para_par():
+    assert Dinheiro('0.125').centavos == 12
+    assert Dinheiro('0.135').centavos == 14
+    assert Dinheiro(0.1).centavos == 10
+    assert Dinheiro(Decimal('-2.005')).centavos == -200
+
+
+@pytest.mark.parametrize('valor', [float('nan'), float('inf'), 'abc', 'NaN'])
+def test_valores_invalidos(valor):
+    with pytest.raises(ValueError):
+        Dinheiro(valor)
+
+
+def test_booleano_nao_e_dinheiro():
+    with pytest.raises(TypeError):
+        Dinheiro(True)
+
+
+def test_soma_e_subtracao_exatas():
+    total = sum([Dinheiro(0.1)] * 10, Dinheiro(0))
+    assert total == Dinheiro(1) and total.centavos == 100
+    assert Dinheiro(1) - 0.3 == Dinheiro('0.70')
+    assert 5 - Dinheiro('0.01') == Dinheiro('4.99')
+
+
+def test_multiplicacao_arredonda_para_centavos():
+    assert (Dinheiro('10.10') * 0.05).centavos == 50
+    assert (Dinheiro('1.01') * Decimal('1.5')).centavos == 152
+    assert Dinheiro(3) * 2 == Dinheiro(6)
+
+
+@pytest.mark.parametrize('centavos', [
+    int(_LIMITE_RAPIDO) - 1,
+    int(_LIMITE_RAPIDO),
+    2 ** 60 + 1,
+    10 ** 400,
+    -(10 ** 400),
+])
+def test_multiplicacao_por_taxa_em_qualquer_magnitude(centavos):
+    produto = Dinheiro.de_centavos(centavos) * 0.05
+    assert produto.centavos == round(Fraction(centavos) * Fraction(0.05))
+
+
+def test_divisao():
+    assert Dinheiro(10) / 4 == Dinheiro('2.50')
+    assert Dinheiro(10) / Dinheiro(4) == 2.5
+
+
+def test_float_satura_fora_da_faixa():
+    assert float(Dinheiro.de_centavos(10 ** 400)) > 1e308
+    assert float(Dinheiro('12.34')) == 12.34
+
+
+def test_comparacao_e_hash_com_outros_numeros():
+    assert Dinheiro('1.50') == 1.5 == Decimal('1.5')
+    assert Dinheiro(2) == 2 and Dinheiro(2) > 1.99
+    assert hash(Dinheiro(2)) == hash(2) == hash(Decimal('2.00'))
+
+
+def test_formatacao():
+    assert f"{Dinheiro('1234.5'):,.2f}" == "1,234.50"
+    assert str(Dinheiro('-0.05')) == "-0.05"
+
+
+def test_imutavel():
+    with pytest.raises(AttributeError):
+        Dinheiro(1)._centavos = 5
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+import os
+
+import pytest
+
+from dinheiro import Dinheiro
+from historico import Historico
+
+INICIO = datetime(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def limite_pequeno(monkeypatch):
+    monkeypatch.setattr(Historico, 'LIMITE_MEMORIA', 100)
+
+
+def preencher(historico, quantidade):
+    for k in range(quantidade):
+        historico.registrar_valor('Deposito' if k % 3 else 'Saque', Dinheiro(k + 1),
+                                  INICIO + timedelta(minutes=k))
+
+
+def recarregar(historico, diretorio):
+    novo = Historico()
+    novo.arquivar_em(diretorio)
+    novo.carregar(historico.to_dict(), historico.arquivado())
+    return novo
+
+
+def test_sela_as_entradas_antigas_em_segmentos(tmp_path):
+    historico = Historico()
+    historico.arquivar_em(str(tmp_path))
+    preencher(historico, 1000)
+    arquivado = historico.arquivado()
+    assert arquivado['base'] > 0
+    assert len(historico.to_dict()) == 1000 - arquivado['base'] <= 100
+    assert sorted(os.listdir(tmp_path)) == sorted(arquivado['segmentos'])
+
+
+def test_recarga_preserva_entradas_e_saldos(tmp_path):
+    historico = Historico()
+    historico.arquivar_em(str(tmp_path))
+    preencher(historico, 1000)
+    historico.registrar({'tipo': 'Deposito', 'valor': 1, 'data': '01/01/2024 00:00:00',
+                         'obs': 'extra'})
+    referencia = list(historico.get_transacoes())
+
+    recarregado = recarregar(historico, str(tmp_path))
+    assert list(recarregado.get_transacoes()) == referencia
+    assert recarregado.saldo_atual() == historico.saldo_atual()
+    assert recarregado.saldo_apos(500) == historico.saldo_apos(500)
+    # Inclui a entrada extra, registrada fora de ordem no primeiro instante
+    momento = INICIO + timedelta(minutes=9)
+    assert recarregado.saldo_em(momento) == 1 + sum(
+        (1 if k % 3 else -1) * (k + 1) for k in range(10))
+    assert (recarregado.entre(INICIO, INICIO + timedelta(minutes=3))
+            == referencia[:1] + referencia[-1:] + referencia[1:4])
+
+
+def test_recarga_continua_selando(tmp_path):
+    historico = Historico()
+    historico.arquivar_em(str(tmp_path))
+    preencher(historico, 300)
+    recarregado = recarregar(historico, str(tmp_path))
+    recarregado.registrar_valor('Deposito', Dinheiro(10**18), INICIO + timedelta(days=1))
+    preencher(recarregado, 300)
+    assert len(recarregado) == 601
+    assert recarregado.arquivado()['base'] > historico.arquivado()['base']
+    assert (list(recarregar(recarregado, str(tmp_path)).get_transacoes())
+            == list(recarregado.get_transacoes()))
+
+
+def test_segmento_ausente_e_erro_de_carga(tmp_path):
+    historico = Historico()
+    historico.arquivar_em(str(tmp_path))
+    preencher(historico, 300)
+    os.remove(tmp_path / historico.arquivado()['segmentos'][0])
+    with pytest.raises(OSError):
+        recarregar(historico, str(tmp_path))
+
+
+def test_base_divergente_e_recusada(tmp_path):
+    historico = Historico()
+    historico.arquivar_em(str(tmp_path))
+    preencher(historico, 300)
+    arquivado = dict(historico.arquivado(), base=historico.arquivado()['base'] + 1)
+    novo = Historico()
+    novo.arquivar_em(str(tmp_path))
+    with pytest.raises(ValueError):
+        novo.carregar(historico.to_dict(), arquivado)
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from database_manager import DatabaseManager, JsonBackend, merge_account
+
+
+def conta(numero, saldo, historico=None):
+    return {'numero': numero, 'cpf_cliente': '52998224725', 'saldo': saldo,
+            'senha_hash': '', 'tipo': 'corrente', 'historico': historico or []}
+
+
+def transacao(valor):
+    return {'tipo': 'Deposito', 'valor': valor, 'data': '01/01/2024 10:00:00'}
+
+
+@pytest.fixture
+def dados():
+    return {
+        'usuarios': [{'cpf': '52998224725', 'nome': 'Ana'}],
+        'contas': [conta(1, 10, [transacao(10)])],
+        'ultimo_numero_conta': 1,
+    }
+
+
+def test_merge_account_registro_completo_substitui():
+    novo = conta(1, 5)
+    assert merge_account(conta(1, 10, [transacao(10)]), {'op': 'conta', 'dados': novo}) is novo
+
+
+def test_merge_account_parcial_anexa_e_atualiza_campos():
+    atual = conta(1, 10, [transacao(10)])
+    registro = {'op': 'conta', 'dados': {'numero': 1, 'saldo': 30},
+                'historico_desde': 1, 'historico_novos': [transacao(20)]}
+    resultado = merge_account(atual, registro)
+    assert resultado['saldo'] == 30
+    assert [t['valor'] for t in resultado['historico']] == [10, 20]
+
+
+def test_merge_account_parcial_descarta_a_partir_de_desde():
+    atual = conta(1, 10, [transacao(10), transacao(99)])
+    registro = {'op': 'conta', 'dados': {'numero': 1, 'saldo': 30},
+                'historico_desde': 1, 'historico_novos': [transacao(20)]}
+    assert [t['valor'] for t in merge_account(atual, registro)['historico']] == [10, 20]
+
+
+def test_merge_account_conta_os_segmentos_selados():
+    atual = conta(1, 10, [transacao(10)])
+    atual['historico_arquivado'] = {'base': 100, 'segmentos': ['a.seg']}
+    registro = {'op': 'conta', 'dados': {'numero': 1, 'saldo': 30},
+                'historico_desde': 101, 'historico_novos': [transacao(20)]}
+    resultado = merge_account(atual, registro)
+    assert [t['valor'] for t in resultado['historico']] == [10, 20]
+    assert resultado['historico_arquivado']['base'] == 100
+
+
+def test_merge_account_parcial_sem_versao_anterior():
+    registro = {'op': 'conta', 'dados': {'numero': 2, 'saldo': 5},
+                'historico_desde': 0, 'historico_novos': [transacao(5)]}
+    resultado = merge_account(None, registro)
+    assert resultado['numero'] == 2 and len(resultado['historico']) == 1
+
+
+def test_replay_do_journal(tmp_path, dados):
+    arquivo = tmp_path / 'banco.json'
+    backend = JsonBackend(arquivo, journal=True)
+    backend.save(dados)
+    backend.apply_records([
+        {'op': 'conta', 'dados': {'numero': 1, 'saldo': 30},
+         'historico_desde': 1, 'historico_novos': [transacao(20)]},
+        {'op': 'usuario', 'dados': {'cpf': '11144477735', 'nome': 'Bia'}},
+        {'op': 'conta', 'dados': conta(2, 7, [transacao(7)])},
+        {'op': 'ultimo_numero_conta', 'valor': 2},
+        {'op': 'remover_usuario', 'cpf': '52998224725'},
+        {'op': 'remover_conta', 'numero': 1},
+    ])
+    backend.close()
+
+    carregado = JsonBackend(arquivo, journal=True).load()
+    assert [u['cpf'] for u in carregado['usuarios']] == ['11144477735']
+    assert [c['numero'] for c in carregado['contas']] == [2]
+    assert carregado['ultimo_numero_conta'] == 2
+
+
+def test_iter_load_aplica_registros_parciais(tmp_path, dados):
+    arquivo = tmp_path / 'banco.json'
+    backend = JsonBackend(arquivo, journal=True)
+    backend.save(dados)
+    for valor in (20, 30):
+        backend.apply_records([{'op': 'conta', 'dados': {'numero': 1, 'saldo': valor},
+                                'historico_desde': valor // 10 - 1,
+                                'historico_novos': [transacao(valor)]}])
+    backend.close()
+
+    contas = [valor for chave, valor in JsonBackend(arquivo, journal=True).iter_load()
+              if chave == 'conta']
+    assert contas[0]['saldo'] == 30
+    assert [t['valor'] for t in contas[0]['historico']] == [10, 20, 30]
+    assert contas == JsonBackend(arquivo, journal=True).load()['contas']
+
+
+def test_ultima_linha_truncada_e_ignorada(tmp_path, dados):
+    arquivo = tmp_path / 'banco.json'
+    backend = JsonBackend(arquivo, journal=True)
+    backend.save(dados)
+    backend.apply_records([{'op': 'ultimo_numero_conta', 'valor': 5}])
+    backend.close()
+    # Queda no meio da escrita do registro seguinte
+    with open(backend.journal_path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({'op': 'ultimo_numero_conta', 'valor': 9})[:-4])
+
+    assert JsonBackend(arquivo, journal=True).load()['ultimo_numero_conta'] == 5
+
+
+def test_checkpoint_descarta_o_journal(tmp_path, dados):
+    arquivo = tmp_path / 'banco.json'
+    backend = JsonBackend(arquivo, journal=True, compact_threshold=3)
+    backend.save(dados)
+    backend.apply_records([{'op': 'ultimo_numero_conta', 'valor': n} for n in (2, 3, 4)])
+    assert not backend.journal_path.exists()
+    with open(arquivo, encoding='utf-8') as file:
+        assert json.load(file)['ultimo_numero_conta'] == 4
+    backend.close()
+
+
+def test_database_manager_em_modo_journal(tmp_path, dados):
+    arquivo = tmp_path / 'banco.json'
+    db = DatabaseManager(arquivo, journal=True)
+    db.save_data(dados)
+    db.apply_records([{'op': 'conta', 'dados': {'numero': 1, 'saldo': 15},
+                       'historico_desde': 1, 'historico_novos': [transacao(5)]}])
+    db.close()
+
+    carregado = DatabaseManager(arquivo, journal=True).load_data()
+    assert carregado['contas'][0]['saldo'] == 15
+    assert len(carregado['contas'][0]['historico']) == 2
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import conta as conta_mod
+from conta import ContaPoupanca
+from dinheiro import Dinheiro
+from pessoa import Usuario
+from rendimento import montante_centavos
+
+INTERVALO = conta_mod.INTERVALO_RENDIMENTO
+TETO = Dinheiro(conta_mod.TETO_RENDIMENTO_SOB_DEMANDA)
+
+
+@pytest.fixture
+def poupanca():
+    cliente = Usuario("Ana Maria", "52998224725", "01/01/1990", "Rua das Flores 123")
+    conta = ContaPoupanca(cliente, 1, taxa_rendimento=0.05, modo_rendimento='sob_demanda')
+    conta._saldo = Dinheiro(100)
+    return conta
+
+
+def parada_ha(conta, segundos):
+    conta._ultima_atualizacao = datetime.now() - timedelta(seconds=segundos)
+
+
+def test_saldo_inclui_rendimento_sem_lancar(poupanca):
+    parada_ha(poupanca, 2.5 * INTERVALO)
+    assert poupanca.get_saldo() == Dinheiro('110.25')
+    assert poupanca._saldo == Dinheiro(100)
+    assert len(poupanca.get_historico()) == 0
+
+
+def test_saque_lanca_o_rendimento_pendente(poupanca):
+    parada_ha(poupanca, 2.5 * INTERVALO)
+    assert poupanca.sacar(10)
+    assert poupanca._saldo == Dinheiro('100.25')
+    entradas = list(poupanca.get_historico().get_transacoes())
+    assert [e['tipo'] for e in entradas] == ['Rendimento']
+    assert entradas[0]['valor'] == Dinheiro('10.25')
+    # Só os intervalos completos: a fração do intervalo em curso é preservada
+    decorrido = (datetime.now() - poupanca._ultima_atualizacao).total_seconds()
+    assert 0.4 * INTERVALO < decorrido < 0.6 * INTERVALO
+
+
+def test_sem_intervalo_completo_nao_ha_lancamento(poupanca):
+    parada_ha(poupanca, 0.5 * INTERVALO)
+    poupanca.depositar(5)
+    assert poupanca._saldo == Dinheiro(105)
+    assert len(poupanca.get_historico()) == 0
+
+
+def test_conta_parada_por_anos_chega_ao_teto(poupanca):
+    parada_ha(poupanca, 10 * 365 * 24 * 3600)
+    assert poupanca.get_saldo() == TETO
+    assert poupanca.depositar(1)
+    assert poupanca._saldo == TETO + 1
+    assert poupanca.sacar(1)
+    assert "Saldo atual" in poupanca.gerar_extrato()
+    poupanca.extrato()
+
+
+def test_saldo_acima_do_teto_nao_rende(poupanca):
+    poupanca._saldo = TETO * 3
+    parada_ha(poupanca, 5 * INTERVALO)
+    assert poupanca.get_saldo() == TETO * 3
+
+
+def test_montante_exato_acima_da_precisao_do_float():
+    centavos = 2 ** 60 + 1
+    assert montante_centavos(centavos, 0.0, 10, 10 ** 30) == centavos
+    # Um período equivale a Dinheiro * taxa
+    esperado = centavos + (Dinheiro.de_centavos(centavos) * 0.05).centavos
+    assert montante_centavos(centavos, 0.05, 1, 10 ** 30) == esperado
+
+
+@pytest.mark.parametrize('periodos', [1, 100, 10 ** 6, 10 ** 15])
+def test_montante_nunca_passa_do_teto(periodos):
+    assert montante_centavos(10_000, 0.05, periodos, 10 ** 17) <= 10 ** 17
+
+
+def test_montante_sem_periodos_ou_sem_saldo():
+    assert montante_centavos(10_000, 0.05, 0, 10 ** 17) == 10_000
+    assert montante_centavos(0, 0.05, 50, 10 ** 17) == 0
+    assert montante_centavos(-500, 0.05, 50, 10 ** 17) == -500
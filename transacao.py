@@ -3,11 +3,12 @@ from typing import Union
 from decimal import Decimal
 
 from conta import Conta
+from dinheiro import Dinheiro
 
 class Transacao:
     """Classe abstrata base para todas as transações bancárias."""
     
-    def get_valor(self) -> Decimal:
+    def get_valor(self) -> Dinheiro:
         """Retorna o valor da transação."""
         raise NotImplementedError("Método get_valor deve ser implementado")
     
@@ -22,22 +23,27 @@ class Transacao:
         """
         raise NotImplementedError("Método registrar deve ser implementado")
     
-    def _validar_valor(self, valor: Union[float, Decimal, int]) -> float:
-        """Valida e converte o valor para float."""
-        if isinstance(valor, float):
-            return valor
+    def _aplicar(self, conta: 'Conta') -> bool:
+        """Executa a transação sem mensagens, propagando erros.
+        
+        Usado por ``registrar`` e pelo motor de execução paralela.
+        """
+        raise NotImplementedError("Método _aplicar deve ser implementado")
+    
+    def _validar_valor(self, valor: Union[float, Decimal, int, Dinheiro]) -> Dinheiro:
+        """Valida e converte o valor para Dinheiro (centavos exatos)."""
         try:
-            valor_float = float(Decimal(str(valor)).quantize(Decimal('0.01')))
-            if valor_float <= 0:
-                raise ValueError("Valor deve ser positivo")
-            return valor_float
-        except:
+            valor = Dinheiro(valor)
+        except (TypeError, ValueError):
             raise ValueError("Valor da transação inválido")
+        if valor <= 0:
+            raise ValueError("Valor da transação inválido")
+        return valor
         
 class Deposito(Transacao):
     """Representa uma transação de depósito em conta."""
     
-    def __init__(self, valor: Union[float, Decimal, int]):
+    def __init__(self, valor: Union[float, Decimal, int, Dinheiro]):
         """
         Inicializa um depósito com valor positivo.
         
@@ -50,15 +56,22 @@ class Deposito(Transacao):
         self._valor = self._validar_valor(valor)
         self._data = datetime.now()
     
-    def get_valor(self) -> Decimal:
+    def get_valor(self) -> Dinheiro:
         """Retorna o valor do depósito."""
         return self._valor
     
+    def _aplicar(self, conta: 'Conta') -> bool:
+        """Deposita e registra no histórico, com a conta travada."""
+        with conta._em_lote():
+            if not conta.depositar(self._valor):
+                return False
+            conta.get_historico().adicionar_transacao(self)
+            return True
+    
     def registrar(self, conta: 'Conta') -> bool:
         """Registra o depósito na conta especificada."""
         try:
-            if conta.depositar(self._valor):
-                conta.get_historico().adicionar_transacao(self)
+            if self._aplicar(conta):
                 print(f"\n✅ Depósito de R$ {self._valor:.2f} realizado com sucesso!")
                 return True
                 
@@ -71,7 +84,7 @@ class Deposito(Transacao):
 class Saque(Transacao):
     """Representa uma transação de saque em conta."""
     
-    def __init__(self, valor: Union[float, Decimal, int]):
+    def __init__(self, valor: Union[float, Decimal, int, Dinheiro]):
         """
         Inicializa um saque com valor positivo.
         
@@ -84,15 +97,22 @@ class Saque(Transacao):
         self._valor = self._validar_valor(valor)
         self._data = datetime.now()
     
-    def get_valor(self) -> Decimal:
+    def get_valor(self) -> Dinheiro:
         """Retorna o valor do saque."""
         return self._valor
     
+    def _aplicar(self, conta: 'Conta') -> bool:
+        """Saca e registra no histórico, com a conta travada."""
+        with conta._em_lote():
+            if not conta.sacar(self._valor):
+                return False
+            conta.get_historico().adicionar_transacao(self)
+            return True
+    
     def registrar(self, conta: 'Conta') -> bool:
         """Registra o saque na conta especificada."""
         try:
-            if conta.sacar(self._valor):
-                conta.get_historico().adicionar_transacao(self)
+            if self._aplicar(conta):
                 print(f"\n✅ Saque de R$ {self._valor:.2f} realizado com sucesso!")
                 return True
             
@@ -105,7 +125,7 @@ class Saque(Transacao):
 class Transferencia(Transacao):
     """Representa uma transação de transferência entre contas."""
     
-    def __init__(self, valor: Union[float, Decimal, int], conta_destino: 'Conta'):
+    def __init__(self, valor: Union[float, Decimal, int, Dinheiro], conta_destino: 'Conta'):
         """
         Inicializa uma transferência.
         
@@ -120,16 +140,26 @@ class Transferencia(Transacao):
         self._conta_destino = conta_destino
         self._data = datetime.now()
     
-    def get_valor(self) -> Decimal:
+    def get_valor(self) -> Dinheiro:
         """Retorna o valor da transferência."""
         return self._valor
     
+    def _aplicar(self, conta_origem: 'Conta') -> bool:
+        """Transfere e registra nos dois históricos.
+        
+        Origem e destino ficam travadas (em ordem de número) durante toda a operação.
+        """
+        with conta_origem._em_lote(self._conta_destino):
+            if not conta_origem.transferir(self._valor, self._conta_destino):
+                return False
+            conta_origem.get_historico().adicionar_transacao(self)
+            self._conta_destino.get_historico().adicionar_transacao(self, credito=True)
+            return True
+    
     def registrar(self, conta_origem: 'Conta') -> bool:
         """Registra a transferência na conta de origem e destino."""
         try:
-            if conta_origem.transferir(self._valor, self._conta_destino):
-                conta_origem.get_historico().adicionar_transacao(self)
-                self._conta_destino.get_historico().adicionar_transacao(self)
+            if self._aplicar(conta_origem):
                 print(f"\n✅ Transferência de R$ {self._valor:.2f} realizada com sucesso!")
                 return True
             